@@ -3,6 +3,9 @@ from .rate import router as rate_router
 from .questions import router as questions_router
 from .summary import router as summary_router
 from .transcribe import router as transcribe_router
+from .transcribe_stream import router as transcribe_stream_router
+from .health import router as health_router
+from .metrics import router as metrics_router
 
 router = APIRouter()
 
@@ -10,5 +13,8 @@ router.include_router(rate_router, tags=["rate"])
 router.include_router(questions_router, tags=["questions"])
 router.include_router(summary_router, tags=["summary"])
 router.include_router(transcribe_router, tags=["transcribe"])
+router.include_router(transcribe_stream_router, tags=["transcribe"])
+router.include_router(health_router, tags=["health"])
+router.include_router(metrics_router, tags=["metrics"])
 
 
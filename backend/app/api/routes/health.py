@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ...services.model_registry import registry
+
+router = APIRouter()
+
+@router.get("/health/live")
+async def liveness():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Ready once the configured Whisper models are loaded and warmed up
+    
+    Returns:
+        200 with model status when ready, 503 while models are still loading
+    """
+    status = registry.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **status})
+    return {"status": "ready", **status}
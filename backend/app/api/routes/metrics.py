@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from ...config import get_settings
+from ...utils import metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Counters, histograms and queue gauges of this process in Prometheus text format
+    
+    Returns:
+        text/plain exposition; 404 when METRICS_ENABLED is off
+    """
+    if not get_settings().metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,18 +1,44 @@
 from fastapi import APIRouter, HTTPException
 from ...models.schemas import QuestionGenerationRequest, QuestionsResponse
 from ...services import evaluation
+from ...config import get_settings
+from ...utils.concurrency import BranchResult, iter_branches
+from ...utils.sse import event_stream_response
 
 router = APIRouter()
 
+# Summary branch name -> (request field, response field)
+SUMMARY_FIELDS = {
+    "job": ("job_description", "summarized_job"),
+    "background": ("background", "summarized_background"),
+}
+
+def _summary_branches(request: QuestionGenerationRequest):
+    branches = {}
+    if request.job_description:
+        branches["job"] = evaluation.summarize_job_description(request.job_description)
+    if request.background:
+        branches["background"] = evaluation.summarize_background(request.background)
+    return branches
+
+def _summary_or_original(request: QuestionGenerationRequest, result: BranchResult) -> str:
+    # A failed or slow summary falls back to the original text so questions are still generated
+    return result.value_or(getattr(request, SUMMARY_FIELDS[result.name][0]))
+
+async def _summarize_inputs(request: QuestionGenerationRequest):
+    """Summarize job description and background concurrently; returns (job, background)"""
+    summaries = {"summarized_job": "", "summarized_background": ""}
+    async for result in iter_branches(_summary_branches(request), timeout=get_settings().summary_timeout_seconds):
+        summaries[SUMMARY_FIELDS[result.name][1]] = _summary_or_original(request, result)
+    return summaries["summarized_job"], summaries["summarized_background"]
+
 @router.post("/generate-questions", response_model=QuestionsResponse)
 async def generate_questions(request: QuestionGenerationRequest):
     try:
-        # Summarize job description and background if provided
-        summarized_job = evaluation.summarize_job_description(request.job_description) if request.job_description else ""
-        summarized_background = evaluation.summarize_background(request.background) if request.background else ""
+        summarized_job, summarized_background = await _summarize_inputs(request)
         
         # Generate questions using the summarized content
-        questions = evaluation.generate_interview_questions(
+        questions = await evaluation.generate_interview_questions(
             job_title=request.job_title,
             job_description=summarized_job,
             background=summarized_background,
@@ -26,7 +52,46 @@ async def generate_questions(request: QuestionGenerationRequest):
             "summarized_job": summarized_job,
             "summarized_background": summarized_background
         }
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/generate-questions/stream")
+async def generate_questions_stream(request: QuestionGenerationRequest):
+    """
+    Same as /generate-questions, streamed as Server-Sent Events
 
+    Emits one 'summaries' event per summarized input as soon as it is ready
+    (summarized_job or summarized_background), then one 'question' event
+    (index, question) per line as the completion streams, then 'result'
+    with the /generate-questions response body, or 'error'.
+    """
+    async def events():
+        summaries = {"summarized_job": "", "summarized_background": ""}
+        # Stream each summary as it finishes so a slow one does not hold back the other
+        async for result in iter_branches(_summary_branches(request), timeout=get_settings().summary_timeout_seconds):
+            field = SUMMARY_FIELDS[result.name][1]
+            summaries[field] = _summary_or_original(request, result)
+            yield "summaries", {field: summaries[field]}
+        summarized_job, summarized_background = summaries["summarized_job"], summaries["summarized_background"]
+        
+        questions = []
+        async for question in evaluation.stream_interview_questions(
+            job_title=request.job_title,
+            job_description=summarized_job,
+            background=summarized_background,
+            interview_type=request.interview_type,
+            num_questions=request.num_questions
+        ):
+            yield "question", {"index": len(questions), "question": question}
+            questions.append(question)
+        
+        yield "result", {
+            "questions": questions,
+            "summarized_job": summarized_job,
+            "summarized_background": summarized_background
+        }
+    
+    return event_stream_response(events())
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from ...services import audio_processing, transcription, evaluation
+from typing import List, Optional
+from ...config import get_settings
+from ...models.schemas import SessionRateResponse
+from ...services import answer_pipeline
+from ...utils.sse import event_stream_response
+import io
 import logging
-import time
-from typing import Dict, List, Any
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,60 +18,17 @@ async def rate_answer(
     question: str = Form(...), 
     answer: UploadFile = File(...), 
     job_description: str = Form("Some technical job"),
-    background: str = Form("")
+    background: str = Form(""),
+    stream_id: str = Form(""),
+    llm_cleanup: Optional[bool] = Form(None)
 ):
     try:
-        # Read the uploaded file content
-        content = await answer.read()
-        
-        # Validate file size
-        if len(content) < 1000:  # Arbitrary small size check
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Audio file is too small ({len(content)} bytes). Please upload a valid audio recording."
-            )
-            
-        # Convert to audio array in memory
-        try:
-            audio_data = audio_processing.convert_to_wav(content)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        # Determine audio duration (samples / sample_rate)
-        duration_seconds = len(audio_data["array"]) / audio_data["sampling_rate"]
-        
-        # Validate duration
-        if duration_seconds < 0.5:  # Less than half a second is suspicious
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Audio duration too short ({duration_seconds:.2f}s). Please upload a valid audio recording."
-            )
-        
-        # Process audio with segmentation
-        result = transcription.process_audio_with_segmentation(audio_data, duration_seconds)
-        
-        # Clean and merge transcriptions
-        raw_transcript = " ".join(result["transcriptions"])
-        cleaned_transcript = evaluation.clean_transcript(
-            result["transcriptions"], 
-            question, 
-            job_description, 
-            background
+        # Decode, transcribe, analyze and evaluate as a staged pipeline
+        return await answer_pipeline.rate_answer_audio(
+            answer.file, question, job_description, background, stream_id=stream_id, llm_cleanup=llm_cleanup
         )
-        
-        logger.info(f"Raw transcript length: {len(raw_transcript)} chars, Cleaned transcript length: {len(cleaned_transcript)} chars")
-        
-        # Analyze audio features
-        audio_metrics = audio_processing.analyze_audio(audio_data)
-        
-        # Evaluate the answer using the cleaned transcript
-        evaluation_result = evaluation.evaluate_answer(question, cleaned_transcript, audio_metrics, job_description)
-        
-        return {
-            "question": question,
-            "answer": cleaned_transcript,
-            "evaluation": evaluation_result
-        }
+    except answer_pipeline.InvalidAudioError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -77,7 +37,70 @@ async def rate_answer(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/rate/stream")
+async def rate_answer_stream(
+    question: str = Form(...), 
+    answer: UploadFile = File(...), 
+    job_description: str = Form("Some technical job"),
+    background: str = Form(""),
+    stream_id: str = Form(""),
+    llm_cleanup: Optional[bool] = Form(None)
+):
+    """
+    Same as /rate, streamed as Server-Sent Events
 
+    Emits one event per pipeline stage as it finishes (decode, transcribe,
+    analyze, clean in separate evaluation mode, evaluate), then 'result' with
+    the /rate response body, or 'error' with status_code and detail.
+    """
+    # Form files are closed once this handler returns, before the body streams,
+    # so the pipeline takes over the spooled upload and closes it itself
+    upload = answer.file
+    answer.file = io.BytesIO()
 
+    async def events():
+        try:
+            async for event in answer_pipeline.stream_rate_answer_audio(
+                upload, question, job_description, background, stream_id, llm_cleanup
+            ):
+                yield event
+        finally:
+            upload.close()
+
+    return event_stream_response(events())
 
 
+@router.post("/rate/session", response_model=SessionRateResponse)
+async def rate_session(
+    answers: List[UploadFile] = File(...),
+    questions: List[str] = Form(...),
+    job_description: str = Form("Some technical job"),
+    background: str = Form(""),
+    llm_cleanup: Optional[bool] = Form(None)
+):
+    """
+    Rate a whole interview session in one request
+
+    Send one 'answers' file and one 'questions' field per answer, in the same
+    order. Answers are rated concurrently and the session summary is included,
+    so no separate /summarize call is needed.
+    """
+    try:
+        if len(answers) != len(questions):
+            raise HTTPException(status_code=400, detail=f"Got {len(answers)} answers but {len(questions)} questions")
+        max_answers = get_settings().session_max_answers
+        if len(answers) > max_answers:
+            raise HTTPException(status_code=413, detail=f"A session can have at most {max_answers} answers")
+        
+        return await answer_pipeline.rate_session(
+            [(answer.file, question) for answer, question in zip(answers, questions)],
+            job_description,
+            background,
+            llm_cleanup=llm_cleanup
+        )
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        logger.error(f"Error rating session: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
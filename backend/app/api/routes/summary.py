@@ -10,7 +10,10 @@ async def summarize_feedback(request: SummarizeRequest):
         if not request.feedback or len(request.feedback) == 0:
             raise HTTPException(status_code=400, detail="No feedback items provided")
             
-        summary = evaluation.summarize_feedback(request.feedback)
+        summary = await evaluation.summarize_feedback(request.feedback)
         return summary
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,8 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from ...services import audio_processing, transcription
+from ...services import answer_pipeline
 import logging
-from typing import Dict, List, Any
-import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,48 +11,28 @@ router = APIRouter()
 @router.post("/transcribe")
 async def transcribe_audio_segments(answer: UploadFile = File(...)):
     """
-    Transcribe uploaded audio file with automatic model selection
+    Transcribe uploaded audio file with the model chosen by the latency policy
     
     Args:
         answer: Uploaded audio file
     
     Returns:
-        Dict with transcriptions, model used, segments used, and audio duration
+        Dict with transcriptions, model used, segments used, the policy
+        decision, and audio duration
     """
     try:
-        # Read the uploaded file content
-        content = await answer.read()
-        
-        # Validate file size
-        if len(content) < 1000:  # Arbitrary small size check
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Audio file is too small ({len(content)} bytes). Please upload a valid audio recording."
-            )
-            
-        # Convert to audio array in memory
-        try:
-            audio_data = audio_processing.convert_to_wav(content)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        # Determine audio duration (samples / sample_rate)
-        duration_seconds = len(audio_data["array"]) / audio_data["sampling_rate"]
-        
-        # Validate duration
-        if duration_seconds < 0.5:  # Less than half a second is suspicious
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Audio duration too short ({duration_seconds:.2f}s). Please upload a valid audio recording."
-            )
+        # Validate and decode the upload
+        audio = await answer_pipeline.decode_answer(answer.file)
         
         # Process audio with segmentation
-        result = transcription.process_audio_with_segmentation(audio_data, duration_seconds)
+        result = await answer_pipeline.transcribe_decoded(audio)
         
         # Add duration to result
-        result["audio_duration_seconds"] = round(duration_seconds, 2)
+        result["audio_duration_seconds"] = round(audio.duration_seconds, 2)
         
         return result
+    except answer_pipeline.InvalidAudioError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
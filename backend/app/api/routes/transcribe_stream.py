@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+
+from ...config import get_settings
+from ...services import streaming_transcription
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _is_stop(text: str) -> bool:
+    if text.strip().lower() == "stop":
+        return True
+    try:
+        return json.loads(text).get("type") == "stop"
+    except (ValueError, AttributeError):
+        return False
+
+
+@router.websocket("/transcribe/stream")
+async def transcribe_stream(websocket: WebSocket):
+    """
+    Transcribe a recording while it is still being made
+
+    The client sends the recorder's webm/ogg chunks as binary messages and a
+    text message "stop" (or {"type": "stop"}) when recording ends. Each
+    completed window is answered with
+    {"type": "partial", "segment", "text", "audio_seconds"}; after stop only
+    the last window is transcribed and the socket closes with
+    {"type": "final", "stream_id", "transcriptions", "model_used",
+    "segments_used", "audio_duration_seconds", "segmentation"}. Passing stream_id to /rate
+    reuses this transcription instead of running Whisper again. If a window
+    fails to transcribe, {"type": "error"} is sent right away.
+    """
+    settings = get_settings()
+    await websocket.accept()
+
+    session = streaming_transcription.StreamingTranscriber(
+        model_name=settings.stream_model,
+        window_seconds=settings.stream_window_seconds,
+        max_bytes=settings.max_upload_bytes,
+        max_seconds=settings.max_audio_seconds,
+    )
+    wake = asyncio.Event()
+    stopping = False
+    worker = None
+
+    async def send_partial(index: int, text: str):
+        await websocket.send_json({
+            "type": "partial",
+            "segment": index,
+            "text": text,
+            "audio_seconds": round(session.duration_seconds, 2),
+        })
+
+    async def transcribe_while_recording():
+        # Windows are transcribed one at a time, in order, as new chunks arrive
+        while not stopping:
+            await wake.wait()
+            wake.clear()
+            await session.transcribe_ready(send_partial)
+
+    try:
+        session.start()
+        worker = asyncio.create_task(transcribe_while_recording())
+
+        while True:
+            receive = asyncio.ensure_future(websocket.receive())
+            await asyncio.wait({receive, worker}, return_when=asyncio.FIRST_COMPLETED)
+            if not receive.done():
+                # Transcription failed while waiting for audio: report it now, not at stop
+                receive.cancel()
+                worker.result()
+                raise RuntimeError("Streaming transcription stopped unexpectedly")
+            message = receive.result()
+            if message["type"] == "websocket.disconnect":
+                logger.info(f"Stream {session.stream_id[:8]}: client disconnected before stop")
+                return
+            if message.get("bytes"):
+                await session.feed(message["bytes"])
+                wake.set()
+            elif message.get("text") and _is_stop(message["text"]):
+                break
+
+        # Let an in-flight window finish rather than transcribing it twice
+        stopping = True
+        wake.set()
+        await worker
+
+        result = await session.finish(send_partial)
+        if result["audio_duration_seconds"] < 0.5:
+            raise ValueError(f"Audio duration too short ({result['audio_duration_seconds']:.2f}s). Please record a longer answer.")
+        await streaming_transcription.store_result(result)
+
+        await websocket.send_json({"type": "final", **result})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Stream {session.stream_id[:8]}: client disconnected")
+    except streaming_transcription.StreamLimitError as e:
+        await _close_with_error(websocket, str(e), code=1009)
+    except HTTPException as e:
+        await _close_with_error(websocket, str(e.detail), code=1013)
+    except Exception as e:
+        logger.error(f"Streaming transcription error: {str(e)}")
+        await _close_with_error(websocket, str(e), code=1011)
+    finally:
+        if worker is not None and not worker.done():
+            worker.cancel()
+        session.close()
+
+
+async def _close_with_error(websocket: WebSocket, detail: str, code: int) -> None:
+    try:
+        await websocket.send_json({"type": "error", "detail": detail})
+        await websocket.close(code=code)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
@@ -0,0 +1,343 @@
+"""
+Re-score archived answer recordings without the HTTP API
+
+Decoding, Whisper and audio analysis run in a process pool; evaluation runs
+on the async OpenAI client under the LLM pool's concurrency limit, so both
+overlap across clips. Every finished clip is appended to a JSONL checkpoint,
+and a rerun skips clips that already succeeded. The output holds the latest
+record per clip once the run ends.
+
+Input is either a directory (audio files are found recursively; an optional
+sidecar <clip>.json may set question, job_description and background) or a
+JSONL manifest with one {"path", "question", ...} object per line.
+
+Usage (from the backend directory):
+    python -m app.cli.rescore --input archive/ --output rescored.jsonl --question "Tell me about yourself"
+    python -m app.cli.rescore --manifest clips.jsonl --output rescored.parquet --workers 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = {".webm", ".wav", ".mp3", ".m4a", ".mp4", ".ogg", ".opus", ".flac", ".aac"}
+
+STAGES = ("decode", "transcribe", "analyze", "evaluate")
+
+
+def discover_clips(directory: str, defaults: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Audio files under directory, with per-clip context from sidecar .json files"""
+    clips = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            base, ext = os.path.splitext(name)
+            if ext.lower() not in AUDIO_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            clip = {"id": os.path.relpath(path, directory), "path": path, **defaults}
+            sidecar = os.path.join(root, base + ".json")
+            if os.path.exists(sidecar):
+                with open(sidecar) as f:
+                    clip.update({key: value for key, value in json.load(f).items() if key != "path"})
+            clips.append(clip)
+    return sorted(clips, key=lambda clip: clip["id"])
+
+
+def read_manifest(path: str, defaults: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Clips from a JSONL manifest; relative paths are resolved against the manifest's directory"""
+    base = os.path.dirname(os.path.abspath(path))
+    clips = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            clip_path = entry["path"] if os.path.isabs(entry["path"]) else os.path.join(base, entry["path"])
+            clips.append({**defaults, **entry, "id": entry.get("id", entry["path"]), "path": clip_path})
+    return clips
+
+
+def load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """Latest record per clip id from a JSONL checkpoint"""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A run that was killed mid-write leaves a partial last line
+                continue
+            records[record["id"]] = record
+    return records
+
+
+def _init_worker(threads: int) -> None:
+    # Several Whisper processes on one machine should not each claim every core
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def transcribe_clip(path: str, model_name: str) -> Dict[str, Any]:
+    """
+    Decode, transcribe and analyze one clip (runs in a worker process)
+
+    Every clip uses model_name: the online latency policy has no meaning for
+    a batch job and would move long clips to a smaller model.
+
+    Returns:
+        Dict with duration_seconds, transcribed (process_audio_with_segmentation
+        result), metrics and per-stage timings
+    """
+    from ..config import get_settings
+    from ..services import audio_processing, policy, transcription
+
+    timings = {}
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        audio = audio_processing.convert_to_wav(f, get_settings().max_audio_seconds)
+    timings["decode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decision = policy.fixed(model_name, audio.duration_seconds)
+    transcribed = transcription.process_audio_with_segmentation(audio, decision)
+    timings["transcribe"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = audio_processing.analyze_audio(audio)
+    timings["analyze"] = time.perf_counter() - start
+
+    return {
+        "duration_seconds": round(audio.duration_seconds, 2),
+        "transcribed": transcribed,
+        "metrics": metrics,
+        "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+    }
+
+
+class StageStats:
+    """Busy time and item counts per stage, for the throughput report"""
+
+    def __init__(self):
+        self.busy = {stage: 0.0 for stage in STAGES}
+        self.items = {stage: 0 for stage in STAGES}
+        self.audio_seconds = 0.0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def add(self, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.busy[stage] += seconds
+            self.items[stage] += 1
+
+    def report(self, wall_seconds: float, workers: int, llm_concurrency: int) -> Dict[str, Any]:
+        stages = {}
+        for stage in STAGES:
+            if not self.items[stage]:
+                continue
+            parallelism = llm_concurrency if stage == "evaluate" else workers
+            stages[stage] = {
+                "items": self.items[stage],
+                "busy_seconds": round(self.busy[stage], 2),
+                "mean_seconds": round(self.busy[stage] / self.items[stage], 3),
+                # What the stage could sustain on its own with all of its slots busy
+                "capacity_per_second": round(parallelism * self.items[stage] / self.busy[stage], 3) if self.busy[stage] else None,
+            }
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "wall_seconds": round(wall_seconds, 2),
+            "clips_per_second": round((self.succeeded + self.failed) / wall_seconds, 3) if wall_seconds else None,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "audio_seconds_per_second": round(self.audio_seconds / wall_seconds, 2) if wall_seconds else None,
+            "stages": stages,
+        }
+
+
+async def rescore(
+    clips: List[Dict[str, Any]],
+    checkpoint_path: str,
+    workers: int,
+    threads_per_worker: int,
+    llm_concurrency: int,
+    model_name: str,
+    evaluate: bool = True,
+    llm_cleanup: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Score clips that do not yet have a successful record in the checkpoint
+
+    Returns:
+        Throughput report
+    """
+    from ..config import get_settings
+    from ..services import answer_pipeline, llm
+    from ..utils import executor
+
+    settings = get_settings().model_copy(update={"llm_workers": llm_concurrency, "llm_queue_depth": len(clips) + 1})
+    done = {clip_id for clip_id, record in load_checkpoint(checkpoint_path).items() if not record.get("error")}
+    pending = [clip for clip in clips if clip["id"] not in done]
+    stats = StageStats()
+    stats.skipped = len(clips) - len(pending)
+    logger.info(f"{len(pending)} clips to score, {stats.skipped} already in {checkpoint_path}")
+
+    if evaluate:
+        executor.init_pools(settings)
+        llm.init_client(settings)
+
+    loop = asyncio.get_running_loop()
+    # Keep every worker busy without decoding the whole archive into memory ahead of the LLM stage
+    in_flight = asyncio.Semaphore(workers * 2)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads_per_worker,)) as pool, \
+            open(checkpoint_path, "a") as checkpoint:
+
+        def write(record: Dict[str, Any]) -> None:
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+
+        async def score(clip: Dict[str, Any]) -> None:
+            record = {"id": clip["id"], "path": clip["path"], "question": clip.get("question", "")}
+            try:
+                async with in_flight:
+                    audio = await loop.run_in_executor(pool, transcribe_clip, clip["path"], model_name)
+                record.update(
+                    duration_seconds=audio["duration_seconds"],
+                    transcriptions=audio["transcribed"]["transcriptions"],
+                    model_used=audio["transcribed"]["model_used"],
+                    segments=audio["transcribed"].get("segments", []),
+                    audio_metrics=audio["metrics"],
+                )
+                timings = dict(audio["timings"])
+                if evaluate:
+                    evaluate_start = time.perf_counter()
+                    result = await answer_pipeline.evaluate_transcription(
+                        audio["transcribed"],
+                        audio["metrics"],
+                        clip.get("question", ""),
+                        clip.get("job_description", ""),
+                        clip.get("background", ""),
+                        llm_cleanup,
+                    )
+                    timings["evaluate"] = round(time.perf_counter() - evaluate_start, 3)
+                    record.update(answer=result["answer"], evaluation=result["evaluation"].model_dump())
+                record["timings"] = timings
+                stats.add(timings)
+                stats.audio_seconds += audio["duration_seconds"]
+                stats.succeeded += 1
+            except Exception as e:
+                logger.error(f"{clip['id']}: {str(e)}")
+                record["error"] = str(e)
+                stats.failed += 1
+            write(record)
+
+        try:
+            await asyncio.gather(*(score(clip) for clip in pending))
+        finally:
+            if evaluate:
+                await llm.close_client()
+                executor.shutdown_pools()
+
+    return stats.report(time.perf_counter() - start, workers, llm_concurrency)
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], path: str) -> None:
+    """Write records to JSONL through a temporary file, so path is never left half-written"""
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    os.replace(temporary, path)
+
+
+def write_parquet(records: Iterable[Dict[str, Any]], path: str) -> None:
+    """Write records to Parquet; nested fields are stored as JSON strings"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = [
+        {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in record.items()}
+        for record in records
+    ]
+    pq.write_table(pa.Table.from_pylist(rows), path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Directory of recordings")
+    source.add_argument("--manifest", help="JSONL manifest with path, question, job_description, background")
+    parser.add_argument("--output", required=True, help="Results file (.jsonl or .parquet)")
+    parser.add_argument("--checkpoint", help="Progress file (defaults to the output for .jsonl, else <output>.checkpoint.jsonl)")
+    parser.add_argument("--question", default="", help="Question for clips that do not set one")
+    parser.add_argument("--job-description", default="Some technical job")
+    parser.add_argument("--background", default="")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Decode/Whisper processes")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="Torch threads per process")
+    parser.add_argument("--llm-concurrency", type=int, default=16)
+    parser.add_argument("--model", help="Whisper model for every clip (defaults to WHISPER_MODEL)")
+    parser.add_argument("--no-evaluate", action="store_true", help="Only transcribe and analyze")
+    cleanup = parser.add_mutually_exclusive_group()
+    cleanup.add_argument("--llm-cleanup", dest="llm_cleanup", action="store_true", default=None)
+    cleanup.add_argument("--no-llm-cleanup", dest="llm_cleanup", action="store_false")
+    args = parser.parse_args(argv)
+
+    defaults = {"question": args.question, "job_description": args.job_description, "background": args.background}
+    clips = read_manifest(args.manifest, defaults) if args.manifest else discover_clips(args.input, defaults)
+    parquet = args.output.endswith(".parquet")
+    if parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("Parquet output needs pyarrow (pip install pyarrow); use a .jsonl output instead")
+    checkpoint_path = args.checkpoint or (args.output + ".checkpoint.jsonl" if parquet else args.output)
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+
+    from ..config import get_settings
+
+    report = asyncio.run(rescore(
+        clips,
+        checkpoint_path,
+        workers=args.workers,
+        threads_per_worker=threads,
+        llm_concurrency=args.llm_concurrency,
+        model_name=args.model or get_settings().whisper_model,
+        evaluate=not args.no_evaluate,
+        llm_cleanup=args.llm_cleanup,
+    ))
+
+    # The checkpoint is append-only, so a clip that failed and was retried has several records
+    records = load_checkpoint(checkpoint_path)
+    ids = {clip["id"] for clip in clips}
+    latest = [record for clip_id, record in records.items() if clip_id in ids]
+    if parquet:
+        write_parquet(latest, args.output)
+    elif checkpoint_path == args.output:
+        # Compact in place, keeping clips from earlier runs that are not in this one
+        write_jsonl(records.values(), args.output)
+    else:
+        write_jsonl(latest, args.output)
+
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import os
+from functools import lru_cache
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name: str, default: List[str]) -> List[str]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def _env_map(name: str, default: Dict[str, str]) -> Dict[str, str]:
+    """Comma-separated key=value pairs, e.g. base.en=int8,tiny.en=openai"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    pairs = [item.split("=", 1) for item in value.split(",") if "=" in item]
+    return {key.strip(): item.strip() for key, item in pairs if key.strip() and item.strip()}
+
+
+class Settings(BaseModel):
+    """Runtime configuration, read from environment variables"""
+
+    # CPU-bound work: Whisper inference and audio feature extraction
+    inference_pool_kind: str = "thread"  # "thread" or "process"
+    inference_workers: int = 2
+    inference_queue_depth: int = 8
+    torch_threads: int = 0  # PyTorch intra-op threads per process; 0 keeps torch's default (all cores)
+
+    # ffmpeg subprocesses (mostly waiting on I/O)
+    ffmpeg_workers: int = 4
+    ffmpeg_queue_depth: int = 32
+
+    # Outbound OpenAI calls
+    llm_workers: int = 16
+    llm_queue_depth: int = 64
+
+    # Shared AsyncOpenAI client
+    openai_base_url: str = ""  # empty means the SDK default (or OPENAI_BASE_URL)
+    llm_max_connections: int = 32
+    llm_max_keepalive_connections: int = 16
+    llm_keepalive_expiry_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_timeout_seconds: float = 60.0
+    llm_max_retries: int = 2
+    llm_retry_base_delay_seconds: float = 0.5
+    llm_retry_max_delay_seconds: float = 8.0
+
+    # Per-branch timeout for the concurrent job/background summaries
+    summary_timeout_seconds: float = 20.0
+
+    # Job-description/background summary cache (disk tier only when a path is set)
+    summary_cache_entries: int = 1024
+    summary_cache_ttl_seconds: float = 7 * 24 * 3600
+    summary_cache_path: str = ""
+
+    # Transcription result cache keyed by decoded-audio fingerprint
+    transcription_cache_entries: int = 512
+    transcription_cache_ttl_seconds: float = 24 * 3600
+    transcription_cache_max_bytes: int = 16 * 1024 * 1024
+    transcription_cache_path: str = ""
+    transcription_cache_max_disk_bytes: int = 256 * 1024 * 1024
+
+    # Upload limits, enforced while the request body and decoded audio stream in
+    max_upload_bytes: int = 25 * 1024 * 1024
+    max_form_overhead_bytes: int = 1024 * 1024  # text fields sent alongside the audio
+    max_audio_seconds: float = 600.0
+
+    # Session batch rating (/rate/session): answers per request, whole-body cap, answers rated at once
+    session_max_answers: int = 20
+    max_session_upload_bytes: int = 200 * 1024 * 1024
+    session_concurrency: int = 4
+
+    # Whisper models loaded and warmed at startup (comma-separated in the env)
+    whisper_preload_models: List[str] = ["base.en", "tiny.en"]
+    whisper_warmup: bool = True
+
+    # Whisper model per answer length; the long-answer model trades accuracy for speed
+    whisper_model: str = "base.en"
+    whisper_long_model: str = "tiny.en"
+    whisper_long_seconds: float = 120.0  # only used with whisper_policy="static"
+
+    # Model choice: "adaptive" (largest model whose estimated latency meets the SLO) or "static" (by length)
+    whisper_policy: str = "adaptive"
+    whisper_latency_slo_seconds: float = 20.0
+    whisper_policy_models: List[str] = []  # most accurate first; empty means whisper_model, whisper_long_model
+    whisper_policy_window: int = 50  # jobs per model in the rolling real-time factor
+    whisper_policy_rtf_priors: Dict[str, str] = {}  # RTF before a model is measured, e.g. {"base.en": "0.2"}
+
+    # Transcription runtime: "openai" (PyTorch fp32), "int8" (dynamic quantization) or "faster-whisper"
+    whisper_engine: str = "openai"
+    whisper_model_engines: Dict[str, str] = {}  # per-model override, e.g. {"base.en": "int8"}
+    faster_whisper_compute_type: str = "int8"
+
+    # How answers are split before Whisper: "vad" (at detected pauses) or "fixed" (equal parts)
+    segmentation_mode: str = "vad"
+    fixed_segment_seconds: float = 60.0  # longest equal part with fixed segmentation
+    vad_max_segment_seconds: float = 30.0
+    vad_min_silence_seconds: float = 1.0
+    vad_padding_seconds: float = 0.2
+
+    # Seam merging: word timestamps (fixed segmentation, unbatched) and when the LLM cleanup still runs
+    whisper_word_timestamps: bool = False
+    transcript_cleanup: str = "auto"  # "auto" (low merge confidence only), "always" or "never"
+    transcript_merge_min_confidence: float = 0.3
+
+    # "fused": one LLM call per answer (cleanup folded into evaluation); "separate": clean, then evaluate
+    evaluation_mode: str = "fused"
+
+    # Whisper decoding of multi-segment answers
+    whisper_batched_decode: bool = True
+    whisper_batch_size: int = 8
+
+    # Cross-request batching of Whisper windows
+    whisper_batch_scheduler: bool = False
+    whisper_scheduler_max_batch: int = 8
+    whisper_scheduler_max_wait_ms: float = 20.0
+
+    # WebSocket streaming transcription: fixed windows transcribed as audio arrives
+    stream_model: str = "base.en"
+    stream_window_seconds: float = 30.0
+    stream_match_tolerance_seconds: float = 0.5  # /rate reuses a stream's transcript only if the upload is this close in length
+
+    # Seconds clients are told to wait when a pool is saturated
+    retry_after_seconds: int = 5
+
+    # Observability: /api/metrics in Prometheus format, trace IDs (X-Request-ID) in log lines
+    metrics_enabled: bool = True
+    log_trace_ids: bool = False
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    Build settings from the environment
+
+    The result is cached, so this must only be called after .env has been loaded.
+    """
+    return Settings(
+        inference_pool_kind=_env_str("INFERENCE_POOL_KIND", "thread"),
+        inference_workers=_env_int("INFERENCE_WORKERS", 2),
+        inference_queue_depth=_env_int("INFERENCE_QUEUE_DEPTH", 8),
+        torch_threads=_env_int("TORCH_THREADS", 0),
+        ffmpeg_workers=_env_int("FFMPEG_WORKERS", 4),
+        ffmpeg_queue_depth=_env_int("FFMPEG_QUEUE_DEPTH", 32),
+        llm_workers=_env_int("LLM_WORKERS", 16),
+        llm_queue_depth=_env_int("LLM_QUEUE_DEPTH", 64),
+        openai_base_url=_env_str("OPENAI_BASE_URL", ""),
+        llm_max_connections=_env_int("LLM_MAX_CONNECTIONS", 32),
+        llm_max_keepalive_connections=_env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 16),
+        llm_keepalive_expiry_seconds=_env_float("LLM_KEEPALIVE_EXPIRY_SECONDS", 60.0),
+        llm_connect_timeout_seconds=_env_float("LLM_CONNECT_TIMEOUT_SECONDS", 5.0),
+        llm_timeout_seconds=_env_float("LLM_TIMEOUT_SECONDS", 60.0),
+        llm_max_retries=_env_int("LLM_MAX_RETRIES", 2),
+        llm_retry_base_delay_seconds=_env_float("LLM_RETRY_BASE_DELAY_SECONDS", 0.5),
+        llm_retry_max_delay_seconds=_env_float("LLM_RETRY_MAX_DELAY_SECONDS", 8.0),
+        summary_timeout_seconds=_env_float("SUMMARY_TIMEOUT_SECONDS", 20.0),
+        summary_cache_entries=_env_int("SUMMARY_CACHE_ENTRIES", 1024),
+        summary_cache_ttl_seconds=_env_float("SUMMARY_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+        summary_cache_path=_env_str("SUMMARY_CACHE_PATH", ""),
+        transcription_cache_entries=_env_int("TRANSCRIPTION_CACHE_ENTRIES", 512),
+        transcription_cache_ttl_seconds=_env_float("TRANSCRIPTION_CACHE_TTL_SECONDS", 24 * 3600),
+        transcription_cache_max_bytes=_env_int("TRANSCRIPTION_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+        transcription_cache_path=_env_str("TRANSCRIPTION_CACHE_PATH", ""),
+        transcription_cache_max_disk_bytes=_env_int("TRANSCRIPTION_CACHE_MAX_DISK_BYTES", 256 * 1024 * 1024),
+        max_upload_bytes=_env_int("MAX_UPLOAD_BYTES", 25 * 1024 * 1024),
+        max_form_overhead_bytes=_env_int("MAX_FORM_OVERHEAD_BYTES", 1024 * 1024),
+        max_audio_seconds=_env_float("MAX_AUDIO_SECONDS", 600.0),
+        session_max_answers=_env_int("SESSION_MAX_ANSWERS", 20),
+        max_session_upload_bytes=_env_int("MAX_SESSION_UPLOAD_BYTES", 200 * 1024 * 1024),
+        session_concurrency=_env_int("SESSION_CONCURRENCY", 4),
+        whisper_preload_models=_env_list("WHISPER_PRELOAD_MODELS", ["base.en", "tiny.en"]),
+        whisper_warmup=_env_bool("WHISPER_WARMUP", True),
+        whisper_model=_env_str("WHISPER_MODEL", "base.en"),
+        whisper_long_model=_env_str("WHISPER_LONG_MODEL", "tiny.en"),
+        whisper_long_seconds=_env_float("WHISPER_LONG_SECONDS", 120.0),
+        whisper_policy=_env_str("WHISPER_POLICY", "adaptive"),
+        whisper_latency_slo_seconds=_env_float("WHISPER_LATENCY_SLO_SECONDS", 20.0),
+        whisper_policy_models=_env_list("WHISPER_POLICY_MODELS", []),
+        whisper_policy_window=_env_int("WHISPER_POLICY_WINDOW", 50),
+        whisper_policy_rtf_priors=_env_map("WHISPER_POLICY_RTF_PRIORS", {}),
+        whisper_engine=_env_str("WHISPER_ENGINE", "openai"),
+        whisper_model_engines=_env_map("WHISPER_MODEL_ENGINES", {}),
+        faster_whisper_compute_type=_env_str("FASTER_WHISPER_COMPUTE_TYPE", "int8"),
+        segmentation_mode=_env_str("SEGMENTATION_MODE", "vad"),
+        fixed_segment_seconds=_env_float("FIXED_SEGMENT_SECONDS", 60.0),
+        vad_max_segment_seconds=_env_float("VAD_MAX_SEGMENT_SECONDS", 30.0),
+        vad_min_silence_seconds=_env_float("VAD_MIN_SILENCE_SECONDS", 1.0),
+        vad_padding_seconds=_env_float("VAD_PADDING_SECONDS", 0.2),
+        whisper_word_timestamps=_env_bool("WHISPER_WORD_TIMESTAMPS", False),
+        transcript_cleanup=_env_str("TRANSCRIPT_CLEANUP", "auto"),
+        transcript_merge_min_confidence=_env_float("TRANSCRIPT_MERGE_MIN_CONFIDENCE", 0.3),
+        evaluation_mode=_env_str("EVALUATION_MODE", "fused"),
+        whisper_batched_decode=_env_bool("WHISPER_BATCHED_DECODE", True),
+        whisper_batch_size=_env_int("WHISPER_BATCH_SIZE", 8),
+        whisper_batch_scheduler=_env_bool("WHISPER_BATCH_SCHEDULER", False),
+        whisper_scheduler_max_batch=_env_int("WHISPER_SCHEDULER_MAX_BATCH", 8),
+        whisper_scheduler_max_wait_ms=_env_float("WHISPER_SCHEDULER_MAX_WAIT_MS", 20.0),
+        stream_model=_env_str("STREAM_MODEL", "base.en"),
+        stream_window_seconds=_env_float("STREAM_WINDOW_SECONDS", 30.0),
+        stream_match_tolerance_seconds=_env_float("STREAM_MATCH_TOLERANCE_SECONDS", 0.5),
+        retry_after_seconds=_env_int("RETRY_AFTER_SECONDS", 5),
+        metrics_enabled=_env_bool("METRICS_ENABLED", True),
+        log_trace_ids=_env_bool("LOG_TRACE_IDS", False),
+    )
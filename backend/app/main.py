@@ -1,22 +1,55 @@
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes import router
+from .config import get_settings
+from .services import batching, engines, llm
+from .services.model_registry import registry
+from .utils import executor, tracing
+from .utils.upload_limits import BodySizeLimitMiddleware
 
 # Load environment variables from .env file
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker pools keep blocking audio, Whisper and OpenAI work off the event loop
+    settings = get_settings()
+    if settings.torch_threads:
+        engines.set_torch_threads(settings.torch_threads)
+    executor.init_pools(settings)
+    # One pooled OpenAI client for the whole app; tests may preset app.state.llm_transport
+    llm.init_client(settings, transport=getattr(app.state, "llm_transport", None))
+    # Load and warm Whisper models in the background; /api/health/ready reports when done
+    registry.preload_in_background(settings.whisper_preload_models, warmup=settings.whisper_warmup)
+    yield
+    await llm.close_client()
+    executor.shutdown_pools()
+    batching.shutdown_scheduler()
+
 app = FastAPI(
     title="MockInterview.AI API",
     description="API for transcribing and evaluating interview answers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Get allowed origins from environment variable or use default
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
 print(f"Allowed origins: {allowed_origins}")
 
+# Reject oversized uploads while they stream in (added before CORS so 413s still carry CORS headers)
+settings = get_settings()
+if settings.log_trace_ids:
+    tracing.install_log_trace_ids()
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_bytes=settings.max_upload_bytes + settings.max_form_overhead_bytes,
+    path_limits={"/api/rate/session": settings.max_session_upload_bytes + settings.max_form_overhead_bytes},
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,6 +59,9 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Outermost: trace ID and latency cover everything below, including 413s and CORS preflights
+app.add_middleware(tracing.RequestTracingMiddleware, exclude_paths={"/api/metrics"})
+
 app.include_router(router, prefix="/api")
 
 @app.get("/")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 
 class JobDescriptionRequest(BaseModel):
     job_description: str
@@ -29,6 +29,21 @@ class TranscriptionResponse(BaseModel):
     question: str
     answer: str
     evaluation: EvaluationResult
+    timings: Dict[str, float] = {}  # Seconds per pipeline stage, plus "total"
+    policy: Optional[Dict[str, Any]] = None  # Transcription model choice and its latency estimate
+
+class SessionAnswerError(BaseModel):
+    status_code: int
+    detail: str
+
+class SessionAnswerResult(BaseModel):
+    index: int
+    question: str
+    answer: Optional[str] = None
+    evaluation: Optional[EvaluationResult] = None
+    timings: Dict[str, float] = {}
+    policy: Optional[Dict[str, Any]] = None
+    error: Optional[SessionAnswerError] = None  # Set instead of answer/evaluation when this answer failed
 
 class FeedbackItem(BaseModel):
     rating: int
@@ -43,6 +58,7 @@ class SummarizeResponse(BaseModel):
     strengths: List[str]
     areas_for_improvement: List[str]
 
-
-
-
+class SessionRateResponse(BaseModel):
+    results: List[SessionAnswerResult]
+    summary: Optional[SummarizeResponse] = None  # None when no answer could be rated
+    timings: Dict[str, float] = {}
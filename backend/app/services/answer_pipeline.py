@@ -0,0 +1,389 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from . import audio_processing, transcription, evaluation, frame_metrics, policy, streaming_transcription, transcript_merge
+from .audio_buffer import AudioBuffer
+from ..config import get_settings
+from ..utils import executor
+from ..utils.concurrency import gather_branches
+from ..utils.pipeline import Pipeline, StageCallback
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InvalidAudioError(ValueError):
+    """Upload could not be decoded or is too short to process"""
+
+    status_code = 400
+
+
+class UploadTooLargeError(InvalidAudioError):
+    """Upload exceeds the configured byte or duration limit"""
+
+    status_code = 413
+
+
+def needs_llm_cleanup(merged: transcript_merge.MergeResult, llm_cleanup: Optional[bool] = None) -> bool:
+    """
+    Whether the transcript still goes through the clean_transcript LLM call
+
+    A per-request llm_cleanup flag wins; otherwise TRANSCRIPT_CLEANUP decides,
+    with "auto" calling the LLM only when a seam could not be aligned confidently.
+    """
+    if llm_cleanup is not None:
+        return llm_cleanup
+    settings = get_settings()
+    if settings.transcript_cleanup == "always":
+        return True
+    if settings.transcript_cleanup == "never":
+        return False
+    return merged.confidence < settings.transcript_merge_min_confidence
+
+
+def metrics_with_rate(metrics: Dict[str, Any], transcript: str) -> Dict[str, Any]:
+    """Audio metrics plus the speaking rate of the given transcript"""
+    audio_metrics = dict(metrics)
+    audio_metrics["speaking_rate_wpm"] = frame_metrics.speaking_rate(transcript, audio_metrics["speech_seconds"])
+    return audio_metrics
+
+
+async def clean_transcription(
+    transcribed: Dict[str, Any],
+    question: str,
+    job_description: str,
+    background: str = "",
+    llm_cleanup: Optional[bool] = None,
+) -> str:
+    """Merge segment seams locally, falling back to the clean_transcript LLM call when needed"""
+    transcriptions = transcribed["transcriptions"]
+    merged = transcript_merge.merge_result(transcribed, transcription.SEGMENT_OVERLAP_SECONDS)
+    if not needs_llm_cleanup(merged, llm_cleanup):
+        logger.info(f"Merged {len(transcriptions)} segments locally (confidence {merged.confidence:.2f})")
+        return merged.text
+    cleaned_transcript = await evaluation.clean_transcript(transcriptions, question, job_description, background)
+    logger.info(f"Merged transcript length: {len(merged.text)} chars, Cleaned transcript length: {len(cleaned_transcript)} chars")
+    return cleaned_transcript
+
+
+async def fused_evaluation(
+    transcribed: Dict[str, Any],
+    metrics: Dict[str, Any],
+    question: str,
+    job_description: str,
+    background: str = "",
+    llm_cleanup: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Merge locally and evaluate in a single LLM call that also corrects the transcript when needed"""
+    transcriptions = transcribed["transcriptions"]
+    merged = transcript_merge.merge_result(transcribed, transcription.SEGMENT_OVERLAP_SECONDS)
+    # Speaking rate comes from the local merge; the corrected transcript only exists after the call
+    audio_metrics = metrics_with_rate(metrics, merged.text)
+    if not needs_llm_cleanup(merged, llm_cleanup):
+        result = await evaluation.evaluate_answer(question, merged.text, audio_metrics, job_description)
+        return {"answer": merged.text, "evaluation": result}
+    answer, result = await evaluation.clean_and_evaluate_answer(
+        transcriptions, question, audio_metrics, job_description, background
+    )
+    return {"answer": answer, "evaluation": result}
+
+
+async def evaluate_transcription(
+    transcribed: Dict[str, Any],
+    metrics: Dict[str, Any],
+    question: str,
+    job_description: str,
+    background: str = "",
+    llm_cleanup: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    The LLM half of /rate for an answer that is already transcribed and analyzed
+
+    Follows EVALUATION_MODE like the pipeline does.
+
+    Returns:
+        Dict with 'answer' (final transcript) and 'evaluation'
+    """
+    if get_settings().evaluation_mode == "fused":
+        return await fused_evaluation(transcribed, metrics, question, job_description, background, llm_cleanup)
+    answer = await clean_transcription(transcribed, question, job_description, background, llm_cleanup)
+    result = await evaluation.evaluate_answer(question, answer, metrics_with_rate(metrics, answer), job_description)
+    return {"answer": answer, "evaluation": result}
+
+
+async def decode_answer(source: audio_processing.AudioSource) -> AudioBuffer:
+    """
+    Validate and decode an uploaded answer in the ffmpeg pool
+
+    File objects (e.g. UploadFile.file) are streamed into ffmpeg in chunks
+    rather than read into memory first; decoding stops as soon as the audio
+    runs past MAX_AUDIO_SECONDS.
+
+    Args:
+        source: Raw bytes of the uploaded audio file, or a seekable file object
+
+    Returns:
+        The decoded AudioBuffer
+
+    Raises:
+        UploadTooLargeError: if the upload exceeds the byte or duration limit
+        InvalidAudioError: if the upload is too small, undecodable or too short
+    """
+    settings = get_settings()
+    size = audio_processing.source_size(source)
+
+    # Validate file size
+    if size < 1000:  # Arbitrary small size check
+        raise InvalidAudioError(f"Audio file is too small ({size} bytes). Please upload a valid audio recording.")
+    if size > settings.max_upload_bytes:
+        raise UploadTooLargeError(f"Audio file is too large ({size} bytes). The limit is {settings.max_upload_bytes} bytes.")
+
+    # Convert to audio array in memory
+    try:
+        audio = await executor.run_ffmpeg(audio_processing.convert_to_wav, source, settings.max_audio_seconds)
+    except audio_processing.AudioTooLongError as e:
+        raise UploadTooLargeError(f"{str(e)}. Please upload a shorter recording.")
+    except ValueError as e:
+        raise InvalidAudioError(str(e))
+
+    # Validate duration
+    duration_seconds = audio.duration_seconds
+    if duration_seconds < 0.5:  # Less than half a second is suspicious
+        raise InvalidAudioError(f"Audio duration too short ({duration_seconds:.2f}s). Please upload a valid audio recording.")
+
+    return audio
+
+
+async def transcribe_decoded(audio: AudioBuffer) -> Dict[str, Any]:
+    """
+    Transcribe a decoded answer in the inference pool
+
+    The latency policy picks the model before the job is queued, so the
+    decision sees the jobs ahead of it, and the job's inference time is fed
+    back into the policy's rolling RTF once it finishes.
+
+    Returns:
+        process_audio_with_segmentation's result, including 'policy'
+    """
+    decision = policy.decide(audio.duration_seconds)
+    result = await executor.run_inference(transcription.process_audio_with_segmentation, audio, decision)
+    policy.record(result, audio.duration_seconds)
+    return result
+
+
+def build_rating_pipeline(
+    content: audio_processing.AudioSource,
+    question: str,
+    job_description: str,
+    background: str = "",
+    stream_id: str = "",
+    llm_cleanup: Optional[bool] = None,
+) -> Pipeline:
+    """
+    Build the /rate DAG
+
+        decode -> transcribe -> clean --\\
+               \\-> analyze ------------+-> evaluate
+
+    Audio analysis only needs the decoded array, so it runs alongside Whisper.
+    Cleaning needs every segment, so it waits for transcription; seams are
+    merged locally and the LLM cleanup only runs when needs_llm_cleanup says so.
+    With EVALUATION_MODE=fused there is no clean stage: evaluate merges the
+    segments itself and makes a single LLM call, which also corrects the
+    transcript when cleanup is needed. Either way evaluate returns a dict with
+    'answer' and 'evaluation'.
+
+    When stream_id names a finished /transcribe/stream session whose audio is
+    as long as the upload, its transcript is reused and Whisper does not run
+    again.
+    """
+    async def decode(_: Dict[str, Any]):
+        return await decode_answer(content)
+
+    async def transcribe(inputs: Dict[str, Any]):
+        if stream_id:
+            streamed = await streaming_transcription.get_result(
+                stream_id, inputs["decode"], get_settings().stream_match_tolerance_seconds
+            )
+            if streamed is not None:
+                return streamed
+            logger.info(f"Stream {stream_id[:8]} not reused, transcribing the upload")
+        return await transcribe_decoded(inputs["decode"])
+
+    async def analyze(inputs: Dict[str, Any]):
+        return await executor.run_inference(audio_processing.analyze_audio, inputs["decode"])
+
+    async def clean(inputs: Dict[str, Any]):
+        return await clean_transcription(inputs["transcribe"], question, job_description, background, llm_cleanup)
+
+    async def evaluate(inputs: Dict[str, Any]):
+        audio_metrics = metrics_with_rate(inputs["analyze"], inputs["clean"])
+        result = await evaluation.evaluate_answer(question, inputs["clean"], audio_metrics, job_description)
+        return {"answer": inputs["clean"], "evaluation": result}
+
+    async def clean_and_evaluate(inputs: Dict[str, Any]):
+        return await fused_evaluation(inputs["transcribe"], inputs["analyze"], question, job_description, background, llm_cleanup)
+
+    pipeline = (
+        Pipeline("rate")
+        .add("decode", decode)
+        .add("transcribe", transcribe, deps=["decode"])
+        .add("analyze", analyze, deps=["decode"])
+    )
+    if get_settings().evaluation_mode == "fused":
+        return pipeline.add("evaluate", clean_and_evaluate, deps=["transcribe", "analyze"])
+    return (
+        pipeline
+        .add("clean", clean, deps=["transcribe"])
+        .add("evaluate", evaluate, deps=["clean", "analyze"])
+    )
+
+
+async def rate_answer_audio(
+    content: audio_processing.AudioSource,
+    question: str,
+    job_description: str,
+    background: str = "",
+    on_stage_complete: Optional[StageCallback] = None,
+    stream_id: str = "",
+    llm_cleanup: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Decode, transcribe, analyze and evaluate one recorded answer
+
+    Returns:
+        Dict with question, answer (cleaned transcript), evaluation,
+        per-stage timings in seconds and the transcription policy decision
+        (None when a streamed transcript was reused)
+    """
+    pipeline = build_rating_pipeline(content, question, job_description, background, stream_id, llm_cleanup)
+    results, timings = await pipeline.run(on_stage_complete)
+    return {
+        "question": question,
+        "answer": results["evaluate"]["answer"],
+        "evaluation": results["evaluate"]["evaluation"],
+        "timings": timings,
+        "policy": results["transcribe"].get("policy"),
+    }
+
+
+def _stage_event(name: str, result: Any) -> Dict[str, Any]:
+    """Client-facing payload for a finished /rate stage"""
+    if name == "decode":
+        return {"duration_seconds": round(result.duration_seconds, 2)}
+    if name == "clean":
+        return {"answer": result}
+    return dict(result)
+
+
+async def stream_rate_answer_audio(
+    content: audio_processing.AudioSource,
+    question: str,
+    job_description: str,
+    background: str = "",
+    stream_id: str = "",
+    llm_cleanup: Optional[bool] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Run the /rate pipeline and yield (event, payload) as each stage finishes
+
+    Events are 'decode', 'transcribe', 'analyze', 'clean' (separate evaluation
+    mode only) and 'evaluate' (answer and evaluation) in completion order, each with an 'elapsed' field, then 'result' with the same
+    body /rate returns. Stage errors are raised from the iterator; closing it
+    early cancels the pipeline.
+    """
+    queue: "asyncio.Queue[Optional[Tuple[str, Any, float]]]" = asyncio.Queue()
+
+    def on_stage_complete(name: str, result: Any, elapsed: float) -> None:
+        queue.put_nowait((name, result, elapsed))
+
+    task = asyncio.ensure_future(
+        rate_answer_audio(
+            content, question, job_description, background, on_stage_complete, stream_id=stream_id, llm_cleanup=llm_cleanup
+        )
+    )
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            name, result, elapsed = item
+            yield name, {**_stage_event(name, result), "elapsed": round(elapsed, 3)}
+        yield "result", task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def _error_payload(error: BaseException) -> Dict[str, Any]:
+    """Status and detail the single-answer endpoint would have returned for this error"""
+    return {
+        "status_code": getattr(error, "status_code", 500),
+        "detail": str(getattr(error, "detail", None) or error),
+    }
+
+
+async def rate_session(
+    answers: Sequence[Tuple[audio_processing.AudioSource, str]],
+    job_description: str,
+    background: str = "",
+    concurrency: Optional[int] = None,
+    llm_cleanup: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Rate every answer of an interview session, then summarize the session
+
+    Answers go through the same pipeline as /rate, at most `concurrency` at a
+    time; the shared pools still bound decoding, Whisper and OpenAI calls. A
+    failed answer is reported in its own result and left out of the summary.
+
+    Args:
+        answers: (audio, question) per answer, in interview order
+        job_description: Job context shared by all answers
+        background: Applicant background shared by all answers
+        concurrency: Answers in flight at once (defaults to SESSION_CONCURRENCY)
+        llm_cleanup: Per-request override of the transcript cleanup policy
+
+    Returns:
+        Dict with results (one per answer, in order), summary (None if no
+        answer could be rated) and timings
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(concurrency or settings.session_concurrency)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def rate_one(source: audio_processing.AudioSource, question: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await rate_answer_audio(source, question, job_description, background, llm_cleanup=llm_cleanup)
+
+    outcomes = await gather_branches({
+        str(index): rate_one(source, question) for index, (source, question) in enumerate(answers)
+    })
+    rated_seconds = loop.time() - start
+
+    results: List[Dict[str, Any]] = []
+    for index, (_, question) in enumerate(answers):
+        outcome = outcomes[str(index)]
+        if outcome.ok:
+            results.append({"index": index, **outcome.value})
+        else:
+            results.append({"index": index, "question": question, "error": _error_payload(outcome.error)})
+
+    evaluations = [result["evaluation"] for result in results if "evaluation" in result]
+    summary = await evaluation.summarize_feedback(evaluations) if evaluations else None
+    logger.info(f"Rated session of {len(answers)} answers ({len(evaluations)} succeeded) in {rated_seconds:.2f}s")
+
+    return {
+        "results": results,
+        "summary": summary,
+        "timings": {
+            "rate": round(rated_seconds, 3),
+            "summarize": round(loop.time() - start - rated_seconds, 3),
+            "total": round(loop.time() - start, 3),
+        },
+    }
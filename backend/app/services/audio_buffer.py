@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Optional, Sequence, Tuple, Union
+
+from . import frame_metrics
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class AudioBuffer:
+    """
+    Decoded mono audio: one contiguous float32 array and its sample rate
+
+    Segments taken with view() share the parent's memory, and pickling sends
+    only the samples a buffer covers. Frame energy and zero-crossing rate are
+    computed once per buffer and shared by the delivery metrics and VAD.
+    """
+
+    __slots__ = ("samples", "sample_rate", "_features")
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        samples = np.asarray(samples)
+        if samples.ndim != 1:
+            raise ValueError(f"AudioBuffer holds mono samples, got shape {samples.shape}")
+        if samples.dtype != np.float32 or not samples.flags.c_contiguous:
+            # Only non-float32 or strided input is copied
+            samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self._features: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_pcm(cls, data: BytesLike, sample_rate: int, sample_format: str = "f32le") -> "AudioBuffer":
+        """
+        Wrap raw little-endian PCM
+
+        f32le is wrapped without copying (the buffer keeps `data` alive);
+        s16le is scaled to [-1, 1) into a single float32 allocation.
+        """
+        if sample_format == "f32le":
+            return cls(np.frombuffer(data, dtype="<f4"), sample_rate)
+        if sample_format == "s16le":
+            ints = np.frombuffer(data, dtype="<i2")
+            samples = np.empty(len(ints), dtype=np.float32)
+            np.multiply(ints, np.float32(1.0 / 32768.0), out=samples)
+            return cls(samples, sample_rate)
+        raise ValueError(f"Unsupported PCM format: {sample_format}")
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __repr__(self) -> str:
+        return f"AudioBuffer({self.duration_seconds:.2f}s at {self.sample_rate} Hz)"
+
+    def __getstate__(self):
+        # Cached features are cheap to recompute and would double what a process pool pickles
+        return self.samples, self.sample_rate
+
+    def __setstate__(self, state) -> None:
+        self.samples, self.sample_rate = state
+        self._features = None
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    def view(self, start: int, end: int) -> "AudioBuffer":
+        """Samples [start, end) without copying"""
+        return AudioBuffer(self.samples[start:end], self.sample_rate)
+
+    def gather(self, ranges: Sequence[Tuple[int, int]]) -> "AudioBuffer":
+        """Sample ranges joined in order: a view for one range, one allocation otherwise"""
+        if len(ranges) == 1:
+            return self.view(*ranges[0])
+        samples = np.empty(sum(end - start for start, end in ranges), dtype=np.float32)
+        position = 0
+        for start, end in ranges:
+            samples[position:position + end - start] = self.samples[start:end]
+            position += end - start
+        return AudioBuffer(samples, self.sample_rate)
+
+    def frame_features(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(energy, zcr) per 50 ms frame of the normalized signal, computed once"""
+        if self._features is None:
+            frame_length = int(frame_metrics.WINDOW_SECONDS * self.sample_rate)
+            hop_length = int(frame_metrics.HOP_SECONDS * self.sample_rate)
+            # Analysis and VAD may race here; both compute the same values
+            self._features = frame_metrics.frame_features(self.samples, frame_length, hop_length)
+        return self._features
@@ -2,75 +2,236 @@ import os
 import numpy as np
 import ffmpeg
 import logging
-from typing import Union, Dict, List, Optional, Tuple, BinaryIO
-import io
+from typing import Union, Dict, List, Optional, BinaryIO
+import shutil
 import tempfile
+import threading
+from . import frame_metrics
+from .audio_buffer import AudioBuffer
+from ..utils import metrics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def convert_to_wav(audio_content: bytes) -> Dict[str, Union[np.ndarray, int]]:
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 4  # ffmpeg writes raw little-endian float32 (f32le)
+
+# Initial output buffer guess: decoded f32 PCM is roughly 16x a typical webm/opus upload
+_PCM_BYTES_PER_INPUT_BYTE = 16
+# Upper bound on that guess (about 17 minutes of audio); uncompressed uploads
+# such as WAV would otherwise preallocate 16x their size up front
+_MAX_INITIAL_PCM_BYTES = 64 << 20
+_READ_CHUNK_BYTES = 1 << 20
+_FEED_CHUNK_BYTES = 64 * 1024
+
+AudioSource = Union[bytes, BinaryIO]
+
+
+class AudioTooLongError(ValueError):
+    """Decoded audio exceeds the allowed duration"""
+
+
+def needs_seekable_input(head: bytes) -> bool:
+    """
+    True for containers ffmpeg cannot reliably decode from a pipe
+
+    MP4/MOV/M4A/3GP files may keep their index ('moov' atom) at the end of the
+    file, which a non-seekable stdin cannot reach.
+    """
+    return len(head) >= 8 and head[4:8] == b"ftyp"
+
+
+def source_size(source: AudioSource) -> int:
+    """Size in bytes of raw content or of a seekable file object"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def _head(source: AudioSource, count: int = 16) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:count])
+    head = source.read(count)
+    source.seek(0)
+    return head
+
+
+def _output_args():
+    return {"format": "f32le", "acodec": "pcm_f32le", "ac": 1, "ar": SAMPLE_RATE}
+
+
+def _read_pcm(stream: BinaryIO, capacity: int, max_bytes: Optional[int] = None) -> np.ndarray:
+    """
+    Read raw float32 PCM from a stream into one growable buffer
+
+    The returned array is a view over that buffer, so samples are never copied
+    after ffmpeg writes them.
+
+    Raises:
+        AudioTooLongError: as soon as more than max_bytes have been produced
+    """
+    capacity = min(capacity, _MAX_INITIAL_PCM_BYTES)
+    if max_bytes is not None:
+        capacity = min(capacity, max_bytes + BYTES_PER_SAMPLE)
+    buffer = bytearray(max(capacity, BYTES_PER_SAMPLE))
+    size = 0
+    while True:
+        if size == len(buffer):
+            # Grow geometrically; only happens when the initial guess was too small
+            buffer.extend(bytes(len(buffer)))
+        with memoryview(buffer) as view:
+            count = stream.readinto(view[size:size + _READ_CHUNK_BYTES])
+        if not count:
+            break
+        size += count
+        if max_bytes is not None and size > max_bytes:
+            raise AudioTooLongError(
+                f"Audio is longer than the allowed {max_bytes / (BYTES_PER_SAMPLE * SAMPLE_RATE):.0f} seconds"
+            )
+    # Shrinking a bytearray in place does not copy the kept prefix
+    del buffer[size - size % BYTES_PER_SAMPLE:]
+    return np.frombuffer(buffer, dtype="<f4")
+
+
+def _drain(stream: BinaryIO, sink: List[bytes]) -> None:
+    sink.append(stream.read())
+
+
+def _feed(stream: BinaryIO, source: AudioSource) -> None:
+    """Write raw content, or a file object chunk by chunk, to ffmpeg's stdin"""
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            stream.write(source)
+        else:
+            while True:
+                chunk = source.read(_FEED_CHUNK_BYTES)
+                if not chunk:
+                    break
+                stream.write(chunk)
+    except (BrokenPipeError, OSError, ValueError):
+        # ffmpeg exited early (or was stopped); its stderr explains why
+        pass
+    finally:
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+
+def _run_decoder(source: str, content: Optional[AudioSource], capacity: int, max_bytes: Optional[int] = None) -> np.ndarray:
+    """
+    Run ffmpeg on `source` ('pipe:' or a file path) and collect float32 PCM
+
+    When source is 'pipe:', content is written to ffmpeg's stdin from a helper
+    thread while stdout is read here, so neither side blocks the other.
     """
-    Convert audio content to WAV format in memory
+    use_stdin = source == "pipe:"
+    global_args = ["-hide_banner"] if use_stdin else ["-hide_banner", "-nostdin"]
+    stream = ffmpeg.input(source).output("pipe:", **_output_args()).global_args(*global_args)
+    process = stream.run_async(pipe_stdin=use_stdin, pipe_stdout=True, pipe_stderr=True)
+
+    stderr_chunks: List[bytes] = []
+    helpers = [threading.Thread(target=_drain, args=(process.stderr, stderr_chunks), daemon=True)]
+    if use_stdin:
+        helpers.append(threading.Thread(target=_feed, args=(process.stdin, content), daemon=True))
+    for helper in helpers:
+        helper.start()
+
+    try:
+        audio_array = _read_pcm(process.stdout, capacity, max_bytes)
+    except BaseException:
+        # Stop decoding right away instead of reading the rest of an oversized input
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+        for helper in helpers:
+            helper.join()
+
+    stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+    logger.debug(f"FFmpeg stderr: {stderr}")
+    if returncode != 0:
+        raise ffmpeg.Error("ffmpeg", b"", stderr.encode("utf-8"))
+    return audio_array
+
+
+def _decode_from_temp_file(source: AudioSource, suffix: str, capacity: int, max_bytes: Optional[int] = None) -> np.ndarray:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_in:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            temp_in.write(source)
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, temp_in, _FEED_CHUNK_BYTES)
+        temp_in_path = temp_in.name
+    try:
+        return _run_decoder(temp_in_path, None, capacity, max_bytes)
+    finally:
+        # Clean up the temporary file
+        if os.path.exists(temp_in_path):
+            os.unlink(temp_in_path)
+
+
+@metrics.timed("decode")
+def convert_to_wav(audio_content: AudioSource, max_duration_seconds: Optional[float] = None) -> AudioBuffer:
+    """
+    Decode audio content to 16 kHz mono float32 samples in memory
+    
+    Content is streamed to ffmpeg's stdin and raw f32le samples are read from
+    its stdout, so there is no temp file, header parsing or int16 conversion.
+    Containers that need seeking (MP4 family) go through a temp file, as does
+    a retry when pipe decoding fails.
     
     Args:
-        audio_content: Raw bytes of the audio file
+        audio_content: Raw bytes of the audio file, or a seekable binary file
+            object (e.g. UploadFile.file) that is read in chunks
+        max_duration_seconds: Stop and raise once this much audio has been decoded
     
     Returns:
-        Dict with 'array' (numpy array) and 'sampling_rate' (16000)
+        AudioBuffer at 16 kHz over the bytes ffmpeg wrote (no copy)
+    
+    Raises:
+        AudioTooLongError: if the audio exceeds max_duration_seconds
+        ValueError: if the content cannot be decoded
     """
     try:
+        size = source_size(audio_content)
+        
         # Validate input
-        if len(audio_content) < 1000:  # Arbitrary small size check
-            raise ValueError(f"Audio content is too small ({len(audio_content)} bytes), possibly corrupted")
+        if size < 1000:  # Arbitrary small size check
+            raise ValueError(f"Audio content is too small ({size} bytes), possibly corrupted")
         
-        logger.info(f"Processing audio content of size: {len(audio_content)} bytes")
+        logger.info(f"Processing audio content of size: {size} bytes")
+        capacity = size * _PCM_BYTES_PER_INPUT_BYTE
+        max_bytes = int(max_duration_seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE if max_duration_seconds else None
         
-        # Create a temporary file for input
-        # This is necessary because some audio formats can't be reliably processed through pipes
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_in:
-            temp_in.write(audio_content)
-            temp_in_path = temp_in.name
+        if needs_seekable_input(_head(audio_content)):
+            audio_array = _decode_from_temp_file(audio_content, ".mp4", capacity, max_bytes)
+        else:
+            try:
+                audio_array = _run_decoder("pipe:", audio_content, capacity, max_bytes)
+            except ffmpeg.Error as e:
+                logger.warning(f"Pipe decode failed, retrying from a temp file: {e.stderr.decode('utf-8', errors='replace')[-200:]}")
+                audio_array = _decode_from_temp_file(audio_content, ".webm", capacity, max_bytes)
         
-        try:
-            # Use ffmpeg with file input but pipe output
-            out, err = (
-                ffmpeg
-                .input(temp_in_path)
-                .output('pipe:', format='wav', acodec='pcm_s16le', ac=1, ar=16000)
-                .run(capture_stdout=True, capture_stderr=True)
-            )
-            
-            # Log ffmpeg output for debugging
-            logger.debug(f"FFmpeg stderr: {err.decode('utf-8', errors='replace')}")
-            
-            # Verify output size
-            if len(out) < 44:  # WAV header is 44 bytes
-                logger.error(f"FFmpeg produced invalid output (size: {len(out)} bytes)")
-                raise ValueError("FFmpeg produced invalid output, possibly due to unsupported audio format")
-                
-            # Convert to numpy array (skip the 44-byte WAV header)
-            audio_array = np.frombuffer(out[44:], np.int16).astype(np.float32) / 32768.0
-            
-            # Validate array size
-            if len(audio_array) < 16000:  # At least 1 second of audio at 16kHz
-                logger.warning(f"Audio array suspiciously small: {len(audio_array)} samples, expected at least 16000")
-                if len(audio_array) < 100:  # Arbitrary threshold for "too small"
-                    raise ValueError(f"Converted audio is too short ({len(audio_array)} samples), possibly corrupted")
-            
-            duration_seconds = len(audio_array) / 16000
-            logger.info(f"Successfully converted audio to numpy array, shape: {audio_array.shape}, duration: {duration_seconds:.2f}s")
-            
-            return {
-                "array": audio_array,
-                "sampling_rate": 16000
-            }
-        finally:
-            # Clean up the temporary file
-            if os.path.exists(temp_in_path):
-                os.unlink(temp_in_path)
+        # Validate array size
+        if len(audio_array) < SAMPLE_RATE:  # At least 1 second of audio at 16kHz
+            logger.warning(f"Audio array suspiciously small: {len(audio_array)} samples, expected at least {SAMPLE_RATE}")
+            if len(audio_array) < 100:  # Arbitrary threshold for "too small"
+                raise ValueError(f"Converted audio is too short ({len(audio_array)} samples), possibly corrupted")
+        
+        duration_seconds = len(audio_array) / SAMPLE_RATE
+        logger.info(f"Successfully converted audio to numpy array, shape: {audio_array.shape}, duration: {duration_seconds:.2f}s")
+        
+        return AudioBuffer(audio_array, SAMPLE_RATE)
                 
+    except AudioTooLongError as e:
+        logger.warning(f"Rejected audio: {str(e)}")
+        raise
     except ffmpeg.Error as e:
         stderr = e.stderr.decode('utf-8', errors='replace')
         logger.error(f"FFmpeg error: {stderr}")
@@ -79,41 +240,27 @@ def convert_to_wav(audio_content: bytes) -> Dict[str, Union[np.ndarray, int]]:
         logger.error(f"Failed to process audio: {str(e)}")
         raise ValueError(f"Failed to process audio: {str(e)}")
 
-def analyze_audio(audio_data: Union[str, Dict[str, Union[np.ndarray, int]]]) -> Dict[str, float]:
+@metrics.timed("features")
+def analyze_audio(audio: Union[str, AudioBuffer]) -> Dict[str, float]:
     """
     Extract audio features for analysis
     
     Args:
-        audio_data: Either a file path or a dict with 'array' and 'sampling_rate'
+        audio: Either a file path or a decoded AudioBuffer
     
     Returns:
-        Dict with audio metrics
+        Dict with audio metrics (energy, silence ratio and pause statistics)
     """
     try:
-        from pyAudioAnalysis import audioBasicIO, ShortTermFeatures
-        
-        if isinstance(audio_data, dict):
-            # Already have numpy array
-            x = audio_data["array"]
-            Fs = audio_data["sampling_rate"]
-        else:
+        if not isinstance(audio, AudioBuffer):
             # Load from file path
-            Fs, x = audioBasicIO.read_audio_file(audio_data)
-            x = x.astype(float)
-            if x.ndim > 1:
-                x = x.mean(axis=1)  # Convert to mono if stereo
+            with open(audio, "rb") as f:
+                audio = convert_to_wav(f.read())
         
-        if x is None or len(x) == 0:
+        if len(audio) == 0:
             raise Exception("Failed to read audio data or empty data.")
 
-        features, _ = ShortTermFeatures.feature_extraction(x, Fs, int(0.05 * Fs), int(0.025 * Fs))
-        avg_energy = float(np.mean(features[1]))  # Energy
-        silence_ratio = float(np.mean(features[0] < 0.01))  # Zero Crossing Rate threshold
-        
-        return {
-            "energy": avg_energy,
-            "silence_ratio": silence_ratio
-        }
+        return frame_metrics.compute_frame_metrics(audio.samples, audio.sample_rate, audio.frame_features())
     except Exception as e:
         logger.error(f"Audio analysis error: {str(e)}")
         raise
@@ -0,0 +1,193 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..config import get_settings
+from ..utils import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# decode_fn(windows, model_name, batch_size) -> texts, one per window
+DecodeFn = Callable[[List[np.ndarray], str, int], List[str]]
+
+
+class _WindowRequest:
+    __slots__ = ("window", "future", "enqueued_at")
+
+    def __init__(self, window: np.ndarray):
+        self.window = window
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class WhisperBatchScheduler:
+    """
+    Batches 30-second windows from all in-flight requests per model
+
+    Callers submit windows from any thread and wait on futures. One worker
+    thread per model collects up to max_batch_size windows, waiting at most
+    max_wait_ms after the oldest one arrived, runs them through decode_fn in a
+    single forward pass and resolves each future with its text.
+    """
+
+    def __init__(self, decode_fn: DecodeFn, max_batch_size: int = 8, max_wait_ms: float = 20.0):
+        self.decode_fn = decode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queues: Dict[str, "queue.Queue[Optional[_WindowRequest]]"] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._windows = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    def _queue_for(self, model_name: str) -> "queue.Queue[Optional[_WindowRequest]]":
+        with self._lock:
+            if model_name not in self._queues:
+                self._queues[model_name] = queue.Queue()
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(model_name, self._queues[model_name]),
+                    name=f"whisper-batcher-{model_name}",
+                    daemon=True,
+                )
+                self._threads[model_name] = thread
+                thread.start()
+            return self._queues[model_name]
+
+    def submit(self, model_name: str, windows: List[np.ndarray]) -> List[Future]:
+        """Queue windows for model_name and return one future per window"""
+        requests = [_WindowRequest(window) for window in windows]
+        model_queue = self._queue_for(model_name)
+        for request in requests:
+            model_queue.put(request)
+        return [request.future for request in requests]
+
+    def transcribe_windows(self, model_name: str, windows: List[np.ndarray]) -> List[str]:
+        """Blocking helper: submit windows and wait for their texts"""
+        return [future.result() for future in self.submit(model_name, windows)]
+
+    def _collect(self, model_queue: "queue.Queue[Optional[_WindowRequest]]", first: _WindowRequest) -> List[_WindowRequest]:
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = model_queue.get(timeout=remaining) if remaining > 0 else model_queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Shutdown sentinel: put it back so the worker exits after this batch
+                model_queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _worker(self, model_name: str, model_queue: "queue.Queue[Optional[_WindowRequest]]") -> None:
+        while True:
+            first = model_queue.get()
+            if first is None:
+                return
+            batch = self._collect(model_queue, first)
+            started = time.perf_counter()
+            waits = [started - request.enqueued_at for request in batch]
+            try:
+                texts = self.decode_fn([request.window for request in batch], model_name, len(batch))
+                for request, text in zip(batch, texts):
+                    request.future.set_result(text)
+            except Exception as e:
+                logger.error(f"Batched decode failed for {model_name}: {str(e)}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+            with self._stats_lock:
+                self._batches += 1
+                self._windows += len(batch)
+                self._queue_wait_total += sum(waits)
+                self._queue_wait_max = max(self._queue_wait_max, max(waits))
+            logger.debug(
+                f"Decoded batch of {len(batch)}/{self.max_batch_size} windows on {model_name} "
+                f"in {time.perf_counter() - started:.2f}s, max queue wait {max(waits) * 1000:.0f}ms"
+            )
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(model_queue.qsize() for model_queue in self._queues.values())
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for monitoring: batch fill ratio and queue wait"""
+        with self._stats_lock:
+            batches = self._batches
+            windows = self._windows
+            return {
+                "batches": batches,
+                "windows": windows,
+                "avg_batch_size": windows / batches if batches else 0.0,
+                "avg_fill_ratio": windows / (batches * self.max_batch_size) if batches else 0.0,
+                "avg_queue_wait_ms": 1000 * self._queue_wait_total / windows if windows else 0.0,
+                "max_queue_wait_ms": 1000 * self._queue_wait_max,
+                "queue_depth": self.queue_depth(),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            queues = list(self._queues.values())
+            threads = list(self._threads.values())
+            self._queues.clear()
+            self._threads.clear()
+        for model_queue in queues:
+            model_queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+_scheduler: Optional[WhisperBatchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Optional[WhisperBatchScheduler]:
+    """Shared scheduler, or None when WHISPER_BATCH_SCHEDULER is off"""
+    global _scheduler
+    settings = get_settings()
+    if not settings.whisper_batch_scheduler:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            from . import transcription
+            _scheduler = WhisperBatchScheduler(
+                transcription.decode_windows_batched,
+                max_batch_size=settings.whisper_scheduler_max_batch,
+                max_wait_ms=settings.whisper_scheduler_max_wait_ms,
+            )
+        return _scheduler
+
+
+def shutdown_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+            _scheduler = None
+
+
+@metrics.register_collector
+def _scheduler_metrics():
+    scheduler = _scheduler
+    if scheduler is None:
+        return
+    stats = scheduler.stats()
+    yield "mockinterview_whisper_scheduler_queue_depth", "gauge", "Windows waiting for a batched decode", [({}, stats["queue_depth"])]
+    yield "mockinterview_whisper_scheduler_batches_total", "counter", "Batched decodes run", [({}, stats["batches"])]
+    yield "mockinterview_whisper_scheduler_windows_total", "counter", "Windows decoded in batches", [({}, stats["windows"])]
+    yield "mockinterview_whisper_scheduler_fill_ratio", "gauge", "Average batch size over the maximum", [({}, stats["avg_fill_ratio"])]
+    yield "mockinterview_whisper_scheduler_queue_wait_ms", "gauge", "Average wait before a window was decoded", [({}, stats["avg_queue_wait_ms"])]
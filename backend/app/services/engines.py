@@ -0,0 +1,270 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+import whisper
+
+from ..config import get_settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Whisper sees at most 30 seconds per forward pass
+WINDOW_SAMPLES = 30 * SAMPLE_RATE
+
+Words = List[Dict[str, Any]]
+
+# model.transcribe's defaults for re-decoding a failed window
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+BEST_OF = 5
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def _words_from_segments(segments) -> Words:
+    return [
+        {"word": word["word"], "start": round(float(word["start"]), 3), "end": round(float(word["end"]), 3)}
+        for segment in segments
+        for word in segment.get("words", [])
+    ]
+
+
+def _needs_fallback(result: Any) -> bool:
+    """model.transcribe's test for a decode worth retrying at a higher temperature"""
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+        # Probably silence; a retry would only invent words
+        return False
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+class TranscriptionEngine:
+    """
+    One loaded speech-to-text model behind a runtime-independent interface
+
+    Engines take 16 kHz mono float32 samples. decode_windows() transcribes
+    windows of at most 30 seconds; engines that cannot batch them fall back to
+    one transcribe() call per window.
+    """
+
+    name = "base"
+    supports_batching = False
+    # Safe to load in a parent process and use in forked children (see ModelRegistry.load_shared)
+    fork_safe = True
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def transcribe(self, array: np.ndarray) -> str:
+        raise NotImplementedError
+
+    def transcribe_with_words(self, array: np.ndarray) -> Tuple[str, Words]:
+        """Text plus words with 'word', 'start' and 'end' in seconds from the start of array"""
+        raise NotImplementedError
+
+    def decode_windows(self, windows: List[np.ndarray], batch_size: int = 8) -> List[str]:
+        """Text per window ("" where no speech is detected)"""
+        return [self.transcribe(window).strip() for window in windows]
+
+    def warmup(self) -> None:
+        """One dummy pass so the first real request skips lazy initialization"""
+        self.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    def share_memory(self) -> None:
+        """Move weights to shared memory so forked workers never copy them"""
+
+
+class WhisperEngine(TranscriptionEngine):
+    """
+    openai-whisper in PyTorch (fp32 on CPU, fp16 on CUDA)
+
+    Every call holds the engine's inference lock. Whisper decoding installs
+    kv-cache hooks on the shared decoder modules, so two overlapping calls on
+    one model would read each other's keys and values. Different models
+    still run in parallel.
+    """
+
+    name = "openai"
+    supports_batching = True
+
+    def __init__(self, model_name: str, model: Any = None):
+        super().__init__(model_name)
+        self.model = model if model is not None else whisper.load_model(model_name)
+        self._inference_lock = threading.Lock()
+
+    @property
+    def _fp16(self) -> bool:
+        return getattr(self.model.device, "type", "cpu") == "cuda"
+
+    def transcribe(self, array: np.ndarray) -> str:
+        with self._inference_lock:
+            return self.model.transcribe(array, fp16=self._fp16)["text"]
+
+    def transcribe_with_words(self, array: np.ndarray) -> Tuple[str, Words]:
+        with self._inference_lock:
+            result = self.model.transcribe(array, word_timestamps=True, fp16=self._fp16)
+        return result["text"], _words_from_segments(result.get("segments", []))
+
+    def _decode(self, mel: torch.Tensor, temperature: float) -> List[Any]:
+        if temperature > 0:
+            options = whisper.DecodingOptions(
+                language="en", without_timestamps=True, fp16=self._fp16, temperature=temperature, best_of=BEST_OF
+            )
+        else:
+            options = whisper.DecodingOptions(language="en", without_timestamps=True, fp16=self._fp16)
+        with self._inference_lock:
+            return whisper.decode(self.model, mel, options)
+
+    def decode_windows(self, windows: List[np.ndarray], batch_size: int = 8) -> List[str]:
+        """
+        One encoder pass per batch of windows instead of one transcribe() per window
+
+        Like model.transcribe, a window whose text is too repetitive or too
+        unlikely is decoded again at the next temperature, and windows that
+        are probably silence are dropped. Each window is decoded on its own,
+        without the previous window's text as a prompt, so callers should only
+        batch windows that are whole segments.
+        """
+        n_mels = getattr(self.model.dims, "n_mels", 80)
+        texts = []
+        for batch_start in range(0, len(windows), batch_size):
+            batch = windows[batch_start:batch_start + batch_size]
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(window), n_mels=n_mels)
+                for window in batch
+            ]).to(self.model.device)
+            results = self._decode(mel, FALLBACK_TEMPERATURES[0])
+            for temperature in FALLBACK_TEMPERATURES[1:]:
+                retry = [index for index, result in enumerate(results) if _needs_fallback(result)]
+                if not retry:
+                    break
+                for index, result in zip(retry, self._decode(mel[retry], temperature)):
+                    results[index] = result
+            for result in results:
+                # Same silence test model.transcribe applies before keeping a window
+                if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                    texts.append("")
+                else:
+                    texts.append(result.text.strip())
+        return texts
+
+    def share_memory(self) -> None:
+        # Parameters and buffers only; int8 packed weights stay in private
+        # pages, which forked workers still share copy-on-write since
+        # inference never writes to them
+        self.model.share_memory()
+
+
+def quantize_whisper(model: Any) -> Any:
+    """
+    Dynamic int8 quantization of every linear layer (attention and MLP)
+
+    Weights are stored as int8 and activations are quantized on the fly, which
+    roughly halves CPU decode time on x86 with AVX2/AVX512-VNNI. Convolutions
+    and the token embedding stay fp32.
+    """
+    model = model.cpu().float()
+    # whisper's Linear subclass only adds dtype casting, which fp32 CPU inference
+    # does not need; quantize_dynamic only converts exact nn.Linear instances
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+            module.__class__ = torch.nn.Linear
+    # In place: deep-copying the model would also copy its sparse alignment_heads buffer
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """openai-whisper with int8 dynamically quantized linear layers, CPU only"""
+
+    name = "int8"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name, quantize_whisper(whisper.load_model(model_name, device="cpu")))
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """
+    CTranslate2 runtime through the optional faster-whisper package
+
+    Uses int8 weights on CPU by default (FASTER_WHISPER_COMPUTE_TYPE).
+    CTranslate2 keeps per-call decoder state, so concurrent calls need no lock.
+    """
+
+    name = "faster-whisper"
+    # CTranslate2 starts its thread pool when the model loads, which a fork cannot carry over
+    fork_safe = False
+
+    def __init__(self, model_name: str, compute_type: Optional[str] = None, cpu_threads: int = 0):
+        super().__init__(model_name)
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The faster-whisper engine needs the faster-whisper package (pip install faster-whisper)")
+        settings = get_settings()
+        self.compute_type = compute_type or settings.faster_whisper_compute_type
+        self.model = WhisperModel(model_name, device="cpu", compute_type=self.compute_type, cpu_threads=cpu_threads)
+
+    def _run(self, array: np.ndarray, word_timestamps: bool):
+        segments, _ = self.model.transcribe(
+            np.ascontiguousarray(array, dtype=np.float32),
+            language="en",
+            beam_size=1,
+            word_timestamps=word_timestamps,
+        )
+        # The generator does the decoding; consume it here
+        return list(segments)
+
+    def transcribe(self, array: np.ndarray) -> str:
+        return "".join(segment.text for segment in self._run(array, False))
+
+    def transcribe_with_words(self, array: np.ndarray) -> Tuple[str, Words]:
+        segments = self._run(array, True)
+        words = [
+            {"word": word.word, "start": round(float(word.start), 3), "end": round(float(word.end), 3)}
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+        return "".join(segment.text for segment in segments), words
+
+    def describe(self) -> str:
+        return f"{self.name}-{self.compute_type}:{self.model_name}"
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def set_torch_threads(num_threads: int) -> None:
+    """Intra-op threads for PyTorch inference in this process"""
+    torch.set_num_threads(max(1, num_threads))
+
+
+def engine_for(model_name: str) -> str:
+    """Engine configured for a model: WHISPER_MODEL_ENGINES entry, else WHISPER_ENGINE"""
+    settings = get_settings()
+    return settings.whisper_model_engines.get(model_name, settings.whisper_engine)
+
+
+def load_engine(model_name: str, engine: Optional[str] = None) -> TranscriptionEngine:
+    """
+    Load model_name with the given or configured engine
+
+    Raises:
+        ValueError: for an unknown engine name
+    """
+    engine = engine or engine_for(model_name)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{engine}' (expected one of {sorted(ENGINES)})")
+    logger.info(f"Loading {model_name} with the {engine} engine")
+    return ENGINES[engine](model_name)
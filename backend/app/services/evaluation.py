@@ -1,9 +1,36 @@
-import os
 import json
-from openai import OpenAI
+import threading
+from . import frame_metrics, llm
+from ..config import get_settings
+from ..utils.cache import TieredCache, build_cache, content_key, normalize_text
+from ..utils.concurrency import gather_branches
 from ..models.schemas import EvaluationResult
 
-def evaluate_answer(question, transcript, audio_metrics, job_description="Some technical job"):
+# Summaries are cached by content; bump the version whenever a summary prompt changes
+SUMMARY_MODEL = "gpt-4.1-mini"
+SUMMARY_PROMPT_VERSION = "1"
+
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache() -> TieredCache:
+    """Shared job-description/background summary cache, built from settings on first use"""
+    global _summary_cache
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            settings = get_settings()
+            _summary_cache = build_cache(
+                "summaries",
+                max_entries=settings.summary_cache_entries,
+                ttl_seconds=settings.summary_cache_ttl_seconds,
+                disk_path=settings.summary_cache_path,
+            )
+        return _summary_cache
+
+def _summary_key(kind, text):
+    return content_key(kind, SUMMARY_MODEL, SUMMARY_PROMPT_VERSION, normalize_text(text))
+
+async def evaluate_answer(question, transcript, audio_metrics, job_description="Some technical job"):
     """Evaluate interview answer using OpenAI"""
     prompt = f"""
     You are an interview answer evaluator helping me prepare for job interviews. Your goal is to rate my answer (1-10) and provide brief, constructive feedback to improve my chances of getting hired.
@@ -17,8 +44,7 @@ def evaluate_answer(question, transcript, audio_metrics, job_description="Some t
     - Delivery (inferred from energy/silence metrics; don't reference them directly)
 
     Metrics (for your context, not to be quoted):
-    - Energy: {audio_metrics['energy']:.2f}
-    - Silence Ratio: {audio_metrics['silence_ratio']:.2f}
+{_metrics_context(audio_metrics)}
 
     Return ONLY valid JSON in this format:
     {{
@@ -33,8 +59,8 @@ def evaluate_answer(question, transcript, audio_metrics, job_description="Some t
         - Note: Ignore any typos or errors in terminology in the answer as is this is a transcription that may contain errors.
     """
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
+    response = await llm.chat_completion(
+        operation="evaluate",
         model="gpt-4.1-mini",
         messages=[{"role": "user", "content": prompt}],
         response_format={"type": "json_object"}
@@ -43,16 +69,69 @@ def evaluate_answer(question, transcript, audio_metrics, job_description="Some t
     result_text = response.choices[0].message.content
     result_json = json.loads(result_text)
     
+    return _evaluation_result(result_json)
+
+def _metrics_context(audio_metrics):
+    return f"""    - Energy: {audio_metrics['energy']:.2f}
+    - Silence Ratio: {audio_metrics['silence_ratio']:.2f}
+    - Speaking Rate: {audio_metrics.get('speaking_rate_wpm', 0):.0f} words per minute
+    - Pauses over {frame_metrics.MIN_PAUSE_SECONDS}s: {audio_metrics.get('pause_count', 0)} (longest {audio_metrics.get('longest_pause_seconds', 0):.1f}s)"""
+
+def _evaluation_result(result_json):
     return EvaluationResult(
         rating=result_json["rating"],
         explanation=result_json["explanation"],
         suggestions=result_json["suggestions"]
     )
 
-def generate_interview_questions(job_title, job_description, background, interview_type, num_questions):
-
-    """Generate interview questions based on job description"""
+async def clean_and_evaluate_answer(transcriptions, question, audio_metrics, job_description="Some technical job", background=""):
+    """Merge and correct transcribed segments and evaluate the answer in one OpenAI call; returns (transcript, EvaluationResult)"""
     prompt = f"""
+    You are an interview answer evaluator helping me prepare for job interviews. My spoken answer was transcribed by an AI in independently transcribed segments that may overlap slightly at their edges. First merge and correct the transcript, then rate my answer (1-10) and provide brief, constructive feedback to improve my chances of getting hired.
+    Context:
+    - Job Description: "{job_description}"
+    - Interviewee Background: "{background}"
+
+    Transcript instructions:
+    - Merge the segments into a coherent, accurate transcript, removing words repeated at segment edges
+    - Correct transcription errors using the context provided
+    - Keep my own wording; do not improve the answer itself
+
+    Evaluate the corrected transcript based on:
+    - Accuracy (does it address the question?)
+    - Structure (clear, logical flow)
+    - Relevance (stays on topic)
+    - Delivery (inferred from energy/silence metrics; don't reference them directly)
+
+    Metrics (for your context, not to be quoted):
+{_metrics_context(audio_metrics)}
+
+    Return ONLY valid JSON in this format:
+    {{
+      "transcript": "The corrected, complete transcript",
+      "rating": 5,
+      "explanation": "Brief explanation of the rating",
+      "suggestions": "Clear suggestions for improvement"
+    }}
+
+    Question: "{question}"
+
+    Transcribed Segments: {transcriptions}
+    """
+
+    response = await llm.chat_completion(
+        operation="clean_and_evaluate",
+        model="gpt-4.1-mini",
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"}
+    )
+    
+    result_json = json.loads(response.choices[0].message.content)
+    
+    return result_json["transcript"], _evaluation_result(result_json)
+
+def _questions_prompt(job_title, job_description, background, interview_type, num_questions):
+    return f"""
     You are an expert interviewer helping prepare questions for a job interview.
     
     Job Title: {job_title}
@@ -69,9 +148,22 @@ def generate_interview_questions(job_title, job_description, background, intervi
     
     Format your response as a numbered list of {num_questions} questions only, with no additional text.
     """
+
+def _parse_question_line(line):
+    """Question text of one numbered-list line, or None for any other line"""
+    line = line.strip()
+    if line and (line[0].isdigit() or (len(line) > 2 and line[0:2].isdigit())):
+        # Remove the number and period at the beginning
+        return line.split('.', 1)[1].strip() if '.' in line else line
+    return None
+
+async def generate_interview_questions(job_title, job_description, background, interview_type, num_questions):
+
+    """Generate interview questions based on job description"""
+    prompt = _questions_prompt(job_title, job_description, background, interview_type, num_questions)
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
+    response = await llm.chat_completion(
+        operation="questions",
         model="gpt-4.1-mini",
         messages=[{"role": "user", "content": prompt}]
     )
@@ -81,16 +173,44 @@ def generate_interview_questions(job_title, job_description, background, intervi
     # Parse the numbered list into an array of questions
     questions = []
     for line in response_text.strip().split('\n'):
-        line = line.strip()
-        if line and (line[0].isdigit() or (len(line) > 2 and line[0:2].isdigit())):
-            # Remove the number and period at the beginning
-            question = line.split('.', 1)[1].strip() if '.' in line else line
+        question = _parse_question_line(line)
+        if question is not None:
             questions.append(question)
     
     return questions[:num_questions]  # Ensure we have exactly num_questions questions
 
-def summarize_job_description(job_description):
-    """Summarize job description to key bullet points"""
+async def stream_interview_questions(job_title, job_description, background, interview_type, num_questions):
+    """Yield interview questions one by one as each numbered line of the streamed completion finishes"""
+    prompt = _questions_prompt(job_title, job_description, background, interview_type, num_questions)
+    
+    buffer = ""
+    count = 0
+    async for delta in llm.stream_chat_completion(
+        operation="questions",
+        model="gpt-4.1-mini",
+        messages=[{"role": "user", "content": prompt}]
+    ):
+        buffer += delta
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            question = _parse_question_line(line)
+            if question is not None and count < num_questions:
+                count += 1
+                yield question
+    
+    # The last line has no trailing newline
+    question = _parse_question_line(buffer)
+    if question is not None and count < num_questions:
+        yield question
+
+async def summarize_job_description(job_description):
+    """Summarize job description to key bullet points (cached by normalized content)"""
+    cache = get_summary_cache()
+    key = _summary_key("job_description", job_description)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+    
     prompt = f"""
     You are a job description parser.
     
@@ -99,16 +219,24 @@ def summarize_job_description(job_description):
     Extract the key responsibilities and requirements from the job description. Format your response in as few sentences as possible.
     """
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
+    response = await llm.chat_completion(
+        operation="summarize_job",
+        model=SUMMARY_MODEL,
         messages=[{"role": "user", "content": prompt}]
     )
     
-    return response.choices[0].message.content
+    summary = response.choices[0].message.content
+    await cache.aset(key, summary)
+    return summary
 
-def summarize_background(background):
-    """Summarize resume or career background to key bullet points"""
+async def summarize_background(background):
+    """Summarize resume or career background to key bullet points (cached by normalized content)"""
+    cache = get_summary_cache()
+    key = _summary_key("background", background)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return cached
+    
     prompt = f"""
     You are a resume parser.
     
@@ -117,15 +245,17 @@ def summarize_background(background):
     Extract the key experiences and skills from the resume. Format your response in as few sentences as possible.
     """
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",
+    response = await llm.chat_completion(
+        operation="summarize_background",
+        model=SUMMARY_MODEL,
         messages=[{"role": "user", "content": prompt}]
     )
     
-    return response.choices[0].message.content
+    summary = response.choices[0].message.content
+    await cache.aset(key, summary)
+    return summary
 
-def summarize_feedback(feedback_items):
+async def summarize_feedback(feedback_items):
     """Summarize feedback from multiple interview answers"""
     # Calculate average score as percentage
     total_ratings = sum(item.rating for item in feedback_items)
@@ -154,22 +284,27 @@ def summarize_feedback(feedback_items):
      Respond with 3-5 concise bullet points only. No extra text.
     """
     
-    # Get strengths from OpenAI
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    strengths_response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[{"role": "user", "content": strengths_prompt}]
-    )
+    # Get strengths and areas for improvement from OpenAI concurrently
+    results = await gather_branches({
+        "strengths": llm.chat_completion(
+            operation="feedback_strengths",
+            model="gpt-4.1-mini",
+            messages=[{"role": "user", "content": strengths_prompt}]
+        ),
+        "improvements": llm.chat_completion(
+            operation="feedback_improvements",
+            model="gpt-4.1-mini",
+            messages=[{"role": "user", "content": improvements_prompt}]
+        ),
+    })
     
-    # Get areas for improvement from OpenAI
-    improvements_response = client.chat.completions.create(
-        model="gpt-4.1-mini",
-        messages=[{"role": "user", "content": improvements_prompt}]
-    )
+    # Return what we have if one side fails; only fail when both do
+    if not results["strengths"].ok and not results["improvements"].ok:
+        raise results["strengths"].error
     
     # Parse bullet points from responses
-    strengths_text = strengths_response.choices[0].message.content
-    improvements_text = improvements_response.choices[0].message.content
+    strengths_text = results["strengths"].value.choices[0].message.content if results["strengths"].ok else ""
+    improvements_text = results["improvements"].value.choices[0].message.content if results["improvements"].ok else ""
     
     # Extract bullet points
     strengths = [line.strip().lstrip('-').strip() for line in strengths_text.strip().split('\n') if line.strip()]
@@ -181,10 +316,10 @@ def summarize_feedback(feedback_items):
         "areas_for_improvement": improvements[:5]  # Ensure we have at most 5 areas
     }
 
-def clean_transcript(transcriptions, question, job_description, background=""):
+async def clean_transcript(transcriptions, question, job_description, background=""):
     """Clean and merge transcribed segments into a coherent transcript using OpenAI"""
     prompt = f"""
-    You are an expert in correcting AI-generated audio transcriptions. You will receive a list of independently transcribed audio segments, each overlapping by one second, representing a job interviewee's response. Utilize the provided context to accurately merge and correct the transcription.
+    You are an expert in correcting AI-generated audio transcriptions. You will receive a list of independently transcribed audio segments that may overlap slightly at their edges, representing a job interviewee's response. Utilize the provided context to accurately merge and correct the transcription.
 
     Context:
     Job Description: {job_description}
@@ -193,14 +328,14 @@ def clean_transcript(transcriptions, question, job_description, background=""):
     Transcribed Segments: {transcriptions}
 
     Instructions:
-    - Merge the segments into a coherent, accurate transcript
+    - Merge the segments into a coherent, accurate transcript, removing words repeated across a segment boundary only where they are duplicates
     - Correct any transcription errors using the context provided
     - Ensure the final transcript reflects the interviewee's intended response
     - Output only the corrected, complete transcript
     """
     
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
+    response = await llm.chat_completion(
+        operation="clean_transcript",
         model="gpt-4.1-mini",
         messages=[{"role": "user", "content": prompt}]
     )
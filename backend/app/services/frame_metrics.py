@@ -0,0 +1,165 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, Optional, Tuple
+
+# Same analysis grid the pyAudioAnalysis call used: 50 ms windows, 25 ms hop
+WINDOW_SECONDS = 0.05
+HOP_SECONDS = 0.025
+
+# Pauses shorter than this are treated as part of normal articulation
+MIN_PAUSE_SECONDS = 0.3
+
+# Frames normalized at a time by frame_features (about 3 MB of float64 at 16 kHz)
+BLOCK_FRAMES = 1024
+
+
+def frame_signal(x: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """
+    Frame a 1-D signal without copying
+
+    Args:
+        x: Signal
+        frame_length: Samples per frame
+        hop_length: Samples between frame starts
+
+    Returns:
+        Read-only (n_frames, frame_length) view; frames that would run past the
+        end are dropped, matching pyAudioAnalysis
+    """
+    if len(x) < frame_length:
+        return np.empty((0, frame_length), dtype=x.dtype)
+    return sliding_window_view(x, frame_length)[::hop_length]
+
+
+def normalize(x: np.ndarray) -> np.ndarray:
+    """Remove DC and scale to [-1, 1] the way pyAudioAnalysis does before feature extraction"""
+    x = np.asarray(x, dtype=np.float64) / (2.0 ** 15)
+    x -= x.mean()
+    x /= np.abs(x).max() + 1e-10
+    return x
+
+
+def normalization(x: np.ndarray) -> Tuple[float, float]:
+    """
+    (offset, scale) such that (x - offset) / scale equals normalize(x)
+
+    Computed with float64 accumulators instead of a float64 copy of x.
+    """
+    if len(x) == 0:
+        return 0.0, 1.0
+    offset = float(np.mean(x, dtype=np.float64))
+    peak = max(float(x.max()) - offset, offset - float(x.min()))
+    return offset, peak + 1e-10 * 2.0 ** 15
+
+
+def frame_energy(frames: np.ndarray) -> np.ndarray:
+    """Mean squared amplitude per frame"""
+    return np.einsum("ij,ij->i", frames, frames) / frames.shape[1]
+
+
+def frame_zcr(x: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """Zero-crossing rate per frame, (crossings / (frame_length - 1))"""
+    crossings = np.abs(np.diff(np.sign(x))) / 2
+    return frame_signal(crossings, frame_length - 1, hop_length).sum(axis=1) / (frame_length - 1)
+
+
+def frame_features(x: np.ndarray, frame_length: int, hop_length: int, block_frames: int = BLOCK_FRAMES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Energy and zero-crossing rate per frame of the normalized signal
+
+    Same values as frame_energy and frame_zcr on normalize(x), but only
+    block_frames frames are normalized at a time, so memory stays flat
+    instead of several float64 copies of the whole recording.
+
+    Returns:
+        Tuple of (energy, zcr), one value per frame
+    """
+    num_frames = (len(x) - frame_length) // hop_length + 1 if len(x) >= frame_length else 0
+    energy = np.empty(num_frames)
+    zcr = np.empty(num_frames)
+    offset, scale = normalization(x)
+    for first in range(0, num_frames, block_frames):
+        count = min(block_frames, num_frames - first)
+        start = first * hop_length
+        block = x[start:start + (count - 1) * hop_length + frame_length].astype(np.float64)
+        block -= offset
+        block /= scale
+        energy[first:first + count] = frame_energy(frame_signal(block, frame_length, hop_length))
+        zcr[first:first + count] = frame_zcr(block, frame_length, hop_length)
+    return energy, zcr
+
+
+def speech_mask(energy: np.ndarray, weight: float = 0.1) -> np.ndarray:
+    """
+    Classify frames as speech by an adaptive energy threshold
+
+    The threshold sits `weight` of the way between the mean of the quietest
+    and the loudest 10% of frames, so it follows the recording's noise floor.
+    """
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool)
+    ordered = np.sort(energy)
+    tail = max(1, len(ordered) // 10)
+    low = ordered[:tail].mean()
+    high = ordered[-tail:].mean()
+    return energy > low + weight * (high - low)
+
+
+def silence_runs(is_speech: np.ndarray) -> np.ndarray:
+    """Lengths, in frames, of the silent stretches between the first and last speech frame"""
+    speech_idx = np.flatnonzero(is_speech)
+    if len(speech_idx) == 0:
+        return np.zeros(0, dtype=np.int64)
+    inner = ~is_speech[speech_idx[0]:speech_idx[-1] + 1]
+    edges = np.diff(np.concatenate(([0], inner.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return ends - starts
+
+
+def compute_frame_metrics(
+    x: np.ndarray,
+    sampling_rate: int,
+    features: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Dict[str, float]:
+    """
+    Delivery metrics from short-term energy and zero-crossing rate
+
+    Args:
+        x: Mono signal
+        sampling_rate: Samples per second
+        features: (energy, zcr) from frame_features on the default grid, if
+            already computed (AudioBuffer.frame_features caches them)
+
+    Returns:
+        Dict with energy, zcr, silence_ratio, speech_seconds, pause_count,
+        longest_pause_seconds and mean_pause_seconds
+    """
+    frame_length = int(WINDOW_SECONDS * sampling_rate)
+    hop_length = int(HOP_SECONDS * sampling_rate)
+    energy, zcr = features if features is not None else frame_features(x, frame_length, hop_length)
+    if len(energy) == 0:
+        raise ValueError("Audio is shorter than one analysis frame")
+
+    is_speech = speech_mask(energy)
+
+    hop_seconds = hop_length / sampling_rate
+    pauses = silence_runs(is_speech) * hop_seconds
+    pauses = pauses[pauses >= MIN_PAUSE_SECONDS]
+
+    return {
+        "energy": float(energy.mean()),
+        "zcr": float(zcr.mean()),
+        "silence_ratio": float(1.0 - is_speech.mean()),
+        "speech_seconds": float(is_speech.sum() * hop_seconds),
+        "pause_count": int(len(pauses)),
+        "longest_pause_seconds": float(pauses.max()) if len(pauses) else 0.0,
+        "mean_pause_seconds": float(pauses.mean()) if len(pauses) else 0.0,
+    }
+
+
+def speaking_rate(transcript: str, speech_seconds: float) -> float:
+    """Words per minute of detected speech"""
+    if speech_seconds <= 0:
+        return 0.0
+    return len(transcript.split()) * 60.0 / speech_seconds
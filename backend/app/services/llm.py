@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+
+from ..config import Settings, get_settings
+from ..utils import executor, metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying; everything else (bad request, auth) fails immediately
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# App-lifetime client, created by init_client() from the FastAPI lifespan
+_client: Optional[AsyncOpenAI] = None
+_settings: Optional[Settings] = None
+
+
+def create_client(settings: Optional[Settings] = None, transport: Optional[httpx.AsyncBaseTransport] = None) -> AsyncOpenAI:
+    """
+    Build an AsyncOpenAI client backed by a keep-alive connection pool
+
+    Args:
+        settings: Pool sizes and timeouts (defaults to get_settings())
+        transport: Optional httpx transport, e.g. fake_transport() for offline runs
+
+    Returns:
+        AsyncOpenAI client with SDK retries disabled (chat_completion retries instead)
+    """
+    settings = settings or get_settings()
+    http_client = httpx.AsyncClient(
+        transport=transport,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds),
+    )
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key and transport is not None:
+        # Fake transports never look at the key
+        api_key = "offline"
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=settings.openai_base_url or None,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+def init_client(settings: Optional[Settings] = None, transport: Optional[httpx.AsyncBaseTransport] = None) -> Optional[AsyncOpenAI]:
+    """Create the shared client (called from the app lifespan)"""
+    global _client, _settings
+    _settings = settings or get_settings()
+    try:
+        _client = create_client(_settings, transport)
+    except Exception as e:
+        # Keep the API up without a key; calls will fail with a clear error instead
+        logger.warning(f"OpenAI client not initialized: {str(e)}")
+        _client = None
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_client() -> AsyncOpenAI:
+    global _client
+    if _client is None:
+        _client = create_client(_settings)
+    return _client
+
+
+def _retry_delay(attempt: int, error: Exception, settings: Settings) -> float:
+    """Exponential backoff with full jitter, honoring Retry-After when the server sends one"""
+    cap = settings.llm_retry_max_delay_seconds
+    delay = random.uniform(0, min(cap, settings.llm_retry_base_delay_seconds * (2 ** attempt)))
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        try:
+            if retry_after is not None:
+                delay = max(delay, min(cap, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+async def chat_completion(timeout: Optional[float] = None, operation: str = "chat", **kwargs) -> Any:
+    """
+    Create a chat completion on the shared client
+
+    Each attempt runs under the LLM pool's concurrency limit. Connection errors,
+    rate limits and 5xx responses are retried up to LLM_MAX_RETRIES times.
+
+    Args:
+        timeout: Per-call timeout in seconds (defaults to LLM_TIMEOUT_SECONDS)
+        operation: Label for latency and token metrics, e.g. "evaluate"
+        **kwargs: Forwarded to client.chat.completions.create
+
+    Returns:
+        ChatCompletion response
+    """
+    settings = _settings or get_settings()
+    client = get_client()
+    timeout = timeout if timeout is not None else settings.llm_timeout_seconds
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            response = await executor.run_llm(client.chat.completions.create, timeout=timeout, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            retry = attempt < settings.llm_max_retries
+            metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome="retry" if retry else "error")
+            if not retry:
+                raise
+            delay = _retry_delay(attempt, e, settings)
+            attempt += 1
+            metrics.LLM_RETRIES.inc(operation=operation)
+            logger.warning(f"OpenAI call failed ({type(e).__name__}), retry {attempt}/{settings.llm_max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        except Exception:
+            metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome="error")
+            raise
+        else:
+            metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome="ok")
+            metrics.record_llm_usage(operation, response)
+            return response
+
+
+async def stream_chat_completion(timeout: Optional[float] = None, operation: str = "chat", **kwargs) -> AsyncIterator[str]:
+    """
+    Stream a chat completion on the shared client, yielding content deltas
+
+    An LLM pool slot is held until the stream is exhausted. Opening the stream
+    is retried like chat_completion; once text has been yielded, errors are
+    raised to the caller.
+
+    Args:
+        timeout: Per-call timeout in seconds (defaults to LLM_TIMEOUT_SECONDS)
+        operation: Label for latency and token metrics
+        **kwargs: Forwarded to client.chat.completions.create
+
+    Yields:
+        Non-empty content fragments in order
+    """
+    settings = _settings or get_settings()
+    client = get_client()
+    timeout = timeout if timeout is not None else settings.llm_timeout_seconds
+    attempt = 0
+    while True:
+        async with executor.llm_slot():
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                stream = await client.chat.completions.create(stream=True, timeout=timeout, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= settings.llm_max_retries:
+                    metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+                    raise
+                delay = _retry_delay(attempt, e, settings)
+                metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome="retry")
+            else:
+                try:
+                    async for chunk in stream:
+                        # Only sent when the request asks for stream_options={"include_usage": True}
+                        metrics.record_llm_usage(operation, chunk)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                    outcome = "ok"
+                finally:
+                    metrics.LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+                return
+        attempt += 1
+        metrics.LLM_RETRIES.inc(operation=operation)
+        logger.warning(f"OpenAI stream failed to open, retry {attempt}/{settings.llm_max_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+def completion_payload(content: str, model: str = "") -> Dict[str, Any]:
+    """Response body in the shape of POST /v1/chat/completions"""
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def completion_chunks(content: str, model: str = "") -> List[Dict[str, Any]]:
+    """Streamed response events (one per word) in the shape of POST /v1/chat/completions with stream=true"""
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    pieces = re.findall(r"\S+\s*|\s+", content)
+    return [chunk({"role": "assistant", "content": ""})] + [chunk({"content": piece}) for piece in pieces] + [chunk({}, "stop")]
+
+
+def fake_transport(
+    reply: Union[str, Callable[[Dict[str, Any]], str]] = "",
+    latency: float = 0.0,
+    status_code: int = 200,
+) -> httpx.MockTransport:
+    """
+    Transport that answers chat completions locally, for offline runs
+
+    Install it before startup with `app.state.llm_transport = fake_transport(...)`,
+    or pass it to init_client() directly.
+
+    Args:
+        reply: Fixed message content, or a callable receiving the request JSON
+        latency: Seconds to wait before answering
+        status_code: HTTP status to return (use 429/500 to exercise retries)
+
+    Requests with stream=true are answered with one chunk per word.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        body = json.loads(request.content or b"{}")
+        if status_code != 200:
+            return httpx.Response(status_code, json={"error": {"message": "fake error", "type": "server_error"}})
+        content = reply(body) if callable(reply) else reply
+        if body.get("stream"):
+            events = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in completion_chunks(content, body.get("model", "")))
+            return httpx.Response(200, content=(events + "data: [DONE]\n\n").encode("utf-8"), headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json=completion_payload(content, body.get("model", "")))
+
+    return httpx.MockTransport(handler)
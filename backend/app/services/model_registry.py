@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .engines import ENGINES, engine_for, load_engine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Thread-safe home for loaded Whisper models
+
+    Each model is loaded exactly once (as a TranscriptionEngine, using the
+    engine configured for it), even when several requests ask for it at the
+    same time. preload() loads and warms a configured set of models; the
+    registry reports ready once that has finished.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_engine):
+        self._loader = loader
+        self._models: Dict[str, Any] = {}
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._status: Dict[str, str] = {}
+        self._ready = threading.Event()
+        self._error: Optional[str] = None
+
+    def _lock_for(self, model_name: str) -> threading.Lock:
+        with self._lock:
+            if model_name not in self._model_locks:
+                self._model_locks[model_name] = threading.Lock()
+            return self._model_locks[model_name]
+
+    def get(self, model_name: str) -> Any:
+        """Return the model, loading it under a per-model lock on first use"""
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+        with self._lock_for(model_name):
+            model = self._models.get(model_name)
+            if model is None:
+                logger.info(f"Loading Whisper model: {model_name}")
+                self._status[model_name] = "loading"
+                start = time.perf_counter()
+                model = self._loader(model_name)
+                self._models[model_name] = model
+                self._status[model_name] = "loaded"
+                logger.info(f"Loaded Whisper model {model.describe()} in {time.perf_counter() - start:.2f}s")
+            return model
+
+    def peek(self, model_name: str) -> Optional[Any]:
+        """The model if it is already loaded, without loading it"""
+        return self._models.get(model_name)
+
+    def warmup(self, model_name: str) -> None:
+        """Run one dummy forward pass so the first real request skips lazy initialization"""
+        model = self.get(model_name)
+        self._status[model_name] = "warming"
+        start = time.perf_counter()
+        model.warmup()
+        self._status[model_name] = "ready"
+        logger.info(f"Warmed up Whisper model {model_name} in {time.perf_counter() - start:.2f}s")
+
+    def preload(self, model_names: Iterable[str], warmup: bool = True) -> None:
+        """Load (and optionally warm) every model, then mark the registry ready"""
+        try:
+            for model_name in model_names:
+                self.get(model_name)
+                if warmup:
+                    self.warmup(model_name)
+                else:
+                    self._status[model_name] = "ready"
+            self._ready.set()
+        except Exception as e:
+            self._error = str(e)
+            logger.error(f"Model preload failed: {str(e)}")
+
+    def load_shared(self, model_names: Iterable[str]) -> List[str]:
+        """
+        Load models in a parent process so forked workers share the weights
+
+        Called before the server forks its workers, without warmup, so no
+        inference threads exist yet. Each worker inherits the loaded models,
+        and its own preload() then only warms them. Models whose engine is
+        not fork-safe are skipped and load in each worker instead.
+
+        Returns:
+            Names of the models loaded here
+        """
+        shared = []
+        for model_name in model_names:
+            engine = engine_for(model_name)
+            if engine in ENGINES and not ENGINES[engine].fork_safe:
+                logger.info(f"Not preloading {model_name} before fork: the {engine} engine loads in each worker")
+                continue
+            self.get(model_name).share_memory()
+            shared.append(model_name)
+        return shared
+
+    def preload_in_background(self, model_names: List[str], warmup: bool = True) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.preload,
+            args=(model_names, warmup),
+            name="whisper-preload",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "models": dict(self._status),
+            "engines": {name: model.describe() for name, model in list(self._models.items())},
+            "error": self._error,
+        }
+
+
+# Shared registry used by the transcription service
+registry = ModelRegistry()
@@ -0,0 +1,267 @@
+import logging
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from ..utils import executor, metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds of processing per second of recording on a typical 4-core CPU with
+# the openai engine, used until a model has been measured on this node
+DEFAULT_RTF = {
+    "tiny.en": 0.04,
+    "base.en": 0.1,
+    "small.en": 0.3,
+    "medium.en": 0.8,
+}
+UNKNOWN_MODEL_RTF = 0.5
+
+POLICY_DECISIONS = metrics.counter(
+    "mockinterview_policy_decisions_total",
+    "Transcription model choices by the latency policy",
+    ("model", "reason"),
+)
+
+
+class RtfTracker:
+    """
+    Rolling real-time factor per model
+
+    Each observation is one transcription job: recording length and the
+    seconds it spent in inference. A model's RTF is total inference time over
+    total audio for its last `window` jobs, so long answers weigh more than
+    short ones. Job durations across all models give the expected wait per
+    queued job.
+    """
+
+    def __init__(self, window: int = 50, priors: Optional[Dict[str, float]] = None):
+        self.window = max(1, window)
+        self.priors = {**DEFAULT_RTF, **(priors or {})}
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._jobs: Deque[float] = deque(maxlen=self.window)
+        self._lock = threading.Lock()
+
+    def observe(self, model_name: str, audio_seconds: float, inference_seconds: float) -> None:
+        if audio_seconds <= 0:
+            return
+        with self._lock:
+            samples = self._samples.setdefault(model_name, deque(maxlen=self.window))
+            samples.append((audio_seconds, inference_seconds))
+            self._jobs.append(inference_seconds)
+
+    def rtf(self, model_name: str) -> float:
+        """Measured RTF, or the prior while the model has no observations"""
+        with self._lock:
+            samples = self._samples.get(model_name)
+            if samples:
+                audio = sum(seconds for seconds, _ in samples)
+                return sum(elapsed for _, elapsed in samples) / audio
+        return self.priors.get(model_name, UNKNOWN_MODEL_RTF)
+
+    def measured(self, model_name: str) -> int:
+        with self._lock:
+            return len(self._samples.get(model_name, ()))
+
+    def mean_job_seconds(self) -> Optional[float]:
+        with self._lock:
+            return sum(self._jobs) / len(self._jobs) if self._jobs else None
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            models = set(self._samples) | set(self.priors)
+        return {model: {"rtf": self.rtf(model), "samples": self.measured(model)} for model in sorted(models)}
+
+
+class PolicyDecision:
+    """
+    Model and segmentation chosen for one answer, with the estimate behind it
+
+    reason is "headroom" (preferred model meets the SLO), "degraded" (a faster
+    model was needed to meet it), "over_slo" (no model meets it; the fastest
+    is used), "static" (WHISPER_POLICY=static) or "fixed" (model chosen by the
+    caller, see fixed()).
+    """
+
+    __slots__ = ("model", "segments", "estimated_seconds", "rtf", "queue_depth", "slo_seconds", "reason")
+
+    def __init__(
+        self,
+        model: str,
+        segments: Optional[int],
+        estimated_seconds: Optional[float],
+        rtf: Optional[float],
+        queue_depth: int,
+        slo_seconds: float,
+        reason: str,
+    ):
+        self.model = model
+        self.segments = segments
+        self.estimated_seconds = estimated_seconds
+        self.rtf = rtf
+        self.queue_depth = queue_depth
+        self.slo_seconds = slo_seconds
+        self.reason = reason
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "segments": self.segments,
+            "estimated_seconds": round(self.estimated_seconds, 2) if self.estimated_seconds is not None else None,
+            "rtf": round(self.rtf, 4) if self.rtf is not None else None,
+            "queue_depth": self.queue_depth,
+            "slo_seconds": self.slo_seconds,
+            "reason": self.reason,
+        }
+
+
+_tracker: Optional[RtfTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker() -> RtfTracker:
+    """Shared RTF tracker, built from settings on first use"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            settings = get_settings()
+            priors = {}
+            for model_name, value in settings.whisper_policy_rtf_priors.items():
+                try:
+                    priors[model_name] = float(value)
+                except ValueError:
+                    logger.warning(f"Ignoring non-numeric RTF prior for {model_name}: {value}")
+            _tracker = RtfTracker(settings.whisper_policy_window, priors)
+        return _tracker
+
+
+def fixed_segment_count(duration_seconds: float) -> int:
+    """Equal parts of at most FIXED_SEGMENT_SECONDS for fixed segmentation"""
+    return max(1, math.ceil(duration_seconds / get_settings().fixed_segment_seconds))
+
+
+def static_segment_count(duration_seconds: float) -> int:
+    """Equal parts by length for WHISPER_POLICY=static: 1 under a minute, 2 under two, 3 under five, else 5"""
+    if duration_seconds < 60:
+        return 1
+    if duration_seconds < 120:
+        return 2
+    if duration_seconds < 300:
+        return 3
+    return 5
+
+
+def candidate_models() -> List[str]:
+    """WHISPER_POLICY_MODELS, most accurate first; defaults to WHISPER_MODEL then WHISPER_LONG_MODEL"""
+    settings = get_settings()
+    models = settings.whisper_policy_models or [settings.whisper_model, settings.whisper_long_model]
+    return list(dict.fromkeys(models))
+
+
+def inference_queue_depth() -> Tuple[int, int]:
+    """(jobs running or queued in the inference pool, its worker count)"""
+    pool = executor.peek_pool(executor.INFERENCE)
+    if pool is None:
+        # Offline callers (rescore workers, benchmarks) never start the pools
+        return 0, 1
+    return pool.pending, pool.max_workers
+
+
+def decide(duration_seconds: float) -> PolicyDecision:
+    """
+    Pick the Whisper model and fixed segment count for an answer
+
+    A model's estimated latency is the wait for a free inference worker plus
+    duration x its rolling RTF. The wait is the jobs ahead of this one per
+    worker times the mean recent job time. The first model in
+    WHISPER_POLICY_MODELS whose estimate fits WHISPER_LATENCY_SLO_SECONDS is
+    used, so an idle node keeps the accurate model and a busy one moves long
+    answers to a faster model first, then shorter ones as the queue grows.
+
+    Call this before queueing the job, so queue_depth does not count it.
+    """
+    settings = get_settings()
+    slo = settings.whisper_latency_slo_seconds
+    fixed_mode = settings.segmentation_mode == "fixed"
+    pending, workers = inference_queue_depth()
+
+    if settings.whisper_policy == "static":
+        model_name = settings.whisper_model if duration_seconds < settings.whisper_long_seconds else settings.whisper_long_model
+        segments = static_segment_count(duration_seconds) if fixed_mode else None
+        POLICY_DECISIONS.inc(model=model_name, reason="static")
+        return PolicyDecision(model_name, segments, None, None, pending, slo, "static")
+
+    segments = fixed_segment_count(duration_seconds) if fixed_mode else None
+
+    tracker = get_tracker()
+    candidates = candidate_models()
+    jobs_ahead = max(0, pending - workers + 1)
+    mean_job = tracker.mean_job_seconds()
+
+    estimates = []
+    for model_name in candidates:
+        rtf = tracker.rtf(model_name)
+        compute = duration_seconds * rtf
+        # Before any job has been measured, assume queued jobs look like this one
+        wait = jobs_ahead * (mean_job if mean_job is not None else compute) / workers
+        estimates.append((model_name, rtf, wait + compute))
+
+    chosen = next((estimate for estimate in estimates if estimate[2] <= slo), None)
+    if chosen is None:
+        chosen = min(estimates, key=lambda estimate: estimate[2])
+        reason = "over_slo"
+    else:
+        reason = "headroom" if chosen[0] == candidates[0] else "degraded"
+    model_name, rtf, estimated = chosen
+
+    POLICY_DECISIONS.inc(model=model_name, reason=reason)
+    if reason != "headroom":
+        logger.info(
+            f"Policy chose {model_name} for {duration_seconds:.1f}s ({reason}): "
+            f"estimate {estimated:.1f}s vs SLO {slo:.1f}s with {pending} jobs in the inference pool"
+        )
+    return PolicyDecision(model_name, segments, estimated, rtf, pending, slo, reason)
+
+
+def fixed(model_name: str, duration_seconds: float) -> PolicyDecision:
+    """
+    Decision for a caller that picks its own model, bypassing the SLO
+
+    Offline jobs (the rescore CLI) have no latency target and never feed the
+    RTF tracker, so the adaptive policy would only downgrade long clips.
+    """
+    settings = get_settings()
+    segments = fixed_segment_count(duration_seconds) if settings.segmentation_mode == "fixed" else None
+    return PolicyDecision(model_name, segments, None, None, 0, settings.whisper_latency_slo_seconds, "fixed")
+
+
+def record(result: Dict[str, Any], duration_seconds: float) -> None:
+    """Feed a finished transcription's inference time back into the tracker"""
+    decision = result.get("policy") or {}
+    if decision.get("cached") or decision.get("inference_seconds") is None:
+        return
+    get_tracker().observe(result["model_used"], duration_seconds, decision["inference_seconds"])
+
+
+@metrics.register_collector
+def _policy_metrics():
+    tracker = _tracker
+    if tracker is None:
+        return
+    snapshot = tracker.snapshot()
+    yield (
+        "mockinterview_policy_rtf",
+        "gauge",
+        "Rolling real-time factor per model used by the latency policy",
+        [({"model": model}, values["rtf"]) for model, values in snapshot.items()],
+    )
+    yield (
+        "mockinterview_policy_rtf_samples",
+        "gauge",
+        "Jobs in each model's RTF window (0 while the prior is used)",
+        [({"model": model}, values["samples"]) for model, values in snapshot.items()],
+    )
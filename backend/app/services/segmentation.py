@@ -0,0 +1,162 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+from . import frame_metrics
+from .audio_buffer import AudioBuffer
+
+# Whisper sees at most 30 seconds per forward pass
+MAX_SEGMENT_SECONDS = 30.0
+
+# Pauses at least this long are cut out before inference
+MIN_SILENCE_SECONDS = 1.0
+
+# Audio kept on each side of a speech region so word onsets and tails survive
+PADDING_SECONDS = 0.2
+
+
+class SpeechSegment:
+    """
+    One Whisper window of speech
+
+    A segment is one or more (start, end) sample ranges of the original
+    signal. Ranges separated by dropped silence are joined, so short answers
+    with long pauses still fill a single window.
+    """
+
+    __slots__ = ("pieces",)
+
+    def __init__(self, pieces: List[Tuple[int, int]]):
+        self.pieces = pieces
+
+    @property
+    def start(self) -> int:
+        return self.pieces[0][0]
+
+    @property
+    def end(self) -> int:
+        return self.pieces[-1][1]
+
+    @property
+    def num_samples(self) -> int:
+        return sum(end - start for start, end in self.pieces)
+
+    def extract(self, audio: AudioBuffer) -> AudioBuffer:
+        """Samples of this segment (a view when it is a single range)"""
+        return audio.gather(self.pieces)
+
+    def to_dict(self, sampling_rate: int) -> Dict[str, float]:
+        """Timestamps in seconds of the original recording"""
+        return {
+            "start": round(self.start / sampling_rate, 2),
+            "end": round(self.end / sampling_rate, 2),
+            "speech_seconds": round(self.num_samples / sampling_rate, 2),
+        }
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """(start, end) frame indices of each run of True values, end exclusive"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def _split_region(start: int, end: int, energy: np.ndarray, is_speech: np.ndarray, max_frames: int) -> List[Tuple[int, int]]:
+    """
+    Cut a region longer than max_frames at pauses
+
+    Each cut goes in the middle of the longest quiet run in the second half of
+    the allowed span, or at its quietest frame when there is no pause at all.
+    """
+    parts = []
+    while end - start > max_frames:
+        low = start + max_frames // 2
+        high = start + max_frames
+        quiet = _runs(~is_speech[low:high])
+        if quiet:
+            quiet_start, quiet_end = max(quiet, key=lambda run: run[1] - run[0])
+            cut = low + (quiet_start + quiet_end) // 2
+        else:
+            cut = low + int(np.argmin(energy[low:high]))
+        cut = max(cut, start + 1)
+        parts.append((start, cut))
+        start = cut
+    parts.append((start, end))
+    return parts
+
+
+def vad_segments(
+    audio: AudioBuffer,
+    max_segment_seconds: float = MAX_SEGMENT_SECONDS,
+    min_silence_seconds: float = MIN_SILENCE_SECONDS,
+    padding_seconds: float = PADDING_SECONDS,
+) -> List[SpeechSegment]:
+    """
+    Split a recording into speech segments at detected pauses
+
+    Speech frames come from the same adaptive energy threshold as the delivery
+    metrics. Pauses shorter than min_silence_seconds stay inside a region;
+    longer ones are dropped. Regions longer than max_segment_seconds are cut
+    at their longest pause, and consecutive regions are packed into segments
+    of at most max_segment_seconds.
+
+    Args:
+        audio: Decoded recording; its cached frame energy is reused
+        max_segment_seconds: Upper bound on audio per segment
+        min_silence_seconds: Shortest pause that is removed before inference
+        padding_seconds: Audio kept around each region
+
+    Returns:
+        Segments in time order; empty when the recording is digital silence
+    """
+    sampling_rate = audio.sample_rate
+    frame_length = int(frame_metrics.WINDOW_SECONDS * sampling_rate)
+    hop_length = int(frame_metrics.HOP_SECONDS * sampling_rate)
+    num_samples = len(audio)
+
+    energy, _ = audio.frame_features()
+    if len(energy) == 0:
+        return [SpeechSegment([(0, num_samples)])] if num_samples else []
+
+    if not energy.any():
+        return []
+    is_speech = frame_metrics.speech_mask(energy)
+    if not is_speech.any():
+        # Flat energy: speech cannot be told from silence, so nothing is dropped
+        is_speech = np.ones(len(energy), dtype=bool)
+
+    # Close pauses too short to drop
+    gap_frames = max(1, int(round(min_silence_seconds / frame_metrics.HOP_SECONDS)))
+    regions: List[Tuple[int, int]] = []
+    for start, end in _runs(is_speech):
+        if regions and start - regions[-1][1] < gap_frames:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    pad_frames = int(round(padding_seconds / frame_metrics.HOP_SECONDS))
+    max_samples = int(max_segment_seconds * sampling_rate)
+    max_frames = max(1, (max_samples - frame_length) // hop_length - 2 * pad_frames)
+
+    # Frame ranges to padded sample ranges, each at most max_samples long
+    pieces: List[Tuple[int, int]] = []
+    for region_start, region_end in regions:
+        for start, end in _split_region(region_start, region_end, energy, is_speech, max_frames):
+            sample_start = max(0, (start - pad_frames) * hop_length)
+            sample_end = min(num_samples, (end - 1 + pad_frames) * hop_length + frame_length)
+            if pieces and sample_start < pieces[-1][1]:
+                sample_start = pieces[-1][1]
+            if sample_end > sample_start:
+                pieces.append((sample_start, sample_end))
+
+    # Pack consecutive pieces into as few segments as fit the window
+    segments: List[SpeechSegment] = []
+    current: List[Tuple[int, int]] = []
+    current_samples = 0
+    for start, end in pieces:
+        if current and current_samples + (end - start) > max_samples:
+            segments.append(SpeechSegment(current))
+            current, current_samples = [], 0
+        current.append((start, end))
+        current_samples += end - start
+    if current:
+        segments.append(SpeechSegment(current))
+    return segments
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import ffmpeg
+
+from . import audio_processing, transcription
+from .audio_buffer import AudioBuffer
+from ..utils import executor
+from ..utils.cache import content_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SegmentCallback = Callable[[int, str], Any]
+
+
+class StreamLimitError(ValueError):
+    """Streamed audio exceeded the configured byte or duration limit"""
+
+
+class StreamingTranscriber:
+    """
+    Incremental transcription of one recording as its chunks arrive
+
+    Chunks of a single webm/ogg stream are piped into one long-lived ffmpeg
+    process; a reader thread collects the float32 PCM it produces. Whenever
+    enough audio for the next window is available, that window (plus the same
+    overlap process_audio_with_segmentation uses) is transcribed. On finish()
+    only the last, partial window is left to transcribe.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "base.en",
+        window_seconds: float = 30.0,
+        overlap_seconds: float = transcription.SEGMENT_OVERLAP_SECONDS,
+        max_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        self.stream_id = uuid.uuid4().hex
+        self.model_name = model_name
+        self.sample_rate = audio_processing.SAMPLE_RATE
+        self.window_samples = int(window_seconds * self.sample_rate)
+        self.overlap_samples = int(overlap_seconds * self.sample_rate)
+        self.max_bytes = max_bytes
+        self.max_samples = int(max_seconds * self.sample_rate) if max_seconds else None
+        self.transcriptions: List[str] = []
+        self._pcm = bytearray()
+        self._pcm_lock = threading.Lock()
+        self._bytes_received = 0
+        self._process = None
+        self._reader: Optional[threading.Thread] = None
+        self._stderr: List[bytes] = []
+
+    def start(self) -> None:
+        self._process = (
+            ffmpeg
+            .input("pipe:")
+            .output("pipe:", format="f32le", acodec="pcm_f32le", ac=1, ar=self.sample_rate)
+            .global_args("-hide_banner")
+            .run_async(pipe_stdin=True, pipe_stdout=True, pipe_stderr=True)
+        )
+        self._reader = threading.Thread(target=self._read_stdout, name=f"stream-{self.stream_id[:8]}", daemon=True)
+        self._reader.start()
+        threading.Thread(target=lambda: self._stderr.append(self._process.stderr.read()), daemon=True).start()
+
+    def _read_stdout(self) -> None:
+        stdout = self._process.stdout
+        while True:
+            chunk = stdout.read1(64 * 1024)
+            if not chunk:
+                return
+            with self._pcm_lock:
+                self._pcm.extend(chunk)
+
+    @property
+    def decoded_samples(self) -> int:
+        with self._pcm_lock:
+            return len(self._pcm) // audio_processing.BYTES_PER_SAMPLE
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.decoded_samples / self.sample_rate
+
+    def _slice(self, start: int, end: int) -> AudioBuffer:
+        # Copy the window out so the reader thread can keep growing the buffer
+        bytes_per_sample = audio_processing.BYTES_PER_SAMPLE
+        with self._pcm_lock:
+            window = bytes(self._pcm[start * bytes_per_sample:end * bytes_per_sample])
+        return AudioBuffer.from_pcm(window, self.sample_rate)
+
+    def _write(self, chunk: bytes) -> None:
+        try:
+            self._process.stdin.write(chunk)
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass
+
+    async def feed(self, chunk: bytes) -> None:
+        """Pass the next encoded chunk to ffmpeg"""
+        self._bytes_received += len(chunk)
+        if self.max_bytes is not None and self._bytes_received > self.max_bytes:
+            raise StreamLimitError(f"Stream exceeds the limit of {self.max_bytes} bytes")
+        if self.max_samples is not None and self.decoded_samples > self.max_samples:
+            raise StreamLimitError(f"Stream is longer than the allowed {self.max_samples // self.sample_rate} seconds")
+        await asyncio.to_thread(self._write, chunk)
+
+    def _segment_range(self, index: int, total_samples: int) -> tuple:
+        start = max(0, index * self.window_samples - self.overlap_samples)
+        end = min(total_samples, (index + 1) * self.window_samples + self.overlap_samples)
+        return start, end
+
+    async def _transcribe_segment(self, index: int, start: int, end: int, on_segment: Optional[SegmentCallback]) -> None:
+        text = await executor.run_inference(transcription.transcribe_audio, self._slice(start, end), self.model_name)
+        if not text or text.strip() == "":
+            text = "[No speech detected]"
+        self.transcriptions.append(text)
+        logger.info(f"Stream {self.stream_id[:8]}: segment {index + 1} transcribed ({(end - start) / self.sample_rate:.1f}s)")
+        if on_segment is not None:
+            result = on_segment(index, text)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def transcribe_ready(self, on_segment: Optional[SegmentCallback] = None) -> int:
+        """
+        Transcribe every complete window (including its trailing overlap) decoded so far
+
+        Returns:
+            Number of windows transcribed by this call
+        """
+        count = 0
+        while True:
+            index = len(self.transcriptions)
+            needed = (index + 1) * self.window_samples + self.overlap_samples
+            available = self.decoded_samples
+            if available < needed:
+                return count
+            start, end = self._segment_range(index, available)
+            await self._transcribe_segment(index, start, end, on_segment)
+            count += 1
+
+    async def finish(self, on_segment: Optional[SegmentCallback] = None) -> Dict[str, Any]:
+        """
+        Close the input, transcribe what is left and return the full result
+
+        Returns:
+            Dict shaped like process_audio_with_segmentation's result, plus
+            stream_id and audio_duration_seconds
+        """
+        await asyncio.to_thread(self._close_stdin)
+        await asyncio.to_thread(self._reader.join)
+        returncode = await asyncio.to_thread(self._process.wait)
+        if returncode != 0 and self.decoded_samples == 0:
+            stderr = b"".join(self._stderr).decode("utf-8", errors="replace")
+            raise ValueError(f"FFmpeg conversion failed: {stderr}")
+
+        await self.transcribe_ready(on_segment)
+
+        # Only the last, partial window remains
+        total = self.decoded_samples
+        index = len(self.transcriptions)
+        if total > index * self.window_samples:
+            start, end = self._segment_range(index, total)
+            await self._transcribe_segment(index, start, end, on_segment)
+
+        return {
+            "stream_id": self.stream_id,
+            "transcriptions": list(self.transcriptions),
+            "model_used": self.model_name,
+            "segments_used": len(self.transcriptions),
+            "audio_duration_seconds": round(total / self.sample_rate, 2),
+            # Windows overlap like fixed segmentation, whatever SEGMENTATION_MODE says
+            "segmentation": "fixed",
+        }
+
+    def _close_stdin(self) -> None:
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def close(self) -> None:
+        """Stop ffmpeg if the session ends early"""
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+
+
+def stream_cache_key(stream_id: str) -> str:
+    return content_key("stream", stream_id)
+
+
+async def store_result(result: Dict[str, Any]) -> None:
+    """Keep a finished stream's transcription so /rate can reuse it by stream_id"""
+    await transcription.get_transcription_cache().aset(stream_cache_key(result["stream_id"]), {
+        "transcriptions": result["transcriptions"],
+        "model_used": result["model_used"],
+        "segments_used": result["segments_used"],
+        "audio_duration_seconds": result["audio_duration_seconds"],
+        "segmentation": result["segmentation"],
+    })
+
+
+async def get_result(stream_id: str, audio: AudioBuffer, tolerance_seconds: float) -> Optional[Dict[str, Any]]:
+    """
+    A finished stream's transcription, if it covers the uploaded audio
+
+    The stream and the upload are decoded separately, so they are compared
+    by length. A stream that dropped chunks, or a stale or reused stream_id,
+    gives None and the upload is transcribed instead.
+    """
+    cached = await transcription.get_transcription_cache().aget(stream_cache_key(stream_id))
+    if cached is None:
+        logger.info(f"Stream {stream_id[:8]} not found")
+        return None
+    streamed_seconds = cached.get("audio_duration_seconds")
+    if streamed_seconds is None or abs(streamed_seconds - audio.duration_seconds) > tolerance_seconds:
+        logger.warning(
+            f"Stream {stream_id[:8]} covered {streamed_seconds}s but the upload is "
+            f"{audio.duration_seconds:.2f}s; not reusing its transcript"
+        )
+        return None
+    return dict(cached)
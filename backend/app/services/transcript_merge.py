@@ -0,0 +1,157 @@
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+NO_SPEECH = "[No speech detected]"
+
+# Rough speaking rate used to size the alignment window around each seam
+WORDS_PER_SECOND = 2.5
+
+# Fewer shared words than this is treated as no alignment at all
+MIN_MATCH_WORDS = 2
+
+# Words Whisper may garble or drop at a cut, between the overlap and the segment edge
+EDGE_SLACK_WORDS = 3
+
+_PUNCTUATION = re.compile(r"[^\w']+")
+
+
+def normalize_word(word: str) -> str:
+    """Lowercase and strip punctuation so 'Python,' aligns with 'python'"""
+    return _PUNCTUATION.sub("", word.lower())
+
+
+class MergeResult:
+    """Merged transcript with a confidence in [0, 1] per seam and overall (the weakest seam)"""
+
+    __slots__ = ("text", "seams")
+
+    def __init__(self, text: str, seams: List[float]):
+        self.text = text
+        self.seams = seams
+
+    @property
+    def confidence(self) -> float:
+        return min(self.seams) if self.seams else 1.0
+
+
+def _edge_matches(tail: List[str], head: List[str], min_size: int):
+    """
+    Common runs that end near the end of tail and start near the start of head
+
+    Yields (a, b, size, slack): the run is tail[a:a + size] == head[b:b + size],
+    and slack counts the words between the run and the two edges.
+    """
+    for a in range(len(tail)):
+        for b in range(min(len(head), EDGE_SLACK_WORDS + 1)):
+            size = 0
+            while a + size < len(tail) and b + size < len(head) and tail[a + size] == head[b + size]:
+                size += 1
+            tail_slack = len(tail) - a - size
+            if size >= min_size and tail_slack <= EDGE_SLACK_WORDS:
+                yield a, b, size, tail_slack + b
+
+
+def _align_seam(left: List[str], right: List[str], window: int, expected: int):
+    """
+    Join two word lists whose edges transcribe the same audio
+
+    The last `window` words of left are aligned with the first `window` words
+    of right. The overlap must be a common run at the seam: ending within
+    EDGE_SLACK_WORDS of the end of left and starting within EDGE_SLACK_WORDS
+    of the start of right, and at least half as long as the overlap should
+    be. The join point is its middle, so words Whisper garbled at either cut
+    are dropped. Confidence falls with the words left between the run and
+    the edges; without such a run the lists are joined as they are at 0.0.
+
+    Returns:
+        Tuple of (merged words, seam confidence)
+    """
+    tail = [normalize_word(word) for word in left[-window:]]
+    head = [normalize_word(word) for word in right[:window]]
+    min_size = max(MIN_MATCH_WORDS, math.ceil(expected / 2))
+    best = None
+    for a, b, size, slack in _edge_matches(tail, head, min_size):
+        coverage = min(1.0, size / max(1, min(expected, len(tail), len(head))))
+        confidence = coverage * (1.0 - slack / (2 * EDGE_SLACK_WORDS + 2))
+        if best is None or confidence > best[0]:
+            best = (confidence, a, b, size)
+    if best is None:
+        return left + right, 0.0
+    confidence, a, b, size = best
+    half = size // 2
+    cut_left = len(left) - len(tail) + a + half
+    cut_right = b + half
+    return left[:cut_left] + right[cut_right:], confidence
+
+
+def _merge_by_timestamps(words: Sequence[List[Dict[str, Any]]], starts: Sequence[float], ends: Sequence[float]) -> List[str]:
+    """Keep each word from the segment whose half of the overlap it falls in"""
+    merged = []
+    for i, segment_words in enumerate(words):
+        low = (starts[i] + ends[i - 1]) / 2 if i > 0 else float("-inf")
+        high = (starts[i + 1] + ends[i]) / 2 if i + 1 < len(words) else float("inf")
+        for word in segment_words:
+            midpoint = starts[i] + (word["start"] + word["end"]) / 2
+            if low <= midpoint < high:
+                merged.append(word["word"].strip())
+    return [word for word in merged if word]
+
+
+def merge_transcriptions(
+    transcriptions: Sequence[str],
+    overlap_seconds: float = 0.0,
+    words: Optional[Sequence[List[Dict[str, Any]]]] = None,
+    segments: Optional[Sequence[Dict[str, float]]] = None,
+) -> MergeResult:
+    """
+    Merge per-segment transcriptions into one transcript
+
+    Segments cut with overlap repeat a few words at every seam. With word
+    timestamps (relative to each segment) and segment start/end times, each
+    word is kept from one side of the overlap's midpoint. Otherwise the seam is
+    found by word-level sequence alignment. Segments without overlap are joined
+    as they are.
+
+    Args:
+        transcriptions: Text per segment, in order
+        overlap_seconds: Overlap added on each side of every inner boundary
+        words: Optional word lists per segment with 'word', 'start' and 'end'
+        segments: Optional 'start'/'end' per segment in seconds
+
+    Returns:
+        MergeResult with the text and per-seam confidence
+    """
+    kept = [i for i, text in enumerate(transcriptions) if text and text.strip() and text.strip() != NO_SPEECH]
+    if not kept:
+        return MergeResult(NO_SPEECH, [])
+
+    if overlap_seconds <= 0:
+        return MergeResult(" ".join(transcriptions[i].strip() for i in kept), [1.0] * (len(kept) - 1))
+
+    if words is not None and segments is not None and len(kept) == len(transcriptions):
+        merged_words = _merge_by_timestamps(
+            words, [segment["start"] for segment in segments], [segment["end"] for segment in segments]
+        )
+        return MergeResult(" ".join(merged_words), [1.0] * (len(kept) - 1))
+
+    # Both sides of a seam repeat roughly 2 * overlap_seconds of audio
+    expected = max(MIN_MATCH_WORDS, int(round(2 * overlap_seconds * WORDS_PER_SECOND)))
+    window = 2 * expected + 4
+    merged_words = transcriptions[kept[0]].split()
+    seams = []
+    for previous, current in zip(kept, kept[1:]):
+        if current != previous + 1:
+            # A silent segment sits between them, so their edges do not overlap
+            merged_words += transcriptions[current].split()
+            seams.append(1.0)
+            continue
+        merged_words, confidence = _align_seam(merged_words, transcriptions[current].split(), window, expected)
+        seams.append(confidence)
+    return MergeResult(" ".join(merged_words), seams)
+
+
+def merge_result(result: Dict[str, Any], overlap_seconds: float) -> MergeResult:
+    """Merge a process_audio_with_segmentation result, honoring its segmentation mode"""
+    overlap = overlap_seconds if result.get("segmentation", "fixed") == "fixed" else 0.0
+    return merge_transcriptions(result["transcriptions"], overlap, result.get("words"), result.get("segments"))
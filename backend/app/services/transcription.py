@@ -1,31 +1,121 @@
-import whisper
-import os
+import hashlib
+import threading
 import time
 import numpy as np
-from typing import Union, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-from pydub import AudioSegment
+from . import batching, engines, policy, segmentation
+from .audio_buffer import AudioBuffer
+from .model_registry import registry
+from ..config import get_settings
+from ..utils import metrics
+from ..utils.cache import TieredCache, build_cache, content_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Dictionary to store loaded models
-whisper_models = {}
+# Overlap added around inner segment boundaries
+SEGMENT_OVERLAP_SECONDS = 1.0
 
-def get_model(model_name="tiny.en"):
-    """Get or load the specified Whisper model"""
-    if model_name not in whisper_models:
-        logger.info(f"Loading Whisper model: {model_name}")
-        whisper_models[model_name] = whisper.load_model(model_name)
-    return whisper_models[model_name]
+_transcription_cache = None
+_transcription_cache_lock = threading.Lock()
 
-def transcribe_audio(audio_data: Dict[str, Union[np.ndarray, int]], model_name="tiny.en") -> str:
+def get_transcription_cache() -> TieredCache:
+    """Shared transcription result cache, built from settings on first use"""
+    global _transcription_cache
+    with _transcription_cache_lock:
+        if _transcription_cache is None:
+            settings = get_settings()
+            _transcription_cache = build_cache(
+                "transcriptions",
+                max_entries=settings.transcription_cache_entries,
+                ttl_seconds=settings.transcription_cache_ttl_seconds,
+                disk_path=settings.transcription_cache_path,
+                max_memory_bytes=settings.transcription_cache_max_bytes,
+                max_disk_bytes=settings.transcription_cache_max_disk_bytes,
+            )
+        return _transcription_cache
+
+def audio_fingerprint(array: np.ndarray) -> str:
+    """Hash of the decoded PCM samples, independent of the upload's container or encoder"""
+    samples = np.ascontiguousarray(array, dtype=np.float32)
+    return hashlib.blake2b(memoryview(samples).cast("B"), digest_size=16).hexdigest()
+
+def transcription_cache_key(fingerprint: str, sample_rate: int, model_name: str, segmentation_key: str, batched: bool) -> str:
+    """Cache key covering everything that changes the transcription output"""
+    return content_key(
+        fingerprint,
+        sample_rate,
+        model_name,
+        segmentation_key,
+        "batched" if batched else "loop",
+    )
+
+def uses_batching(engine: engines.TranscriptionEngine, num_segments: int, word_timestamps: bool) -> bool:
+    """Whether engine decodes this answer's segments in batches"""
+    # The cross-request scheduler batches every window; otherwise only multi-segment audio is
+    # batched. Either way only segments of at most 30 seconds share a decode.
+    settings = get_settings()
+    return engine.supports_batching and (
+        batching.get_scheduler() is not None
+        or (num_segments > 1 and settings.whisper_batched_decode and not word_timestamps)
+    )
+
+def cache_key_for(
+    engine: engines.TranscriptionEngine,
+    fingerprint: str,
+    sample_rate: int,
+    segmentation_key: str,
+    num_segments: int,
+    word_timestamps: bool,
+) -> str:
+    """Cache key for engine's transcription of the fingerprinted audio"""
+    return transcription_cache_key(
+        fingerprint,
+        sample_rate,
+        engine.describe(),
+        segmentation_key,
+        uses_batching(engine, num_segments, word_timestamps),
+    )
+
+def find_cached(
+    cache: TieredCache,
+    fingerprint: str,
+    sample_rate: int,
+    model_name: str,
+    segmentation_key: str,
+    num_segments: int,
+    word_timestamps: bool,
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up an earlier transcription of this audio by any loaded model
+
+    The policy may pick a different model for the same audio as load
+    changes, e.g. between /transcribe and a later /rate. Models are tried
+    most accurate first (WHISPER_POLICY_MODELS order), then model_name, and
+    the whole lookup counts as one cache hit or miss. Models that are not
+    loaded are skipped rather than loaded.
+    """
+    keys = []
+    for candidate in dict.fromkeys(policy.candidate_models() + [model_name]):
+        engine = registry.peek(candidate)
+        if engine is not None:
+            keys.append(cache_key_for(engine, fingerprint, sample_rate, segmentation_key, num_segments, word_timestamps))
+    _, cached = cache.get_first(keys)
+    return cached
+
+def get_model(model_name="tiny.en") -> engines.TranscriptionEngine:
+    """Get or load the engine for a Whisper model (loaded once, thread-safe)"""
+    return registry.get(model_name)
+
+@metrics.timed("whisper_segment")
+def transcribe_audio(audio: AudioBuffer, model_name="tiny.en") -> str:
     """
     Transcribe audio using Whisper with in-memory processing
     
     Args:
-        audio_data: Dictionary with 'array' (numpy array) and 'sampling_rate' (int) keys
+        audio: 16 kHz samples (a whole answer or a view of one segment)
         model_name: Name of the Whisper model to use (tiny.en or base.en)
     
     Returns:
@@ -35,74 +125,233 @@ def transcribe_audio(audio_data: Dict[str, Union[np.ndarray, int]], model_name="
         model = get_model(model_name)
         
         # Validate input format
-        if not isinstance(audio_data, dict) or 'array' not in audio_data or 'sampling_rate' not in audio_data:
-            raise ValueError("Audio data must be a dictionary with 'array' and 'sampling_rate' keys")
+        if not isinstance(audio, AudioBuffer):
+            raise ValueError("Audio must be an AudioBuffer")
 
-        result = model.transcribe(audio_data['array'])
+        text = model.transcribe(audio.samples)
+        metrics.AUDIO_SECONDS.inc(audio.duration_seconds, model=model_name)
             
-        return result["text"]
+        return text
     except Exception as e:
         logger.error(f"Transcription error: {str(e)}")
         raise
 
-def process_audio_with_segmentation(audio_data, duration_seconds):
+@metrics.timed("whisper_segment")
+def transcribe_audio_with_words(audio: AudioBuffer, model_name="tiny.en") -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Transcribe audio and return word timestamps alongside the text
+    
+    Args:
+        audio: 16 kHz samples
+        model_name: Name of the Whisper model to use
+    
+    Returns:
+        Tuple of (text, words with 'word', 'start' and 'end' in seconds from the start of the audio)
+    """
+    model = get_model(model_name)
+    text, words = model.transcribe_with_words(audio.samples)
+    metrics.AUDIO_SECONDS.inc(audio.duration_seconds, model=model_name)
+    return text, words
+
+def segment_bounds(num_samples: int, sample_rate: int, num_segments: int, overlap_seconds: float = SEGMENT_OVERLAP_SECONDS) -> List[Tuple[int, int]]:
+    """
+    Split a signal into equal segments that overlap their neighbours
+    
+    Args:
+        num_samples: Length of the signal in samples
+        sample_rate: Samples per second
+        num_segments: Number of segments to produce
+        overlap_seconds: Overlap added on each side of every inner boundary
+    
+    Returns:
+        List of (start_idx, end_idx) sample ranges
+    """
+    segment_length = num_samples // num_segments
+    overlap_samples = int(overlap_seconds * sample_rate)
+    bounds = []
+    for i in range(num_segments):
+        start_idx = max(0, i * segment_length - overlap_samples)
+        end_idx = min(num_samples, (i + 1) * segment_length + overlap_samples)
+        bounds.append((start_idx, end_idx))
+    return bounds
+
+@metrics.timed("whisper_batch")
+def decode_windows_batched(windows: List[np.ndarray], model_name="tiny.en", batch_size: int = 8) -> List[str]:
     """
-    Process audio with automatic model selection and segmentation based on duration
+    Decode up to 30-second windows together, one encoder pass per batch
+    
+    Engines without batched decoding transcribe the windows one by one.
     
     Args:
-        audio_data: Dictionary with 'array' and 'sampling_rate' keys
-        duration_seconds: Duration of the audio in seconds
+        windows: Float32 arrays at 16 kHz, each at most engines.WINDOW_SAMPLES long
+        model_name: Name of the Whisper model to use
+        batch_size: Maximum number of windows per forward pass
+    
+    Returns:
+        Transcribed text per window ("" where Whisper detects no speech)
+    """
+    model = get_model(model_name)
+    metrics.AUDIO_SECONDS.inc(sum(len(window) for window in windows) / engines.SAMPLE_RATE, model=model_name)
+    return model.decode_windows(windows, batch_size)
+
+def transcribe_segments_batched(segments: List[np.ndarray], model_name="tiny.en", batch_size: int = 8) -> List[str]:
+    """
+    Transcribe several segments with a single batched decode
+    
+    Segments that fit one 30-second window go through the encoder together.
+    Longer ones are transcribed on their own, so Whisper's sequential
+    decoding places the window seams and carries the text across them.
+    
+    Args:
+        segments: Float32 arrays at 16 kHz
+        model_name: Name of the Whisper model to use
+        batch_size: Maximum number of windows per forward pass
+    
+    Returns:
+        Transcribed text per segment
+    """
+    texts = [""] * len(segments)
+    batched = [index for index, segment in enumerate(segments) if len(segment) <= engines.WINDOW_SAMPLES]
+    if batched:
+        windows = [segments[index] for index in batched]
+        # Share forward passes with other in-flight requests when the scheduler is on
+        scheduler = batching.get_scheduler()
+        if scheduler is not None:
+            window_texts = scheduler.transcribe_windows(model_name, windows)
+        else:
+            window_texts = decode_windows_batched(windows, model_name, batch_size)
+        for index, text in zip(batched, window_texts):
+            texts[index] = text
+    
+    for index, segment in enumerate(segments):
+        if len(segment) > engines.WINDOW_SAMPLES:
+            texts[index] = transcribe_audio(AudioBuffer(segment, engines.SAMPLE_RATE), model_name).strip()
+    return texts
+
+def split_for_transcription(audio: AudioBuffer, num_segments: Optional[int] = None) -> Tuple[List[segmentation.SpeechSegment], List[Dict[str, float]], str]:
+    """
+    Cut audio into the segments Whisper will see, per SEGMENTATION_MODE
+    
+    Segments are sample ranges; SpeechSegment.extract() returns a view for
+    fixed splits and for VAD segments without dropped pauses, so callers can
+    extract one segment at a time.
+    
+    Args:
+        audio: Decoded recording
+        num_segments: Equal parts for fixed segmentation (defaults to
+            parts of at most FIXED_SEGMENT_SECONDS); ignored for VAD
+    
+    Returns:
+        Tuple of (segments, segment timestamps in seconds, key describing
+        the segmentation for the cache)
+    """
+    settings = get_settings()
+    sample_rate = audio.sample_rate
+    if settings.segmentation_mode == "vad":
+        segments = segmentation.vad_segments(
+            audio,
+            settings.vad_max_segment_seconds,
+            settings.vad_min_silence_seconds,
+            settings.vad_padding_seconds,
+        )
+        kept_seconds = sum(segment.num_samples for segment in segments) / sample_rate
+        logger.info(f"VAD kept {kept_seconds:.2f}s of {audio.duration_seconds:.2f}s in {len(segments)} segments")
+        return (
+            segments,
+            [segment.to_dict(sample_rate) for segment in segments],
+            f"vad:{settings.vad_max_segment_seconds}:{settings.vad_min_silence_seconds}:{settings.vad_padding_seconds}",
+        )
+    
+    # Fixed equal splits
+    num_segments = num_segments or policy.fixed_segment_count(audio.duration_seconds)
+    bounds = segment_bounds(len(audio), sample_rate, num_segments)
+    return (
+        [segmentation.SpeechSegment([(start_idx, end_idx)]) for start_idx, end_idx in bounds],
+        [{"start": round(start_idx / sample_rate, 2), "end": round(end_idx / sample_rate, 2)} for start_idx, end_idx in bounds],
+        f"fixed:{num_segments}:{SEGMENT_OVERLAP_SECONDS}",
+    )
+
+def process_audio_with_segmentation(audio: AudioBuffer, decision: Optional[policy.PolicyDecision] = None):
+    """
+    Process audio with the model and segmentation chosen by the latency policy
+    
+    Args:
+        audio: Decoded recording
+        decision: Choice made by policy.decide() before the job was queued;
+            decided here when omitted
         
     Returns:
-        Dict with transcriptions, model used, segments used
-    """
-    # Select model based on duration
-    if duration_seconds < 120:  # < 2 minutes
-        model_name = "base.en"
-    else:  # >= 2 minutes
-        model_name = "tiny.en"
-    
-    # Determine segmentation based on duration
-    if duration_seconds < 60:  # < 1 minute
-        num_segments = 1
-    elif duration_seconds < 120:  # 1-2 minutes
-        num_segments = 2
-    elif duration_seconds < 300:  # 2-5 minutes
-        num_segments = 3
-    else:  # > 5 minutes
-        num_segments = 5
-    
-    logger.info(f"Processing audio: {duration_seconds:.2f}s, model: {model_name}, segments: {num_segments}")
+        Dict with transcriptions, model used, segments used, segment
+        timestamps, the segmentation mode and the policy decision (with
+        inference_seconds, or cached=True on a cache hit)
+    """
+    settings = get_settings()
+    start_time = time.perf_counter()
+    duration_seconds = audio.duration_seconds
+    decision = decision or policy.decide(duration_seconds)
+    model_name = decision.model
+    
+    segments, timestamps, segmentation_key = split_for_transcription(audio, decision.segments)
+    num_segments = len(segments)
     
     # Process audio in segments
     transcriptions = []
     
-    if num_segments == 1:
+    # Word timestamps only help where segments overlap, and batched decoding cannot produce them
+    word_timestamps = settings.whisper_word_timestamps and settings.segmentation_mode == "fixed" and num_segments > 1
+    if word_timestamps:
+        segmentation_key += ":words"
+    words = [] if word_timestamps else None
+    
+    # Reuse an earlier result for identical audio (client retries, /transcribe followed by /rate)
+    cache = get_transcription_cache()
+    fingerprint = audio_fingerprint(audio.samples)
+    cached = find_cached(cache, fingerprint, audio.sample_rate, model_name, segmentation_key, num_segments, word_timestamps)
+    if cached is not None:
+        logger.info(f"Transcription cache hit for {duration_seconds:.2f}s of audio ({cached['model_used']})")
+        return {**cached, "policy": {**decision.to_dict(), "model": cached["model_used"], "cached": True}}
+    
+    # Load (or wait for) the policy's model only once the cache cannot answer
+    engine = get_model(model_name)
+    logger.info(f"Processing audio: {duration_seconds:.2f}s, model: {engine.describe()}, segments: {num_segments}")
+    use_batched = uses_batching(engine, num_segments, word_timestamps)
+    cache_key = cache_key_for(engine, fingerprint, audio.sample_rate, segmentation_key, num_segments, word_timestamps)
+    
+    if num_segments == 0:
+        # Nothing but silence; skip inference entirely
+        logger.warning("No speech detected before transcription")
+        transcriptions.append("[No speech detected]")
+    elif num_segments == 1 and not use_batched:
         # Single segment processing
-        text = transcribe_audio(audio_data, model_name)
+        text = transcribe_audio(segments[0].extract(audio), model_name)
         if not text or text.strip() == "":
             logger.warning("Whisper returned empty transcription")
             text = "[No speech detected]"
         transcriptions.append(text)
-    else:
-        # Multi-segment processing
-        array = audio_data["array"]
-        sample_rate = audio_data["sampling_rate"]
-        segment_length = len(array) // num_segments
-        overlap_samples = int(1.0 * sample_rate)  # 1 second overlap
+    elif use_batched:
+        # Encode all segments' windows together instead of one model.transcribe per segment
+        batch_start_time = time.time()
+        texts = transcribe_segments_batched(
+            [segment.extract(audio).samples for segment in segments], model_name, settings.whisper_batch_size
+        )
+        logger.info(f"Batched transcription of {num_segments} segments: {time.time() - batch_start_time:.2f}s")
         
-        for i in range(num_segments):
-            start_idx = max(0, i * segment_length - overlap_samples)
-            end_idx = min(len(array), (i + 1) * segment_length + overlap_samples)
-            
-            segment_array = array[start_idx:end_idx]
-            segment_data = {
-                "array": segment_array,
-                "sampling_rate": sample_rate
-            }
+        for i, text in enumerate(texts):
+            if not text or text.strip() == "":
+                logger.warning(f"Whisper returned empty transcription for segment {i+1}")
+                text = "[No speech detected]"
+            transcriptions.append(text)
+    else:
+        for i, segment in enumerate(segments):
+            # Extracted one at a time, so at most one joined VAD segment is held at once
+            segment_audio = segment.extract(audio)
             
             segment_start_time = time.time()
-            text = transcribe_audio(segment_data, model_name)
+            if words is not None:
+                text, segment_words = transcribe_audio_with_words(segment_audio, model_name)
+                words.append(segment_words)
+            else:
+                text = transcribe_audio(segment_audio, model_name)
             segment_time = time.time() - segment_start_time
             
             if not text or text.strip() == "":
@@ -116,9 +365,15 @@ def process_audio_with_segmentation(audio_data, duration_seconds):
     if all(t == "[No speech detected]" for t in transcriptions):
         logger.warning("All segments returned empty transcriptions")
         
-    return {
+    result = {
         "transcriptions": transcriptions,
         "model_used": model_name,
-        "segments_used": num_segments
+        "segments_used": num_segments,
+        "segments": timestamps,
+        "segmentation": settings.segmentation_mode
     }
-
+    if words is not None and len(words) == num_segments:
+        result["words"] = words
+    cache.set(cache_key, result)
+    inference_seconds = time.perf_counter() - start_time
+    return {**result, "policy": {**decision.to_dict(), "inference_seconds": round(inference_seconds, 3)}}
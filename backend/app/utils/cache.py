@@ -0,0 +1,347 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from . import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form for cache keys: NFC, collapsed whitespace, trimmed"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 over the given parts (str, bytes or anything str() can render)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(part)
+        else:
+            digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value))
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with optional TTL and byte budget
+
+    Entries are evicted least-recently-used first when either max_entries or
+    max_bytes (as measured by `sizeof`) would be exceeded.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = _json_size,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = self._sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[2]
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SQLiteCache:
+    """
+    On-disk LRU tier in a single SQLite file
+
+    Values are stored as JSON. Eviction removes least-recently-accessed rows
+    once max_entries or max_bytes is exceeded. Row count and total size are
+    kept as running totals and re-read from the table every RESYNC_WRITES
+    writes, since other processes may write to the same file.
+    """
+
+    RESYNC_WRITES = 1000
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100_000,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        table: str = "cache",
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.table = table
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self._entries, self._bytes = self._totals()
+        self._writes = 0
+
+    def _totals(self) -> Tuple[int, int]:
+        count, total = self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        return count, total
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, expires_at, size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at, size = row
+            if expires_at and expires_at < now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value)
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            replaced = self._conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, now),
+            )
+            if replaced is None:
+                self._entries += 1
+            else:
+                self._bytes -= replaced[0]
+            self._bytes += len(payload)
+            self._writes += 1
+            if self._writes % self.RESYNC_WRITES == 0:
+                self._entries, self._bytes = self._totals()
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._entries > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+            row = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._entries, self._bytes = 0, 0
+                break
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (row[0],))
+            self._entries -= 1
+            self._bytes -= row[1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional disk tier, with hit/miss counters
+
+    Coroutines use aget() and aset(), which check the memory tier inline and
+    run the SQLite tier in a thread so the event loop never waits on disk.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_first([key])[1]
+
+    def get_first(self, keys: Sequence[str]) -> Tuple[Optional[str], Optional[Any]]:
+        """
+        First of keys that has a value, tried in order, as one lookup
+
+        Counts a single hit or miss however many keys are tried.
+
+        Returns:
+            Tuple of (key found or None, value or None)
+        """
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                self._count("memory_hits")
+                return key, value
+            value = self._disk_read(key)
+            if value is not None:
+                # Promote so the next lookup stays in memory
+                self.memory.set(key, value)
+                self._count("disk_hits")
+                return key, value
+        self._count("misses")
+        return None, None
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is None:
+            self._count("misses")
+            return None
+        return (await asyncio.to_thread(self.get_first, [key]))[1]
+
+    def _disk_read(self, key: str) -> Optional[Any]:
+        if self.disk is None:
+            return None
+        try:
+            return self.disk.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{self.name}' disk read failed: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        self._disk_set(key, value)
+        self._count("sets")
+
+    async def aset(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self._disk_set, key, value)
+        self._count("sets")
+
+    def _disk_set(self, key: str, value: Any) -> None:
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache '{self.name}' disk write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_bytes"] = self.memory.size_bytes
+        return stats
+
+
+def build_cache(
+    name: str,
+    max_entries: int,
+    ttl_seconds: Optional[float] = None,
+    disk_path: str = "",
+    max_memory_bytes: Optional[int] = None,
+    max_disk_bytes: Optional[int] = None,
+    max_disk_entries: int = 100_000,
+) -> TieredCache:
+    """Memory tier always; disk tier only when disk_path is set"""
+    memory = LRUCache(max_entries, ttl_seconds, max_memory_bytes)
+    disk = None
+    if disk_path:
+        try:
+            disk = SQLiteCache(disk_path, max_disk_entries, ttl_seconds, max_disk_bytes, table=name)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache '{name}' disk tier disabled: {str(e)}")
+    cache = TieredCache(name, memory, disk)
+    _caches[name] = cache
+    return cache
+
+
+# Caches built so far, for /metrics
+_caches: "weakref.WeakValueDictionary[str, TieredCache]" = weakref.WeakValueDictionary()
+
+
+@metrics.register_collector
+def _cache_metrics():
+    stats = {name: cache.stats() for name, cache in list(_caches.items())}
+    yield (
+        "mockinterview_cache_events_total",
+        "counter",
+        "Cache lookups by outcome (memory_hits, disk_hits, misses) and writes (sets)",
+        [
+            ({"cache": name, "event": event}, values[event])
+            for name, values in stats.items()
+            for event in ("memory_hits", "disk_hits", "misses", "sets")
+        ],
+    )
+    yield (
+        "mockinterview_cache_memory_entries",
+        "gauge",
+        "Entries in the memory tier",
+        [({"cache": name}, values["memory_entries"]) for name, values in stats.items()],
+    )
+    yield (
+        "mockinterview_cache_memory_bytes",
+        "gauge",
+        "Approximate size of the memory tier",
+        [({"cache": name}, values["memory_bytes"]) for name, values in stats.items()],
+    )
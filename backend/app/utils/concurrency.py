@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BranchResult:
+    """Outcome of one branch of a fan-out: either a value or the error it raised"""
+
+    __slots__ = ("name", "value", "error", "elapsed")
+
+    def __init__(self, name: str, value: Any = None, error: Optional[BaseException] = None, elapsed: float = 0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def timed_out(self) -> bool:
+        return isinstance(self.error, asyncio.TimeoutError)
+
+    def value_or(self, default: Any) -> Any:
+        return self.value if self.ok else default
+
+
+async def _run_branch(name: str, awaitable: Awaitable[Any], timeout: Optional[float]) -> BranchResult:
+    start = time.perf_counter()
+    try:
+        if timeout is not None:
+            value = await asyncio.wait_for(awaitable, timeout)
+        else:
+            value = await awaitable
+        return BranchResult(name, value=value, elapsed=time.perf_counter() - start)
+    except asyncio.TimeoutError as e:
+        elapsed = time.perf_counter() - start
+        logger.warning(f"Branch '{name}' timed out after {elapsed:.2f}s")
+        return BranchResult(name, error=e, elapsed=elapsed)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        logger.warning(f"Branch '{name}' failed after {elapsed:.2f}s: {str(e)}")
+        return BranchResult(name, error=e, elapsed=elapsed)
+
+
+async def iter_branches(
+    branches: Dict[str, Awaitable[Any]],
+    timeout: Optional[float] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> AsyncIterator[BranchResult]:
+    """
+    Run independent awaitables concurrently and yield each outcome as it finishes
+
+    Failures and timeouts are yielded, not raised. Branches still pending
+    when the caller stops iterating or is cancelled are cancelled.
+
+    Args:
+        branches: Mapping of branch name to coroutine or future
+        timeout: Default per-branch timeout in seconds (None for no limit)
+        timeouts: Per-branch overrides of `timeout`
+
+    Yields:
+        BranchResult of each branch, in completion order
+    """
+    timeouts = timeouts or {}
+    pending = {
+        asyncio.ensure_future(_run_branch(name, awaitable, timeouts.get(name, timeout)))
+        for name, awaitable in branches.items()
+    }
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def gather_branches(
+    branches: Dict[str, Awaitable[Any]],
+    timeout: Optional[float] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    required: Iterable[str] = (),
+) -> Dict[str, BranchResult]:
+    """
+    Run independent awaitables concurrently and collect every outcome
+
+    Failures and timeouts of optional branches are returned, not raised, so the
+    caller can degrade gracefully. If a required branch fails, the remaining
+    branches are cancelled and its error is raised. Branches never outlive
+    this call: cancelling the caller cancels them too.
+
+    Args:
+        branches: Mapping of branch name to coroutine or future
+        timeout: Default per-branch timeout in seconds (None for no limit)
+        timeouts: Per-branch overrides of `timeout`
+        required: Names of branches whose failure fails the whole fan-out
+
+    Returns:
+        Dict mapping each branch name to its BranchResult
+    """
+    required = set(required)
+    results: Dict[str, BranchResult] = {}
+    branch_results = iter_branches(branches, timeout, timeouts)
+    try:
+        async for result in branch_results:
+            results[result.name] = result
+            if not result.ok and result.name in required:
+                raise result.error
+    finally:
+        # Cancel the remaining branches now rather than when the generator is collected
+        await branch_results.aclose()
+    return {name: results[name] for name in branches}
@@ -0,0 +1,259 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+from fastapi import HTTPException
+
+from ..config import Settings, get_settings
+from . import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INFERENCE = "inference"
+FFMPEG = "ffmpeg"
+LLM = "llm"
+
+POOL_REJECTIONS = metrics.counter(
+    "mockinterview_pool_rejections_total",
+    "Jobs rejected with 503 because a pool was full",
+    ("pool",),
+)
+
+
+class PoolSaturatedError(HTTPException):
+    """Raised when a worker pool has no free slot; rendered as 503 with Retry-After"""
+
+    def __init__(self, pool_name: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"Server is busy ({pool_name} queue is full). Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.pool_name = pool_name
+
+
+class BoundedPool:
+    """
+    Base for pools with a hard cap on in-flight plus queued jobs
+
+    Jobs beyond max_workers wait for a free slot; once max_queue jobs are
+    waiting, new submissions are rejected immediately instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, retry_after: int = 5):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently running or waiting in this pool"""
+        return self._pending
+
+    def start(self) -> None:
+        pass
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.capacity:
+                logger.warning(f"Pool '{self.name}' saturated ({self._pending}/{self.capacity}), rejecting job")
+                POOL_REJECTIONS.inc(pool=self.name)
+                raise PoolSaturatedError(self.name, self.retry_after)
+            self._pending += 1
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+class WorkerPool(BoundedPool):
+    """Thread or process executor for blocking work"""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, kind: str = "thread", retry_after: int = 5):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        super().__init__(name, max_workers, max_queue, retry_after)
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool")
+        logger.info(f"Started {self.kind} pool '{self.name}' with {self.max_workers} workers, queue depth {self.max_queue}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) in the pool without blocking the event loop
+
+        Raises:
+            PoolSaturatedError: if the pool already holds `capacity` jobs
+        """
+        if self._executor is None:
+            self.start()
+        call = functools.partial(fn, *args, **kwargs)
+        if self.kind == "thread":
+            # Carry the request's context (trace ID) into the worker thread
+            call = functools.partial(contextvars.copy_context().run, call)
+        self._acquire()
+        try:
+            future = self._executor.submit(call)
+        except BaseException:
+            self._release()
+            raise
+        # Release on completion rather than when the caller stops waiting, so a
+        # disconnected client does not free a slot that is still doing work
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+
+class AsyncPool(BoundedPool):
+    """Concurrency limit for coroutines doing network I/O on the event loop"""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, retry_after: int = 5):
+        super().__init__(name, max_workers, max_queue, retry_after)
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await fn(*args, **kwargs) once one of max_workers slots is free
+
+        Raises:
+            PoolSaturatedError: if the pool already holds `capacity` jobs
+        """
+        async with self.slot():
+            return await fn(*args, **kwargs)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of max_workers slots for the duration of the block
+
+        Used for work that is not a single awaitable, such as consuming a
+        streamed response.
+
+        Raises:
+            PoolSaturatedError: if the pool already holds `capacity` jobs
+        """
+        self._acquire()
+        try:
+            async with self._semaphore:
+                yield
+        finally:
+            self._release()
+
+
+_pools: Dict[str, Union[WorkerPool, AsyncPool]] = {}
+
+
+def init_pools(settings: Optional[Settings] = None) -> Dict[str, Union[WorkerPool, AsyncPool]]:
+    """Create the shared worker pools (called from the app lifespan)"""
+    settings = settings or get_settings()
+    shutdown_pools()
+    _pools[INFERENCE] = WorkerPool(
+        INFERENCE,
+        settings.inference_workers,
+        settings.inference_queue_depth,
+        kind=settings.inference_pool_kind,
+        retry_after=settings.retry_after_seconds,
+    )
+    _pools[FFMPEG] = WorkerPool(
+        FFMPEG,
+        settings.ffmpeg_workers,
+        settings.ffmpeg_queue_depth,
+        retry_after=settings.retry_after_seconds,
+    )
+    _pools[LLM] = AsyncPool(
+        LLM,
+        settings.llm_workers,
+        settings.llm_queue_depth,
+        retry_after=settings.retry_after_seconds,
+    )
+    for pool in _pools.values():
+        pool.start()
+    return _pools
+
+
+def shutdown_pools(wait: bool = True) -> None:
+    for pool in _pools.values():
+        pool.shutdown(wait=wait)
+    _pools.clear()
+
+
+def get_pool(name: str) -> Union[WorkerPool, AsyncPool]:
+    if not _pools:
+        init_pools()
+    return _pools[name]
+
+
+def peek_pool(name: str) -> Optional[Union[WorkerPool, AsyncPool]]:
+    """The named pool if the pools are running, without starting them"""
+    return _pools.get(name)
+
+
+async def run_inference(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run CPU-bound work (Whisper, feature extraction) in the inference pool"""
+    return await get_pool(INFERENCE).run(fn, *args, **kwargs)
+
+
+async def run_ffmpeg(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run ffmpeg decoding in the ffmpeg pool"""
+    return await get_pool(FFMPEG).run(fn, *args, **kwargs)
+
+
+async def run_llm(fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+    """Await an OpenAI call under the LLM concurrency limit"""
+    return await get_pool(LLM).run(fn, *args, **kwargs)
+
+
+def llm_slot():
+    """Async context manager holding an LLM pool slot, e.g. while a completion streams"""
+    return get_pool(LLM).slot()
+
+
+@metrics.register_collector
+def _pool_metrics():
+    pools = list(_pools.values())
+    yield (
+        "mockinterview_pool_pending",
+        "gauge",
+        "Jobs running or queued per worker pool",
+        [({"pool": pool.name}, pool.pending) for pool in pools],
+    )
+    yield (
+        "mockinterview_pool_queued",
+        "gauge",
+        "Jobs waiting for a free worker per pool",
+        [({"pool": pool.name}, max(0, pool.pending - pool.max_workers)) for pool in pools],
+    )
+    yield (
+        "mockinterview_pool_capacity",
+        "gauge",
+        "Running plus queued jobs a pool accepts before rejecting with 503",
+        [({"pool": pool.name}, pool.capacity) for pool in pools],
+    )
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from . import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+StageCallback = Callable[[str, Any, float], None]
+
+
+class Stage:
+    """A named async step that runs once all of its dependencies have finished"""
+
+    __slots__ = ("name", "fn", "deps")
+
+    def __init__(self, name: str, fn: StageFn, deps: Tuple[str, ...] = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = deps
+
+
+class Pipeline:
+    """
+    Small DAG runner for async stages
+
+    Each stage receives a dict of its dependencies' results and starts as soon
+    as they are available, so independent stages overlap. Stages must be added
+    after the stages they depend on, which also rules out cycles.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self._stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, fn: StageFn, deps: Iterable[str] = ()) -> "Pipeline":
+        deps = tuple(deps)
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self._stages[name] = Stage(name, fn, deps)
+        return self
+
+    async def run(self, on_stage_complete: Optional[StageCallback] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run all stages, overlapping those without mutual dependencies
+
+        Args:
+            on_stage_complete: Optional callback(name, result, elapsed_seconds),
+                called as each stage finishes
+
+        Returns:
+            Tuple of (results by stage name, elapsed seconds by stage name plus "total")
+
+        Raises:
+            The first exception raised by any stage; all other stages are cancelled
+        """
+        start = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, float] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs = {dep: await tasks[dep] for dep in stage.deps}
+            stage_start = time.perf_counter()
+            result = await stage.fn(inputs)
+            elapsed = time.perf_counter() - stage_start
+            timings[stage.name] = round(elapsed, 3)
+            metrics.PIPELINE_STAGE_SECONDS.observe(elapsed, pipeline=self.name, stage=stage.name)
+            logger.info(f"[{self.name}] stage '{stage.name}' finished in {elapsed:.2f}s")
+            if on_stage_complete is not None:
+                on_stage_complete(stage.name, result, elapsed)
+            return result
+
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+
+        try:
+            done, _ = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            errors = [task.exception() for task in done if not task.cancelled() and task.exception() is not None]
+            if errors:
+                raise errors[0]
+        finally:
+            unfinished = [task for task in tasks.values() if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+        elapsed = time.perf_counter() - start
+        timings["total"] = round(elapsed, 3)
+        metrics.PIPELINE_STAGE_SECONDS.observe(elapsed, pipeline=self.name, stage="total")
+        return {name: task.result() for name, task in tasks.items()}, timings
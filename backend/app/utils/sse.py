@@ -0,0 +1,48 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+
+def format_event(event: str, data: Any) -> str:
+    """One Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+async def _encode(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    # A comment line goes out first so clients see bytes before any work is done
+    yield ": stream opened\n\n"
+    try:
+        async for event, data in events:
+            yield format_event(event, data)
+    except Exception as e:
+        # Headers are already sent, so errors become an event with the status the JSON endpoint would use
+        status_code = getattr(e, "status_code", 500)
+        detail = getattr(e, "detail", None) or str(e)
+        logger.error(f"Event stream failed with {status_code}: {detail}")
+        yield format_event("error", {"status_code": status_code, "detail": detail})
+
+
+def event_stream_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Stream (event, data) pairs as text/event-stream
+
+    Args:
+        events: Async iterator of (event name, JSON-serializable payload)
+
+    Returns:
+        StreamingResponse that ends with an 'error' event if the iterator raises
+    """
+    return StreamingResponse(_encode(events), media_type="text/event-stream", headers=SSE_HEADERS)
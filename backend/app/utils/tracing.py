@@ -0,0 +1,114 @@
+import logging
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = "x-request-id"
+
+LOG_FORMAT = "%(levelname)s:%(name)s:[%(trace_id)s] %(message)s"
+
+# Incoming IDs are echoed into logs and headers, so only accept plain tokens
+_VALID_TRACE_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+trace_id_var: ContextVar[str] = ContextVar("trace_id", default="-")
+
+
+def get_trace_id() -> str:
+    """Trace ID of the request being handled, or '-' outside a request"""
+    return trace_id_var.get()
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds record.trace_id so formats can include %(trace_id)s"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        return True
+
+
+def install_log_trace_ids(log_format: str = LOG_FORMAT) -> None:
+    """Prefix every root log line with the current trace ID"""
+    trace_filter = TraceIdFilter()
+    formatter = logging.Formatter(log_format)
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(trace_filter)
+        handler.setFormatter(formatter)
+
+
+def _route_label(scope: Scope) -> str:
+    # The matched route template keeps label cardinality bounded; raw paths would not
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        return "unmatched"
+    return scope.get("root_path", "") + path
+
+
+class RequestTracingMiddleware:
+    """
+    Assign a trace ID to every HTTP request and record its latency
+
+    The ID comes from the X-Request-ID header when the client sends a valid
+    one, otherwise it is generated. It is set in a context variable for logs,
+    returned in the X-Request-ID response header, and the request's duration
+    (to the end of the body, so streamed responses count in full) goes into
+    mockinterview_http_request_duration_seconds.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Optional[set] = None):
+        self.app = app
+        self.exclude_paths = exclude_paths or set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(TRACE_HEADER.encode("latin-1"), b"").decode("latin-1")
+        trace_id = incoming if _VALID_TRACE_ID.match(incoming) else new_trace_id()
+        token = trace_id_var.set(trace_id)
+
+        if scope["type"] == "websocket" or scope.get("path") in self.exclude_paths:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                trace_id_var.reset(token)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def traced_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(TRACE_HEADER.encode("latin-1"), trace_id.encode("latin-1"))]
+            await send(message)
+
+        metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+            metrics.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=_route_label(scope),
+                status=str(status),
+            )
+            trace_id_var.reset(token)
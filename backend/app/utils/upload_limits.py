@@ -0,0 +1,58 @@
+import logging
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _too_large_detail(max_body_bytes: int) -> str:
+    return f"Request body exceeds the limit of {max_body_bytes} bytes. Please upload a shorter recording."
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over a byte cap before they are buffered
+
+    Requests that declare a larger Content-Length get 413 without reading the
+    body. Chunked or understated bodies are counted as they arrive and fail
+    with 413 as soon as they cross the cap, so multipart parsing never spools
+    more than max_body_bytes. path_limits overrides the cap for exact paths,
+    e.g. endpoints that take several recordings at once.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: Optional[int], path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_body_bytes = self.path_limits.get(scope.get("path", ""), self.max_body_bytes) if scope["type"] == "http" else None
+        if not max_body_bytes:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body_bytes:
+            logger.warning(f"Rejected {scope['path']}: Content-Length {int(content_length)} > {max_body_bytes}")
+            response = JSONResponse(status_code=413, content={"detail": _too_large_detail(max_body_bytes)})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes:
+                    logger.warning(f"Rejected {scope['path']}: body exceeded {max_body_bytes} bytes while streaming")
+                    raise HTTPException(status_code=413, detail=_too_large_detail(max_body_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
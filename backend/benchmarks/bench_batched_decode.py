@@ -0,0 +1,73 @@
+"""
+Compare the per-segment transcription loop with the batched decode path
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_batched_decode --duration 180
+    python -m benchmarks.bench_batched_decode --audio answer.webm --repeat 3
+"""
+import argparse
+import json
+import math
+import time
+
+from app.services import audio_processing, transcription
+from app.services.audio_buffer import AudioBuffer
+from benchmarks.common import synthetic_audio
+
+
+def run_loop(segments, model_name):
+    return [transcription.transcribe_audio(AudioBuffer(segment, 16000), model_name) for segment in segments]
+
+
+def run_batched(segments, model_name, batch_size):
+    return transcription.transcribe_segments_batched(segments, model_name, batch_size)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", help="Audio file to use instead of synthetic audio")
+    parser.add_argument("--duration", type=float, default=180.0, help="Synthetic audio length in seconds")
+    parser.add_argument("--segments", type=int, help="Equal parts (default: enough to fit each in one 30 s window)")
+    parser.add_argument("--model", default="tiny.en")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            array = audio_processing.convert_to_wav(f.read()).samples
+    else:
+        array = synthetic_audio(args.duration)
+
+    # Only segments that fit one window are batched; longer ones take the loop path either way
+    num_segments = args.segments or math.ceil(len(array) / 16000 / 28)
+    bounds = transcription.segment_bounds(len(array), 16000, num_segments)
+    segments = [array[start:end] for start, end in bounds]
+
+    # Load the model before timing anything
+    transcription.get_model(args.model)
+
+    loop_seconds = best_of(lambda: run_loop(segments, args.model), args.repeat)
+    batched_seconds = best_of(lambda: run_batched(segments, args.model, args.batch_size), args.repeat)
+
+    print(json.dumps({
+        "audio_seconds": round(len(array) / 16000, 2),
+        "segments": num_segments,
+        "model": args.model,
+        "loop_seconds": round(loop_seconds, 3),
+        "batched_seconds": round(batched_seconds, 3),
+        "speedup": round(loop_seconds / batched_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Compare transcription engines on speed and word error rate
+
+Each engine loads the model, then transcribes every clip the way
+process_audio_with_segmentation does: split per SEGMENTATION_MODE, one
+transcribe() per segment. Clips with a reference transcript next to them
+(answer.webm + answer.txt) are scored against it. Otherwise each engine is
+scored against the first engine's output (wer_vs_baseline), which shows how
+much quantization changes the text even without references.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_engines --clips samples/ --engines openai,int8 --models base.en,tiny.en
+    python -m benchmarks.bench_engines --corpus bench_corpus --formats webm --max-duration 300 --output results/engines.json
+"""
+import argparse
+import os
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.services import audio_processing, engines, transcript_merge, transcription
+from app.services.audio_buffer import AudioBuffer
+from benchmarks.common import word_error_rate, write_results
+from benchmarks.corpus import load_corpus
+
+AUDIO_EXTENSIONS = (".webm", ".wav", ".mp3", ".m4a", ".ogg")
+
+
+def load_clips(args) -> List[Dict[str, Any]]:
+    """Decoded clips with an optional reference transcript"""
+    if args.clips:
+        entries = []
+        for name in sorted(os.listdir(args.clips)):
+            base, ext = os.path.splitext(name)
+            if ext.lower() not in AUDIO_EXTENSIONS:
+                continue
+            reference_path = os.path.join(args.clips, base + ".txt")
+            reference = open(reference_path).read() if os.path.exists(reference_path) else None
+            entries.append({"name": name, "path": os.path.join(args.clips, name), "reference": reference})
+    else:
+        entries = [
+            {"name": clip["name"], "path": clip["path"], "reference": None}
+            for clip in load_corpus(args.corpus, [f for f in args.formats.split(",") if f], args.max_duration)
+        ]
+    for entry in entries:
+        with open(entry["path"], "rb") as f:
+            entry["audio"] = audio_processing.convert_to_wav(f.read())
+    return entries
+
+
+def transcribe_clip(engine: engines.TranscriptionEngine, audio: AudioBuffer) -> str:
+    segments, _, _ = transcription.split_for_transcription(audio)
+    texts = [engine.transcribe(segment.extract(audio).samples) for segment in segments]
+    overlap = transcription.SEGMENT_OVERLAP_SECONDS if transcription.get_settings().segmentation_mode == "fixed" else 0.0
+    return transcript_merge.merge_transcriptions(texts, overlap).text
+
+
+def bench_engine(engine_name: str, model_name: str, clips: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    engine = engines.load_engine(model_name, engine_name)
+    load_seconds = time.perf_counter() - start
+    engine.warmup()
+
+    rows = []
+    for clip in clips:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = transcribe_clip(engine, clip["audio"])
+            times.append(time.perf_counter() - start)
+        audio_seconds = clip["audio"].duration_seconds
+        row = {
+            "clip": clip["name"],
+            "audio_seconds": round(audio_seconds, 1),
+            "seconds": round(min(times), 3),
+            "rtf": round(min(times) / audio_seconds, 4),
+            "text": text,
+        }
+        if clip["reference"] is not None:
+            row["wer"] = round(word_error_rate(clip["reference"], text), 4)
+        rows.append(row)
+
+    total_audio = sum(row["audio_seconds"] for row in rows)
+    total_seconds = sum(row["seconds"] for row in rows)
+    scored = [row["wer"] for row in rows if "wer" in row]
+    return {
+        "engine": engine.describe(),
+        "model": model_name,
+        "load_seconds": round(load_seconds, 2),
+        "total_seconds": round(total_seconds, 2),
+        "rtf": round(total_seconds / total_audio, 4) if total_audio else None,
+        "mean_wer": round(float(np.mean(scored)), 4) if scored else None,
+        "clips": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--clips", help="Directory of audio files, optionally with .txt references")
+    source.add_argument("--corpus", help="Directory written by benchmarks.corpus")
+    parser.add_argument("--formats", default="", help="Corpus formats to include (default: all)")
+    parser.add_argument("--max-duration", type=float, default=None, help="Skip corpus clips longer than this")
+    parser.add_argument("--engines", default="openai,int8", help=f"Comma-separated subset of {','.join(engines.ENGINES)}")
+    parser.add_argument("--models", default="base.en,tiny.en")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    engine_names = [name for name in args.engines.split(",") if name]
+    unknown = set(engine_names) - set(engines.ENGINES)
+    if unknown:
+        parser.error(f"Unknown engines: {sorted(unknown)}")
+    clips = load_clips(args)
+    if not clips:
+        parser.error("No clips found")
+
+    results = []
+    for model_name in [name for name in args.models.split(",") if name]:
+        baseline = None
+        for engine_name in engine_names:
+            print(f"Benchmarking {engine_name} on {model_name}...", flush=True)
+            try:
+                result = bench_engine(engine_name, model_name, clips, args.repeat)
+            except Exception as e:
+                # An engine whose optional package is missing should not stop the others
+                results.append({"engine": engine_name, "model": model_name, "error": str(e)})
+                continue
+            if baseline is None:
+                baseline = result
+            else:
+                for row, base_row in zip(result["clips"], baseline["clips"]):
+                    row["wer_vs_baseline"] = round(word_error_rate(base_row["text"], row["text"]), 4)
+                result["baseline"] = baseline["engine"]
+                result["speedup_vs_baseline"] = round(baseline["total_seconds"] / result["total_seconds"], 2) if result["total_seconds"] else None
+            results.append(result)
+
+    write_results(
+        args.output,
+        "engines",
+        {"engines": engine_names, "models": args.models, "repeat": args.repeat, "segmentation_mode": transcription.get_settings().segmentation_mode},
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Check frame_metrics against pyAudioAnalysis and time both on long clips
+
+Energy and zero-crossing rate from AudioBuffer.frame_features must match
+pyAudioAnalysis frame by frame; the script exits non-zero if they do not.
+Exact values on synthetic signals are checked by tests/test_frame_metrics.py.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_frame_metrics --duration 300
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.services import frame_metrics
+from app.services.audio_buffer import AudioBuffer
+from benchmarks.common import synthetic_audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=300.0, help="Clip length in seconds")
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    from pyAudioAnalysis import ShortTermFeatures
+
+    sample_rate = 16000
+    x = synthetic_audio(args.duration, sample_rate)
+    frame_length = int(frame_metrics.WINDOW_SECONDS * sample_rate)
+    hop_length = int(frame_metrics.HOP_SECONDS * sample_rate)
+
+    start = time.perf_counter()
+    features, _ = ShortTermFeatures.feature_extraction(x, sample_rate, frame_length, hop_length)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = frame_metrics.compute_frame_metrics(x, sample_rate)
+    numpy_seconds = time.perf_counter() - start
+
+    # The blocked features production computes once per AudioBuffer
+    energy, zcr = AudioBuffer(x, sample_rate).frame_features()
+    energy_error = float(np.abs(energy - features[1]).max())
+    zcr_error = float(np.abs(zcr - features[0]).max())
+
+    print(json.dumps({
+        "audio_seconds": args.duration,
+        "frames": len(energy),
+        "max_energy_error": energy_error,
+        "max_zcr_error": zcr_error,
+        "pyaudioanalysis_seconds": round(reference_seconds, 3),
+        "frame_metrics_seconds": round(numpy_seconds, 4),
+        "speedup": round(reference_seconds / numpy_seconds, 1),
+        "metrics": metrics,
+    }, indent=2))
+
+    if len(energy) != features.shape[1] or max(energy_error, zcr_error) > args.tolerance:
+        print("Parity check FAILED", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
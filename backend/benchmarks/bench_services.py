@@ -0,0 +1,138 @@
+"""
+Time each service function on every clip of the benchmark corpus
+
+Functions: convert_to_wav (ffmpeg decode), analyze_audio (delivery metrics),
+vad_segments (segmentation), process_audio_with_segmentation (Whisper) and
+merge_transcriptions. Each is run --repeat times per clip after one warm-up
+run; the transcription cache is cleared before every Whisper run so repeats
+measure inference, not cache hits. The warm-up run is traced with tracemalloc,
+which gives each function's peak Python and NumPy allocation (peak_mb).
+
+Usage (from the backend directory):
+    python -m benchmarks.corpus --out bench_corpus
+    python -m benchmarks.bench_services --corpus bench_corpus --output results/services.json
+    python -m benchmarks.bench_services --corpus bench_corpus --formats webm --max-duration 120 --skip-whisper
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from app.config import get_settings
+from app.services import audio_processing, segmentation, transcript_merge, transcription
+from app.services.audio_buffer import AudioBuffer
+from benchmarks.common import write_results
+from benchmarks.corpus import load_corpus
+
+FUNCTIONS = ("convert_to_wav", "analyze_audio", "vad_segments", "process_audio_with_segmentation", "merge_transcriptions")
+
+
+def measure(fn: Callable[[], Any], repeat: int, before: Callable[[], None] = lambda: None) -> Dict[str, float]:
+    """Best and mean seconds of fn over repeat runs, and peak MB allocated during one untimed warm-up"""
+    before()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        before()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "best_seconds": round(min(times), 4),
+        "mean_seconds": round(sum(times) / len(times), 4),
+        "peak_mb": round(peak_bytes / 2 ** 20, 2),
+    }
+
+
+def bench_clip(clip: Dict[str, Any], functions: List[str], repeat: int) -> Dict[str, Any]:
+    with open(clip["path"], "rb") as f:
+        content = f.read()
+    settings = get_settings()
+    audio = audio_processing.convert_to_wav(content, settings.max_audio_seconds)
+    duration = audio.duration_seconds
+    results: Dict[str, Any] = {}
+
+    if "convert_to_wav" in functions:
+        results["convert_to_wav"] = measure(lambda: audio_processing.convert_to_wav(content, settings.max_audio_seconds), repeat)
+    if "analyze_audio" in functions:
+        # A fresh buffer per run, so cached frame features do not hide the work
+        results["analyze_audio"] = measure(lambda: audio_processing.analyze_audio(AudioBuffer(audio.samples, audio.sample_rate)), repeat)
+    if "vad_segments" in functions:
+        results["vad_segments"] = measure(
+            lambda: segmentation.vad_segments(AudioBuffer(audio.samples, audio.sample_rate)), repeat
+        )
+
+    transcribed = None
+    if "process_audio_with_segmentation" in functions:
+        cache = transcription.get_transcription_cache()
+        results["process_audio_with_segmentation"] = measure(
+            lambda: transcription.process_audio_with_segmentation(audio), repeat, before=cache.memory.clear
+        )
+        transcribed = transcription.process_audio_with_segmentation(audio)
+        results["process_audio_with_segmentation"]["segments"] = transcribed["segments_used"]
+        results["process_audio_with_segmentation"]["model"] = transcribed["model_used"]
+    if "merge_transcriptions" in functions and transcribed is not None:
+        results["merge_transcriptions"] = measure(
+            lambda: transcript_merge.merge_result(transcribed, transcription.SEGMENT_OVERLAP_SECONDS), repeat
+        )
+
+    for stats in results.values():
+        # Seconds of audio handled per second of compute
+        stats["x_realtime"] = round(duration / stats["best_seconds"], 1) if stats["best_seconds"] else None
+    return {"clip": clip["name"], "format": clip["format"], "duration_seconds": round(duration, 2), "bytes": len(content), "functions": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="bench_corpus", help="Directory written by benchmarks.corpus")
+    parser.add_argument("--formats", default="", help="Comma-separated formats to include (default: all)")
+    parser.add_argument("--max-duration", type=float, default=None, help="Skip clips longer than this")
+    parser.add_argument("--functions", default=",".join(FUNCTIONS), help="Comma-separated subset of functions")
+    parser.add_argument("--skip-whisper", action="store_true", help="Leave out process_audio_with_segmentation and merge_transcriptions")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    functions = [name for name in args.functions.split(",") if name]
+    unknown = set(functions) - set(FUNCTIONS)
+    if unknown:
+        parser.error(f"Unknown functions: {sorted(unknown)}")
+    if args.skip_whisper:
+        functions = [name for name in functions if name not in ("process_audio_with_segmentation", "merge_transcriptions")]
+
+    clips = load_corpus(args.corpus, [f for f in args.formats.split(",") if f], args.max_duration)
+    if not clips:
+        parser.error(f"No clips in {args.corpus}; run python -m benchmarks.corpus first")
+
+    if "process_audio_with_segmentation" in functions:
+        # Load both models up front so the first clip does not pay for it
+        for model_name in ("base.en", "tiny.en"):
+            transcription.get_model(model_name)
+
+    results = []
+    for clip in clips:
+        print(f"Benchmarking {clip['name']}...", flush=True)
+        results.append(bench_clip(clip, functions, args.repeat))
+
+    settings = get_settings()
+    write_results(
+        args.output,
+        "services",
+        {
+            "corpus": args.corpus,
+            "functions": functions,
+            "repeat": args.repeat,
+            "segmentation_mode": settings.segmentation_mode,
+            "whisper_batched_decode": settings.whisper_batched_decode,
+        },
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
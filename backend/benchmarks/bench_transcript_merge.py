@@ -0,0 +1,136 @@
+"""
+Compare seam handling of segmented transcripts by word error rate
+
+Without --clips, reference answers are cut into overlapping segments the way
+segment_bounds cuts audio, with Whisper-like damage at every cut (clipped or
+misheard edge words), so the merger can be checked without a model.
+
+With --clips, every audio file in the directory that has a reference
+transcript next to it (answer.webm + answer.txt) is transcribed in fixed
+overlapping segments and compared as: naive join, local merge, the
+clean_transcript LLM pass (--llm, needs OPENAI_API_KEY) and a single
+unsegmented pass.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_transcript_merge
+    python -m benchmarks.bench_transcript_merge --clips samples/ --model base.en --llm
+"""
+import argparse
+import asyncio
+import json
+import os
+
+import numpy as np
+
+from app.services import transcript_merge
+from benchmarks.common import word_error_rate
+
+REFERENCE_ANSWERS = [
+    "In my last role I led the migration of our billing service from a monolith to three smaller services. "
+    "The hardest part was keeping invoices consistent while both systems were live, so we ran them side by side "
+    "for a month and compared every invoice before switching traffic over.",
+    "When two teammates disagreed about the database schema I set up a short meeting where each of them walked "
+    "through the queries they expected to run. Seeing the access patterns side by side made the tradeoff obvious "
+    "and we agreed on a design within the hour.",
+    "I would start by profiling the endpoint under realistic load to find where the time actually goes. If most of "
+    "it is spent waiting on the database I would look at indexes and query plans first, and only then consider "
+    "caching, because a cache hides the problem without fixing it.",
+    "My biggest weakness used to be taking on too much myself instead of delegating. I have been working on it by "
+    "writing down who owns each task at the start of a sprint and checking in on progress rather than jumping in.",
+]
+
+_EDGE_NOISE = ["uh", "the", "and", "so"]
+
+
+def simulate_segments(text, num_segments, overlap_seconds, rng, words_per_second=2.5, edge_error=0.5, word_error=0.02):
+    """Cut a reference into overlapping segment transcripts with Whisper-like damage at the cuts"""
+    words = text.split()
+    times = np.cumsum(rng.uniform(0.6, 1.4, len(words)) / words_per_second)
+    duration = float(times[-1]) + 0.5
+    length = duration / num_segments
+    segments = []
+    for i in range(num_segments):
+        start = max(0.0, i * length - overlap_seconds)
+        end = min(duration, (i + 1) * length + overlap_seconds)
+        segment = [word for word, t in zip(words, times) if start <= t < end]
+        segment = [rng.choice(words) if rng.random() < word_error else word for word in segment]
+        if i > 0 and segment and rng.random() < edge_error:
+            # Word cut in half at the start of the segment
+            segment[0] = segment[0][: max(1, len(segment[0]) // 2)]
+        if i + 1 < num_segments and segment and rng.random() < edge_error:
+            segment[-1] = rng.choice(_EDGE_NOISE)
+        segments.append(" ".join(segment))
+    return segments
+
+
+def run_synthetic(args):
+    rng = np.random.default_rng(args.seed)
+    rows = []
+    for trial in range(args.trials):
+        reference = " ".join(rng.permutation(REFERENCE_ANSWERS)[: rng.integers(2, len(REFERENCE_ANSWERS) + 1)])
+        segments = simulate_segments(reference, args.segments, args.overlap, rng)
+        merged = transcript_merge.merge_transcriptions(segments, args.overlap)
+        rows.append({
+            "naive_join": word_error_rate(reference, " ".join(segments)),
+            "local_merge": word_error_rate(reference, merged.text),
+            "confidence": merged.confidence,
+        })
+    return {
+        "mode": "synthetic",
+        "trials": args.trials,
+        "segments": args.segments,
+        "wer_naive_join": round(float(np.mean([row["naive_join"] for row in rows])), 4),
+        "wer_local_merge": round(float(np.mean([row["local_merge"] for row in rows])), 4),
+        "mean_confidence": round(float(np.mean([row["confidence"] for row in rows])), 3),
+    }
+
+
+def run_clips(args):
+    from app.services import audio_processing, evaluation, transcription
+
+    results = []
+    for name in sorted(os.listdir(args.clips)):
+        base, ext = os.path.splitext(name)
+        reference_path = os.path.join(args.clips, base + ".txt")
+        if ext == ".txt" or not os.path.exists(reference_path):
+            continue
+        with open(reference_path) as f:
+            reference = f.read()
+        with open(os.path.join(args.clips, name), "rb") as f:
+            audio = audio_processing.convert_to_wav(f.read())
+        array = audio.samples
+
+        bounds = transcription.segment_bounds(len(array), 16000, args.segments)
+        segments = [transcription.transcribe_audio(audio.view(s, e), args.model) for s, e in bounds]
+        merged = transcript_merge.merge_transcriptions(segments, transcription.SEGMENT_OVERLAP_SECONDS)
+        row = {
+            "clip": name,
+            "seconds": round(len(array) / 16000, 1),
+            "wer_naive_join": round(word_error_rate(reference, " ".join(segments)), 4),
+            "wer_local_merge": round(word_error_rate(reference, merged.text), 4),
+            "confidence": round(merged.confidence, 3),
+            "wer_single_pass": round(word_error_rate(reference, transcription.transcribe_audio(audio, args.model)), 4),
+        }
+        if args.llm:
+            cleaned = asyncio.run(evaluation.clean_transcript(segments, "", ""))
+            row["wer_llm_cleanup"] = round(word_error_rate(reference, cleaned), 4)
+        results.append(row)
+    return {"mode": "clips", "model": args.model, "segments": args.segments, "clips": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", help="Directory of audio files with .txt reference transcripts")
+    parser.add_argument("--model", default="base.en")
+    parser.add_argument("--segments", type=int, default=3)
+    parser.add_argument("--overlap", type=float, default=1.0, help="Synthetic mode: overlap in seconds")
+    parser.add_argument("--trials", type=int, default=200, help="Synthetic mode: number of answers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm", action="store_true", help="Clips mode: also score the clean_transcript LLM pass")
+    args = parser.parse_args()
+
+    print(json.dumps(run_clips(args) if args.clips else run_synthetic(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
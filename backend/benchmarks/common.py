@@ -0,0 +1,88 @@
+"""Shared helpers for the benchmark scripts"""
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+
+def synthetic_audio(duration_seconds: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """Voiced-sounding tone bursts separated by short pauses"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration_seconds * sample_rate)) / sample_rate
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    voice = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / sample_rate) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 4 * t) > -0.2).astype(np.float32)
+    pauses = (np.sin(2 * np.pi * 0.2 * t) > -0.8).astype(np.float32)
+    noise = 0.01 * rng.standard_normal(len(t))
+    return (0.3 * voice * syllables * pauses + noise).astype(np.float32)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words, ignoring case and punctuation"""
+    from app.services.transcript_merge import normalize_word
+
+    ref = [w for w in (normalize_word(word) for word in reference.split()) if w]
+    hyp = [w for w in (normalize_word(word) for word in hypothesis.split()) if w]
+    if not ref:
+        return float(len(hyp) > 0)
+    # Levenshtein distance over words, one row at a time
+    previous = np.arange(len(hyp) + 1)
+    for i, word in enumerate(ref, start=1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, other in enumerate(hyp, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != other))
+        previous = current
+    return float(previous[-1]) / len(ref)
+
+
+def percentiles(values: Iterable[float], points=(50, 95, 99)) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 (nearest-rank on sorted values), plus mean and max, in the input's unit"""
+    values = sorted(values)
+    if not values:
+        return {**{f"p{point}": None for point in points}, "mean": None, "max": None}
+    summary = {f"p{point}": values[min(len(values) - 1, int(np.ceil(point / 100 * len(values))) - 1)] for point in points}
+    summary["mean"] = float(np.mean(values))
+    summary["max"] = values[-1]
+    return {key: round(value, 4) for key, value in summary.items()}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def write_results(path: Optional[str], benchmark: str, params: Dict[str, Any], results: Any) -> Dict[str, Any]:
+    """
+    Print results and optionally save them as JSON for benchmarks.compare
+
+    Every file records the commit, machine and parameters, so two runs can
+    be told apart and compared later.
+    """
+    report = {
+        "benchmark": benchmark,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "params": params,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    return report
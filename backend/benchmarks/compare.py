@@ -0,0 +1,72 @@
+"""
+Compare two benchmark result files written with --output
+
+Every numeric leaf that exists in both files is listed with its relative
+change. Latencies and seconds should go down; x_realtime and
+requests_per_second should go up.
+
+Usage (from the backend directory):
+    python -m benchmarks.compare results/before.json results/after.json
+    python -m benchmarks.compare results/before.json results/after.json --threshold 5
+"""
+import argparse
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+
+def _key(item: Any, index: int) -> str:
+    # List entries are matched by name rather than position when they have one
+    if isinstance(item, dict):
+        for field in ("clip", "name", "engine", "model"):
+            if field in item:
+                return str(item[field])
+    return str(index)
+
+
+def flatten(value: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """(dotted path, number) for every numeric leaf"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from flatten(item, f"{prefix}[{_key(item, index)}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], threshold: float = 0.0):
+    old = dict(flatten(before["results"]))
+    new = dict(flatten(after["results"]))
+    rows = []
+    for path in old:
+        if path not in new:
+            continue
+        change = (new[path] - old[path]) / old[path] * 100 if old[path] else None
+        if change is None or abs(change) >= threshold:
+            rows.append((path, old[path], new[path], change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Only show changes of at least this many percent")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before.get("benchmark") != after.get("benchmark"):
+        parser.error(f"Different benchmarks: {before.get('benchmark')} vs {after.get('benchmark')}")
+
+    print(f"{before['benchmark']}: {before.get('commit')} -> {after.get('commit')}")
+    for path, old, new, change in compare(before, after, args.threshold):
+        change_text = f"{change:+.1f}%" if change is not None else "n/a"
+        print(f"{path:<80} {old:>12.4g} {new:>12.4g} {change_text:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Generate a corpus of speech-like clips for the benchmarks
+
+Each clip is synthetic voiced audio (see common.synthetic_audio) with pauses
+of random length, so VAD segmentation and the pause metrics have something
+to find. Clips are encoded the way they arrive in production: Opus in WebM
+at 48 kHz like browser recordings, plus 16-bit WAV and MP3 uploads.
+
+Usage (from the backend directory):
+    python -m benchmarks.corpus --out bench_corpus
+    python -m benchmarks.corpus --out bench_corpus --durations 10,60 --formats webm
+"""
+import argparse
+import json
+import os
+from typing import Any, Dict, List
+
+import ffmpeg
+import numpy as np
+
+from benchmarks.common import synthetic_audio
+
+DEFAULT_DURATIONS = (10, 30, 60, 120, 300, 600)
+
+# ffmpeg output options per container
+FORMATS = {
+    "webm": {"acodec": "libopus", "audio_bitrate": "32k", "ar": 48000},
+    "wav": {"acodec": "pcm_s16le", "ar": 16000},
+    "mp3": {"acodec": "libmp3lame", "audio_bitrate": "64k", "ar": 44100},
+}
+
+SAMPLE_RATE = 16000
+
+
+def speech_like(duration_seconds: float, seed: int = 0) -> np.ndarray:
+    """synthetic_audio with pauses of 0.3-2.5 s every 3-12 s of speech"""
+    rng = np.random.default_rng(seed)
+    x = synthetic_audio(duration_seconds, SAMPLE_RATE, seed)
+    position = 0.0
+    while position < duration_seconds:
+        position += rng.uniform(3.0, 12.0)
+        pause = rng.uniform(0.3, 2.5)
+        start, end = int(position * SAMPLE_RATE), int((position + pause) * SAMPLE_RATE)
+        x[start:end] *= 0.02
+        position += pause
+    return x
+
+
+def encode(x: np.ndarray, path: str, fmt: str) -> None:
+    """Encode float32 16 kHz mono samples into path with ffmpeg"""
+    (
+        ffmpeg
+        .input("pipe:", format="f32le", ac=1, ar=SAMPLE_RATE)
+        .output(path, ac=1, **FORMATS[fmt])
+        .overwrite_output()
+        .run(input=x.astype(np.float32).tobytes(), quiet=True)
+    )
+
+
+def build_corpus(out_dir: str, durations, formats) -> List[Dict[str, Any]]:
+    """Write every duration in every format; returns the manifest entries"""
+    os.makedirs(out_dir, exist_ok=True)
+    clips = []
+    for index, duration in enumerate(durations):
+        x = speech_like(duration, seed=index)
+        for fmt in formats:
+            name = f"clip_{int(duration)}s.{fmt}"
+            path = os.path.join(out_dir, name)
+            if not os.path.exists(path):
+                encode(x, path, fmt)
+            clips.append({
+                "name": name,
+                "path": path,
+                "format": fmt,
+                "duration_seconds": float(duration),
+                "bytes": os.path.getsize(path),
+            })
+            print(f"{name}: {os.path.getsize(path) / 1024:.0f} KiB")
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(clips, f, indent=2)
+    return clips
+
+
+def load_corpus(corpus_dir: str, formats=None, max_duration=None) -> List[Dict[str, Any]]:
+    """Manifest entries of a generated corpus, optionally filtered"""
+    with open(os.path.join(corpus_dir, "manifest.json")) as f:
+        clips = json.load(f)
+    for clip in clips:
+        if not os.path.isabs(clip["path"]) and not os.path.exists(clip["path"]):
+            clip["path"] = os.path.join(corpus_dir, clip["name"])
+    return [
+        clip for clip in clips
+        if (not formats or clip["format"] in formats)
+        and (max_duration is None or clip["duration_seconds"] <= max_duration)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="bench_corpus", help="Output directory")
+    parser.add_argument("--durations", default=",".join(str(d) for d in DEFAULT_DURATIONS), help="Clip lengths in seconds")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated subset of webm,wav,mp3")
+    args = parser.parse_args()
+
+    durations = [float(d) for d in args.durations.split(",") if d]
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"Unknown formats: {sorted(unknown)}")
+    build_corpus(args.out, durations, formats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Drive /api/rate or /api/transcribe at a fixed concurrency and report latency
+
+A fixed number of clients send requests back to back. Each uses the next
+clip in the list, round robin. The report gives p50/p95/p99 latency and
+requests per second for successful requests, plus a count of every status
+code. 503s from saturated pools are counted separately from real failures.
+
+Start the stub and the API first. Repeated clips would otherwise be served
+from the transcription cache, so set TRANSCRIPTION_CACHE_ENTRIES=0 unless
+cache hits are what you want to measure:
+    python -m benchmarks.openai_stub --latency 0.8 --jitter 0.3 &
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub TRANSCRIPTION_CACHE_ENTRIES=0 \\
+        uvicorn app.main:app --port 8000 &
+
+Usage (from the backend directory):
+    python -m benchmarks.load --endpoint rate --corpus bench_corpus --formats webm --max-duration 120 \\
+        --concurrency 8 --requests 80 --output results/load_rate.json
+    python -m benchmarks.load --endpoint transcribe --audio answer.webm --concurrency 4 --duration 60
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import percentiles, write_results
+from benchmarks.corpus import load_corpus
+
+ENDPOINTS = {"rate": "/api/rate", "transcribe": "/api/transcribe"}
+
+MIME_TYPES = {".webm": "audio/webm", ".wav": "audio/wav", ".mp3": "audio/mpeg", ".m4a": "audio/mp4"}
+
+
+class Clip:
+    __slots__ = ("name", "content", "mime_type")
+
+    def __init__(self, path: str):
+        self.name = os.path.basename(path)
+        with open(path, "rb") as f:
+            self.content = f.read()
+        self.mime_type = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, clip: Clip, question: str) -> Dict[str, Any]:
+    files = {"answer": (clip.name, clip.content, clip.mime_type)}
+    data = {"question": question, "job_description": "Backend engineer"} if endpoint == "rate" else {}
+    start = time.perf_counter()
+    try:
+        response = await client.post(ENDPOINTS[endpoint], files=files, data=data)
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return {"status": status, "seconds": time.perf_counter() - start, "clip": clip.name}
+
+
+async def run_load(
+    base_url: str,
+    endpoint: str,
+    clips: List[Clip],
+    concurrency: int,
+    requests: Optional[int],
+    duration: Optional[float],
+    warmup: int,
+    timeout: float,
+    question: str,
+) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for clip in itertools.islice(itertools.cycle(clips), warmup):
+            await send(client, endpoint, clip, question)
+
+        clip_cycle = itertools.cycle(clips)
+        issued = 0
+        samples: List[Dict[str, Any]] = []
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+
+        async def worker():
+            nonlocal issued
+            while True:
+                if requests is not None and issued >= requests:
+                    return
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                issued += 1
+                samples.append(await send(client, endpoint, next(clip_cycle), question))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall_seconds = time.perf_counter() - start
+
+    ok = [sample["seconds"] for sample in samples if sample["status"] == "200"]
+    statuses = Counter(sample["status"] for sample in samples)
+    per_clip: Dict[str, List[float]] = {}
+    for sample in samples:
+        if sample["status"] == "200":
+            per_clip.setdefault(sample["clip"], []).append(sample["seconds"])
+    return {
+        "requests": len(samples),
+        "succeeded": len(ok),
+        "rejected_503": statuses.get("503", 0),
+        "statuses": dict(statuses),
+        "wall_seconds": round(wall_seconds, 2),
+        "requests_per_second": round(len(ok) / wall_seconds, 3) if wall_seconds else None,
+        "latency_seconds": percentiles(ok),
+        "latency_by_clip": {name: percentiles(values) for name, values in sorted(per_clip.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="rate")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--audio", nargs="+", help="Audio files to send")
+    source.add_argument("--corpus", help="Directory written by benchmarks.corpus")
+    parser.add_argument("--formats", default="", help="Corpus formats to include (default: all)")
+    parser.add_argument("--max-duration", type=float, default=None, help="Skip corpus clips longer than this")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument("--requests", type=int, help="Total requests (default 50)")
+    limit.add_argument("--duration", type=float, help="Keep sending for this many seconds instead")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed requests sent first")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--question", default="Tell me about a project you are proud of.")
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args()
+
+    if args.audio:
+        clips = [Clip(path) for path in args.audio]
+    else:
+        entries = load_corpus(args.corpus, [f for f in args.formats.split(",") if f], args.max_duration)
+        clips = [Clip(entry["path"]) for entry in entries]
+    if not clips:
+        parser.error("No clips to send")
+    requests = args.requests if args.requests is not None or args.duration else 50
+
+    results = asyncio.run(run_load(
+        args.url, args.endpoint, clips, args.concurrency, requests, args.duration, args.warmup, args.timeout, args.question
+    ))
+    write_results(
+        args.output,
+        f"load_{args.endpoint}",
+        {
+            "url": args.url,
+            "endpoint": ENDPOINTS[args.endpoint],
+            "clips": [clip.name for clip in clips],
+            "concurrency": args.concurrency,
+            "requests": requests,
+            "duration": args.duration,
+            "warmup": args.warmup,
+        },
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Local stand-in for the OpenAI chat completions API
+
+Answers POST /v1/chat/completions (plain and stream=true) after a
+configurable delay, with replies shaped like what each prompt in
+app/services/evaluation.py expects, so /rate, /summarize and
+/generate-questions run end to end without network access or cost. Token
+usage is estimated from text length so the token counters move.
+
+Usage (from the backend directory):
+    python -m benchmarks.openai_stub --port 8100 --latency 0.8 --jitter 0.3
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services import llm
+
+QUESTIONS = [
+    "Tell me about a project you are proud of.",
+    "Describe a difficult bug you tracked down.",
+    "How do you handle disagreements on a team?",
+    "Walk me through how you would design a URL shortener.",
+    "What did you learn from a project that failed?",
+]
+
+
+def stub_reply(body: Dict[str, Any]) -> str:
+    """Message content in the format the calling prompt asks for"""
+    prompt = body["messages"][-1]["content"] if body.get("messages") else ""
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        result = {
+            "rating": 7,
+            "explanation": "The answer addresses the question with a clear example.",
+            "suggestions": "Quantify the impact and close with what you learned.",
+        }
+        if '"transcript"' in prompt:
+            result = {"transcript": "I led the migration of our billing service to a queue based design.", **result}
+        return json.dumps(result)
+    if "numbered list" in prompt.lower() or "interview questions" in prompt.lower():
+        return "\n".join(f"{i}. {QUESTIONS[(i - 1) % len(QUESTIONS)]}" for i in range(1, 11))
+    if "bullet points" in prompt.lower():
+        return "- Clear structure\n- Concrete examples\n- Good technical depth"
+    return "I led the migration of our billing service to a queue based design."
+
+
+def _usage(body: Dict[str, Any], content: str) -> Dict[str, int]:
+    # About four characters per token for English text
+    prompt_tokens = sum(len(message.get("content") or "") for message in body.get("messages", [])) // 4
+    completion_tokens = max(1, len(content) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_app(latency: float = 0.5, jitter: float = 0.0, error_rate: float = 0.0, chunk_delay: float = 0.01) -> FastAPI:
+    """
+    Build the stub app
+
+    Args:
+        latency: Mean seconds before the response (or the first streamed chunk)
+        jitter: Uniform +/- spread around latency
+        error_rate: Fraction of requests answered with 500, to exercise retries
+        chunk_delay: Seconds between streamed chunks
+    """
+    app = FastAPI(title="OpenAI stub")
+    stats = {"requests": 0, "errors": 0}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(max(0.0, random.uniform(latency - jitter, latency + jitter)))
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "stub error", "type": "server_error"}})
+
+        content = stub_reply(body)
+        model = body.get("model", "")
+        if not body.get("stream"):
+            payload = llm.completion_payload(content, model)
+            payload["usage"] = _usage(body, content)
+            return payload
+
+        async def events():
+            for chunk in llm.completion_chunks(content, model):
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(chunk_delay)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- spread around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail with 500")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+
+    app = create_app(args.latency, args.jitter, args.error_rate, args.chunk_delay)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for serving on several cores with one copy of the Whisper weights
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported and the models in WHISPER_PRELOAD_MODELS are loaded once
+in the master process, then the workers are forked and share those pages.
+Each worker only warms the models it inherited, so memory grows by the
+per-worker Python heap and activations, not by another copy of the weights.
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app in the master so on_starting can load models before the fork
+preload_app = True
+
+# Let in-flight transcriptions finish on reload or shutdown
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+
+
+def on_starting(server):
+    from app.config import get_settings
+    from app.services import engines
+    from app.services.model_registry import registry
+
+    # One thread while loading, so PyTorch has no OpenMP pool for the fork to break
+    engines.set_torch_threads(1)
+    shared = registry.load_shared(get_settings().whisper_preload_models)
+    server.log.info(f"Loaded {', '.join(shared) or 'no models'} before forking {server.cfg.workers} workers")
+
+
+def post_fork(server, worker):
+    from app.config import get_settings
+    from app.services import engines
+
+    # Split the cores between workers unless TORCH_THREADS says otherwise
+    threads = get_settings().torch_threads or max(1, (os.cpu_count() or 1) // server.cfg.workers)
+    engines.set_torch_threads(threads)
@@ -0,0 +1,111 @@
+"""
+Regression checks for the delivery metrics and VAD on synthetic signals
+
+Run from the backend directory:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from app.services import frame_metrics, segmentation
+from app.services.audio_buffer import AudioBuffer
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = int(frame_metrics.WINDOW_SECONDS * SAMPLE_RATE)
+HOP_LENGTH = int(frame_metrics.HOP_SECONDS * SAMPLE_RATE)
+
+
+def tone(seconds: float, frequency: float = 440.0, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def tone_with_gaps() -> AudioBuffer:
+    """Three one-second tones separated by 0.5 s and 1 s of digital silence"""
+    return AudioBuffer(
+        np.concatenate([silence(0.5), tone(1.0), silence(0.5), tone(1.0), silence(1.0), tone(1.0), silence(0.5)]),
+        SAMPLE_RATE,
+    )
+
+
+def metrics_for(audio: AudioBuffer):
+    return frame_metrics.compute_frame_metrics(audio.samples, audio.sample_rate, audio.frame_features())
+
+
+def test_tone_with_gaps_metrics():
+    metrics = metrics_for(tone_with_gaps())
+
+    assert metrics["pause_count"] == 2
+    # 123 of 219 frames are speech
+    assert metrics["silence_ratio"] == 1.0 - 123 / 219
+    assert metrics["speech_seconds"] == 123 * frame_metrics.HOP_SECONDS
+    assert metrics["longest_pause_seconds"] == 39 * frame_metrics.HOP_SECONDS
+    assert metrics["energy"] == pytest.approx(0.2739690119620981, rel=1e-12, abs=0)
+    assert metrics["zcr"] == pytest.approx(0.0296603631251393, rel=1e-12, abs=0)
+
+
+def test_digital_silence_metrics():
+    audio = AudioBuffer(silence(3.0), SAMPLE_RATE)
+    metrics = metrics_for(audio)
+
+    assert metrics["energy"] == 0.0
+    assert metrics["zcr"] == 0.0
+    assert metrics["silence_ratio"] == 1.0
+    assert metrics["speech_seconds"] == 0.0
+    assert metrics["pause_count"] == 0
+    assert segmentation.vad_segments(audio) == []
+
+
+@pytest.mark.parametrize("block_frames", [1, 7, 64, frame_metrics.BLOCK_FRAMES])
+def test_blocked_features_match_full_signal(block_frames):
+    samples = tone_with_gaps().samples
+    num_frames = (len(samples) - FRAME_LENGTH) // HOP_LENGTH + 1
+
+    full_energy, full_zcr = frame_metrics.frame_features(samples, FRAME_LENGTH, HOP_LENGTH, block_frames=num_frames)
+    energy, zcr = frame_metrics.frame_features(samples, FRAME_LENGTH, HOP_LENGTH, block_frames=block_frames)
+
+    assert np.array_equal(energy, full_energy)
+    assert np.array_equal(zcr, full_zcr)
+
+
+def test_features_match_normalized_signal():
+    audio = tone_with_gaps()
+    signal = frame_metrics.normalize(audio.samples)
+    energy, zcr = audio.frame_features()
+
+    np.testing.assert_allclose(energy, frame_metrics.frame_energy(frame_metrics.frame_signal(signal, FRAME_LENGTH, HOP_LENGTH)), rtol=1e-12, atol=1e-30)
+    np.testing.assert_array_equal(zcr, frame_metrics.frame_zcr(signal, FRAME_LENGTH, HOP_LENGTH))
+
+
+def test_vad_splits_at_long_pause():
+    audio = tone_with_gaps()
+    segments = segmentation.vad_segments(audio, min_silence_seconds=0.8)
+
+    # The 0.5 s pause stays inside a region; the 1 s pause is dropped, so the
+    # speech before and after it is joined into one segment
+    assert len(segments) == 1
+    (_, first_end), (second_start, _) = segments[0].pieces
+    assert 2.5 * SAMPLE_RATE < first_end < second_start < 4.0 * SAMPLE_RATE
+
+
+@pytest.mark.parametrize("signal", ["tone_with_gaps", "speech_like"])
+def test_features_match_pyaudioanalysis(signal):
+    short_term = pytest.importorskip("pyAudioAnalysis.ShortTermFeatures")
+    if signal == "tone_with_gaps":
+        audio = tone_with_gaps()
+    else:
+        rng = np.random.default_rng(0)
+        t = np.arange(4 * SAMPLE_RATE) / SAMPLE_RATE
+        samples = 0.3 * np.sin(2 * np.pi * 150 * t) * (np.sin(2 * np.pi * 3 * t) > 0) + 0.01 * rng.standard_normal(len(t))
+        audio = AudioBuffer(samples.astype(np.float32), SAMPLE_RATE)
+
+    features, _ = short_term.feature_extraction(audio.samples, SAMPLE_RATE, FRAME_LENGTH, HOP_LENGTH)
+    energy, zcr = audio.frame_features()
+
+    assert features.shape[1] == len(energy)
+    np.testing.assert_allclose(zcr, features[0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(energy, features[1], rtol=0, atol=1e-12)
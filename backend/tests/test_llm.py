@@ -0,0 +1,134 @@
+"""
+Retry and streaming behaviour of the shared OpenAI client, offline
+
+Requests go to an httpx.MockTransport instead of the network.
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from openai import AuthenticationError, BadRequestError, InternalServerError, RateLimitError
+
+from app.config import get_settings
+from app.services import llm
+from app.utils import executor
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture
+def settings():
+    return get_settings().model_copy(update={
+        "openai_base_url": "http://llm.test/v1",
+        "llm_max_retries": 2,
+        "llm_retry_base_delay_seconds": 0.001,
+        "llm_retry_max_delay_seconds": 0.05,
+    })
+
+
+def run(settings, transport, coroutine_fn):
+    """Run coroutine_fn() with the pools and shared client set up for this test"""
+    async def main():
+        executor.init_pools(settings)
+        llm.init_client(settings, transport)
+        try:
+            return await coroutine_fn()
+        finally:
+            await llm.close_client()
+            executor.shutdown_pools()
+
+    return asyncio.run(main())
+
+
+def scripted_transport(responses):
+    """Answer successive requests with the given (status, headers, reply) tuples; records request bodies"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        status, headers, reply = responses[min(len(requests), len(responses)) - 1]
+        if status != 200:
+            return httpx.Response(status, headers=headers, json={"error": {"message": "scripted", "type": "error"}})
+        if body.get("stream"):
+            events = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in llm.completion_chunks(reply))
+            return httpx.Response(200, content=(events + "data: [DONE]\n\n").encode(), headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json=llm.completion_payload(reply))
+
+    return httpx.MockTransport(handler), requests
+
+
+def test_chat_completion_with_fake_transport(settings):
+    response = run(settings, llm.fake_transport("All good"), lambda: llm.chat_completion(model="gpt-test", messages=MESSAGES))
+
+    assert response.choices[0].message.content == "All good"
+
+
+def test_rate_limit_is_retried(settings):
+    transport, requests = scripted_transport([(429, {"retry-after": "0.01"}, None), (200, {}, "done")])
+
+    response = run(settings, transport, lambda: llm.chat_completion(model="gpt-test", messages=MESSAGES))
+
+    assert response.choices[0].message.content == "done"
+    assert len(requests) == 2
+
+
+def test_server_errors_give_up_after_max_retries(settings):
+    transport, requests = scripted_transport([(500, {}, None)])
+
+    with pytest.raises(InternalServerError):
+        run(settings, transport, lambda: llm.chat_completion(model="gpt-test", messages=MESSAGES))
+    assert len(requests) == settings.llm_max_retries + 1
+
+
+def test_client_errors_are_not_retried(settings):
+    transport, requests = scripted_transport([(400, {}, None), (200, {}, "unreachable")])
+
+    with pytest.raises(BadRequestError):
+        run(settings, transport, lambda: llm.chat_completion(model="gpt-test", messages=MESSAGES))
+    assert len(requests) == 1
+
+
+def test_retry_after_sets_the_minimum_delay(settings):
+    request = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    error = RateLimitError("slow down", response=httpx.Response(429, headers={"retry-after": "0.04"}, request=request), body=None)
+
+    assert llm._retry_delay(0, error, settings) >= 0.04
+    # Capped at LLM_RETRY_MAX_DELAY_SECONDS
+    error.response.headers["retry-after"] = "30"
+    assert llm._retry_delay(0, error, settings) == settings.llm_retry_max_delay_seconds
+
+
+def collect_stream(**kwargs):
+    async def collect():
+        return [delta async for delta in llm.stream_chat_completion(model="gpt-test", messages=MESSAGES, **kwargs)]
+
+    return collect
+
+
+def test_stream_yields_deltas_in_order(settings):
+    text = "1. First question?\n2. Second question?"
+
+    deltas = run(settings, llm.fake_transport(text), collect_stream())
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == text
+
+
+def test_stream_open_is_retried(settings):
+    transport, requests = scripted_transport([(503, {}, None), (200, {}, "streamed reply")])
+
+    deltas = run(settings, transport, collect_stream())
+
+    assert "".join(deltas) == "streamed reply"
+    assert len(requests) == 2
+    assert all(body["stream"] for body in requests)
+
+
+def test_stream_client_error_is_not_retried(settings):
+    transport, requests = scripted_transport([(401, {}, None)])
+
+    with pytest.raises(AuthenticationError):
+        run(settings, transport, collect_stream())
+    assert len(requests) == 1
@@ -0,0 +1,112 @@
+import pytest
+
+from app.config import get_settings
+from app.services import policy
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    """Set policy settings and the inference queue; returns the fresh RTF tracker decide() uses"""
+    tracker = policy.RtfTracker(window=10)
+    monkeypatch.setattr(policy, "get_tracker", lambda: tracker)
+
+    def apply(pending=0, workers=1, **overrides):
+        settings = get_settings().model_copy(update={
+            "whisper_model": "base.en",
+            "whisper_long_model": "tiny.en",
+            "whisper_policy_models": [],
+            "whisper_latency_slo_seconds": 20.0,
+            "segmentation_mode": "vad",
+            **overrides,
+        })
+        monkeypatch.setattr(policy, "get_settings", lambda: settings)
+        monkeypatch.setattr(policy, "inference_queue_depth", lambda: (pending, workers))
+        return tracker
+
+    return apply
+
+
+def test_headroom_keeps_the_accurate_model(configure):
+    configure()
+    decision = policy.decide(60.0)
+
+    # base.en prior: 60 s x 0.1 = 6 s
+    assert (decision.model, decision.reason) == ("base.en", "headroom")
+    assert decision.estimated_seconds == pytest.approx(6.0)
+    assert decision.segments is None
+
+
+def test_long_answer_is_degraded(configure):
+    configure()
+    decision = policy.decide(300.0)
+
+    # base.en would take 30 s, tiny.en 12 s
+    assert (decision.model, decision.reason) == ("tiny.en", "degraded")
+    assert decision.estimated_seconds == pytest.approx(12.0)
+
+
+def test_no_model_meets_the_slo(configure):
+    configure()
+    decision = policy.decide(600.0)
+
+    assert (decision.model, decision.reason) == ("tiny.en", "over_slo")
+    assert decision.estimated_seconds == pytest.approx(24.0)
+
+
+def test_queue_wait_counts_towards_the_estimate(configure):
+    tracker = configure(pending=4, workers=2)
+    tracker.observe("base.en", 100.0, 10.0)
+
+    decision = policy.decide(60.0)
+
+    # 3 jobs ahead of 2 workers at 10 s each: 15 s wait, so base.en (6 s) misses and tiny.en (2.4 s) fits
+    assert (decision.model, decision.reason) == ("tiny.en", "degraded")
+    assert decision.estimated_seconds == pytest.approx(17.4)
+    assert decision.queue_depth == 4
+
+
+def test_measured_rtf_replaces_the_prior(configure):
+    tracker = configure()
+    tracker.observe("base.en", 100.0, 50.0)
+
+    decision = policy.decide(60.0)
+
+    # base.en now estimates 30 s, so tiny.en (still on its prior) is chosen
+    assert tracker.rtf("base.en") == pytest.approx(0.5)
+    assert (decision.model, decision.reason) == ("tiny.en", "degraded")
+    assert decision.rtf == pytest.approx(policy.DEFAULT_RTF["tiny.en"])
+
+
+def test_fixed_segmentation_splits_by_fixed_segment_seconds(configure):
+    configure(segmentation_mode="fixed", fixed_segment_seconds=60.0)
+
+    assert policy.decide(30.0).segments == 1
+    assert policy.decide(150.0).segments == 3
+    assert policy.decide(600.0).segments == 10
+
+
+@pytest.mark.parametrize(
+    "duration, model, segments",
+    [(30.0, "base.en", 1), (90.0, "base.en", 2), (150.0, "tiny.en", 3), (600.0, "tiny.en", 5)],
+)
+def test_static_policy_keeps_previous_model_and_segments(configure, duration, model, segments):
+    configure(whisper_policy="static", whisper_long_seconds=120.0, segmentation_mode="fixed")
+    decision = policy.decide(duration)
+
+    assert (decision.model, decision.segments, decision.reason) == (model, segments, "static")
+
+
+def test_fixed_decision_bypasses_the_slo(configure):
+    configure(segmentation_mode="fixed")
+    decision = policy.fixed("base.en", 600.0)
+
+    assert (decision.model, decision.reason, decision.segments) == ("base.en", "fixed", 10)
+
+
+def test_record_skips_cached_results(configure):
+    tracker = configure()
+    policy.record({"model_used": "base.en", "policy": {"cached": True}}, 60.0)
+    policy.record({"model_used": "base.en", "policy": {"inference_seconds": 12.0}}, 60.0)
+
+    assert tracker.measured("base.en") == 1
+    assert tracker.rtf("base.en") == pytest.approx(0.2)
@@ -0,0 +1,77 @@
+from app.services import transcript_merge
+from app.services.transcript_merge import NO_SPEECH, merge_result, merge_transcriptions
+
+
+def test_overlap_at_seam_is_merged():
+    result = merge_transcriptions(
+        ["so we shipped the new billing system on time", "billing system on time and then we moved on"], 1.0
+    )
+
+    assert result.text == "so we shipped the new billing system on time and then we moved on"
+    assert result.confidence >= 0.5
+
+
+def test_overlap_with_garbled_edge_word():
+    result = merge_transcriptions(
+        ["we built it in Python and it scaled really well uh", "it scaled really well. Then we rewrote parts in Rust"], 1.0
+    )
+
+    assert result.text == "we built it in Python and it scaled really well. Then we rewrote parts in Rust"
+    # The extra word at the edge lowers confidence below a clean seam
+    assert 0.3 < result.confidence < 1.0
+
+
+def test_phrase_away_from_the_edges_is_not_overlap():
+    left = "I led the design of the payment service and later owned most of the on call rotation for our team"
+    right = "team members. Most of the work was in Go, and I wrote the deploy tooling"
+    result = merge_transcriptions([left, right], 1.0)
+
+    assert result.text == f"{left} {right}"
+    assert result.confidence == 0.0
+
+
+def test_short_repeat_at_sentence_boundary_is_not_overlap():
+    result = merge_transcriptions(["I went to the store.", "The store was closed."], 1.0)
+
+    assert result.text == "I went to the store. The store was closed."
+    assert result.confidence == 0.0
+
+
+def test_no_overlap_joins_segments():
+    result = merge_transcriptions(["first part", NO_SPEECH, "second part"], 0.0)
+
+    assert result.text == "first part second part"
+    assert result.confidence == 1.0
+
+
+def test_silent_segment_between_seams_is_not_aligned():
+    result = merge_transcriptions(["one two three", NO_SPEECH, "two three four"], 1.0)
+
+    assert result.text == "one two three two three four"
+    assert result.seams == [1.0]
+
+
+def test_merge_by_word_timestamps():
+    words = [
+        [{"word": "hello", "start": 0.0, "end": 0.5}, {"word": "there", "start": 9.2, "end": 9.8}],
+        [{"word": "there", "start": 0.2, "end": 0.8}, {"word": "friend", "start": 1.5, "end": 2.0}],
+    ]
+    segments = [{"start": 0.0, "end": 10.0}, {"start": 9.0, "end": 20.0}]
+    result = merge_transcriptions(["hello there", "there friend"], 1.0, words, segments)
+
+    assert result.text == "hello there friend"
+
+
+def test_merge_result_only_aligns_fixed_segmentation():
+    transcriptions = ["so we shipped the new billing system on time", "billing system on time and then we moved on"]
+
+    vad = merge_result({"transcriptions": transcriptions, "segmentation": "vad"}, 1.0)
+    fixed = merge_result({"transcriptions": transcriptions, "segmentation": "fixed"}, 1.0)
+
+    assert vad.text == " ".join(transcriptions)
+    assert fixed.text == "so we shipped the new billing system on time and then we moved on"
+
+
+def test_nothing_but_silence():
+    assert merge_transcriptions([NO_SPEECH, ""], 1.0).text == NO_SPEECH
+    assert transcript_merge.normalize_word("Python,") == "python"
@@ -3,6 +3,10 @@ import { useSelector, useDispatch } from "react-redux";
 import { rateAnswer, getSummary } from "../store/slices/interviewSlice";
 import colors from "../theme/colors";
 import Button from "./common/Button";
+import { openTranscriptionStream } from "../utils/transcriptionStream";
+
+// Recorder chunk length; each chunk is streamed to the backend for transcription
+const RECORDER_TIMESLICE_MS = 1000;
 
 function InterviewSimulation({ interviewData, onComplete }) {
 	const dispatch = useDispatch();
@@ -56,10 +60,14 @@ function InterviewSimulation({ interviewData, onComplete }) {
 			const mediaRecorder = new MediaRecorder(stream);
 			mediaRecorderRef.current = mediaRecorder;
 
+			// Transcribe while recording; falls back to the upload if unavailable
+			const transcriptionStream = openTranscriptionStream();
+
 			// Set up event handlers
 			mediaRecorder.ondataavailable = (event) => {
 				if (event.data.size > 0) {
 					audioChunksRef.current.push(event.data);
+					if (transcriptionStream) transcriptionStream.send(event.data);
 				}
 			};
 
@@ -79,12 +87,15 @@ function InterviewSimulation({ interviewData, onComplete }) {
 					timerRef.current = null;
 				}
 
-				// Submit the answer for rating
-				await submitAnswerForRating(audioBlob);
+				// Wait for the last streamed window, then submit the answer for rating
+				const streamed = transcriptionStream
+					? await transcriptionStream.finish()
+					: null;
+				await submitAnswerForRating(audioBlob, streamed?.stream_id);
 			};
 
 			// Start recording
-			mediaRecorder.start();
+			mediaRecorder.start(RECORDER_TIMESLICE_MS);
 			setIsRecording(true);
 			setRecordingTime(0);
 
@@ -118,7 +129,7 @@ function InterviewSimulation({ interviewData, onComplete }) {
 		}
 	};
 
-	const submitAnswerForRating = async (blob) => {
+	const submitAnswerForRating = async (blob, streamId) => {
 		setIsSubmitting(true);
 		try {
 			const question = getCurrentQuestion();
@@ -126,6 +137,7 @@ function InterviewSimulation({ interviewData, onComplete }) {
 				rateAnswer({
 					question,
 					audioBlob: blob,
+					streamId,
 				})
 			);
 
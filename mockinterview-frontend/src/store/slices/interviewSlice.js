@@ -33,7 +33,7 @@ export const generateQuestions = createAsyncThunk(
 
 export const rateAnswer = createAsyncThunk(
 	"interview/rateAnswer",
-	async ({ question, audioBlob }, { rejectWithValue, getState }) => {
+	async ({ question, audioBlob, streamId }, { rejectWithValue, getState }) => {
 		try {
 			const state = getState();
 			const summarizedJob = state.interview.summarizedJob;
@@ -44,6 +44,9 @@ export const rateAnswer = createAsyncThunk(
 			formData.append("question", question);
 			formData.append("job_description", summarizedJob);
 			formData.append("background", summarizedBackground); // Use summarized background
+			if (streamId) {
+				formData.append("stream_id", streamId); // Reuse the transcript streamed while recording
+			}
 
 			const response = await axios.post(`${API_URL}/rate`, formData, {
 				headers: {
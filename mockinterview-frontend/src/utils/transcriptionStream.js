@@ -0,0 +1,72 @@
+// Base API URL - same default as the interview slice
+const API_URL = process.env.REACT_APP_API_URL || "http://127.0.0.1:8000/api";
+
+const STREAM_URL = `${API_URL.replace(/^http/, "ws")}/transcribe/stream`;
+
+// Streams recorder chunks to the backend so Whisper runs while the answer is
+// still being recorded. finish() resolves to the final transcription (with a
+// stream_id that /rate can reuse) or null if streaming failed, in which case
+// the plain upload is transcribed as before.
+export const openTranscriptionStream = ({ onPartial } = {}) => {
+	let socket;
+	try {
+		socket = new WebSocket(STREAM_URL);
+	} catch (error) {
+		console.warn("Transcription stream unavailable:", error);
+		return null;
+	}
+
+	const pending = [];
+	let failed = false;
+	let resolveFinal;
+	const finalResult = new Promise((resolve) => {
+		resolveFinal = resolve;
+	});
+
+	socket.onopen = () => {
+		pending.forEach((chunk) => socket.send(chunk));
+		pending.length = 0;
+	};
+	socket.onmessage = (event) => {
+		const message = JSON.parse(event.data);
+		if (message.type === "partial") {
+			if (onPartial) onPartial(message);
+		} else if (message.type === "final") {
+			resolveFinal(message);
+		} else if (message.type === "error") {
+			console.warn("Transcription stream error:", message.detail);
+			resolveFinal(null);
+		}
+	};
+	socket.onerror = () => {
+		failed = true;
+		resolveFinal(null);
+	};
+	socket.onclose = () => resolveFinal(null);
+
+	const sendOrQueue = (data) => {
+		if (socket.readyState === WebSocket.OPEN) {
+			socket.send(data);
+		} else if (socket.readyState === WebSocket.CONNECTING) {
+			pending.push(data);
+		} else {
+			// A chunk was lost, so the streamed transcript would be incomplete
+			failed = true;
+			resolveFinal(null);
+		}
+	};
+
+	return {
+		send: (chunk) => sendOrQueue(chunk),
+		finish: async (timeoutMs = 30000) => {
+			if (failed) return null;
+			sendOrQueue(JSON.stringify({ type: "stop" }));
+			const timeout = new Promise((resolve) =>
+				setTimeout(() => resolve(null), timeoutMs)
+			);
+			const result = await Promise.race([finalResult, timeout]);
+			if (socket.readyState === WebSocket.OPEN) socket.close();
+			return result;
+		},
+	};
+};